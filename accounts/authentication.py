@@ -0,0 +1,27 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication as BaseJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from config.routers import use_shard
+from gyms.sharding import route_to_branch
+from .tokens import BRANCH_CLAIM
+
+
+class JWTAuthentication(BaseJWTAuthentication):
+    """
+    JWT authentication that also rejects tokens revoked with logout-all and
+    sends the rest of the request to the shard of the user's branch
+    """
+    writing = False
+
+    def authenticate(self, request):
+        self.writing = request.method not in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        alias = route_to_branch(validated_token.get(BRANCH_CLAIM), writing=self.writing)
+        with use_shard(alias):
+            user = super().get_user(validated_token)
+        # The user row is loaded on every request anyway, so this check is free
+        if user.is_token_revoked(validated_token):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return user
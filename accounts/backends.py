@@ -0,0 +1,22 @@
+from django.contrib.auth.backends import ModelBackend
+from django.db import DEFAULT_DB_ALIAS
+from config.routers import use_shard
+from gyms.sharding import all_databases
+from .models import User
+
+
+class ShardedModelBackend(ModelBackend):
+    """Email and password login for users on any shard"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        email = kwargs.get(User.USERNAME_FIELD, username)
+        alias = next(
+            (
+                alias for alias in all_databases()
+                if User.objects.using(alias).filter(email=email).exists()
+            ),
+            # Unknown emails still hash a password, like ModelBackend
+            DEFAULT_DB_ALIAS
+        )
+        with use_shard(alias):
+            return super().authenticate(request, username=username, password=password, **kwargs)
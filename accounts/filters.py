@@ -0,0 +1,191 @@
+from rest_framework import serializers
+from .models import User
+
+
+class Filter:
+    """A query parameter mapped onto a model lookup"""
+
+    def __init__(self, field_name, lookup='exact', field=None):
+        self.field_name = field_name
+        self.lookup = lookup
+        self.field = field or serializers.CharField()
+
+    @property
+    def is_equality(self):
+        return self.lookup == 'exact'
+
+    @property
+    def is_range(self):
+        return self.lookup in ('gt', 'gte', 'lt', 'lte')
+
+    def apply(self, queryset, value):
+        return queryset.filter(**{f'{self.field_name}__{self.lookup}': value})
+
+
+class ContainsFilter(Filter):
+    """
+    JSON containment (@>), which a GIN index on the field serves. build()
+    turns the parameter value into the document that must be contained.
+    """
+
+    def __init__(self, field_name, build, field=None):
+        super().__init__(field_name, 'contains', field)
+        self.build = build
+
+    def apply(self, queryset, value):
+        return queryset.filter(**{f'{self.field_name}__contains': self.build(value)})
+
+
+class CommaSeparatedField(serializers.CharField):
+    """A list of values from one query parameter, e.g. ?equipment=barbell,bench"""
+
+    def to_internal_value(self, data):
+        values = [value.strip().lower() for value in super().to_internal_value(data).split(',')]
+        values = [value for value in values if value]
+        if not values:
+            raise serializers.ValidationError('Provide at least one value')
+        return values
+
+
+class UpperChoiceField(serializers.ChoiceField):
+    """Choice field that accepts values in any case, e.g. ?status=pending"""
+
+    def to_internal_value(self, data):
+        return super().to_internal_value(str(data).upper())
+
+
+class FilterSet:
+    """
+    Declarative filtering and ordering from query parameters.
+
+    Range filters and orderings are only accepted when one of the model's
+    indexes can serve them together with the equality filters in use
+    (including the caller's scope, e.g. member or gym_branch). Anything else
+    would sort or scan the whole scope and is rejected.
+    """
+    model = None
+    filters = {}
+    ordering_fields = []
+    default_ordering = '-created_at'
+    search_param = 'q'
+
+    def __init__(self, data, scope_fields=()):
+        self.data = data
+        self.scope_fields = set(scope_fields)
+        self.cleaned_data = {}
+        self.ordering = None
+        self.search = None
+        self._errors = None
+
+    @property
+    def errors(self):
+        return self._errors
+
+    def is_valid(self):
+        self._errors = {}
+        self.cleaned_data = {}
+
+        for param, filter_ in self.filters.items():
+            value = self.data.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                self.cleaned_data[param] = filter_.field.run_validation(value)
+            except serializers.ValidationError as exc:
+                self._errors[param] = exc.detail
+
+        search = self.data.get(self.search_param, '').strip()
+        self.search = search or None
+
+        ordering = self.data.get('ordering')
+        if ordering:
+            if ordering.lstrip('-') not in self.ordering_fields:
+                allowed = ', '.join(self.ordering_fields)
+                self._errors['ordering'] = [f'Must be one of: {allowed} (prefix with - for descending)']
+            else:
+                self.ordering = ordering
+        elif not self.search:
+            self.ordering = self.default_ordering
+
+        if not self._errors:
+            self.validate_indexes()
+
+        return not self._errors
+
+    def validate_indexes(self):
+        """Reject range filters and orderings that no index can serve"""
+        equality_fields = self.scope_fields | {
+            self.filters[param].field_name
+            for param in self.cleaned_data
+            if self.filters[param].is_equality
+        }
+
+        for param in self.cleaned_data:
+            filter_ = self.filters[param]
+            if filter_.is_range and not self.is_index_backed(filter_.field_name, equality_fields):
+                self._errors[param] = [self.index_error(filter_.field_name)]
+
+        if self.ordering and not self.is_index_backed(self.ordering.lstrip('-'), equality_fields):
+            self._errors['ordering'] = [self.index_error(self.ordering.lstrip('-'))]
+
+    def get_index_columns(self):
+        """Column lists of the model's plain (non-partial, non-expression) indexes"""
+        opts = self.model._meta
+        columns = [
+            list(index.fields) for index in opts.indexes
+            if index.fields and index.condition is None
+        ]
+        columns += [
+            list(constraint.fields) for constraint in opts.total_unique_constraints
+        ]
+        columns += [
+            [field.name] for field in opts.concrete_fields
+            if field.unique or field.primary_key or (field.is_relation and field.db_index)
+        ]
+        return [[name.lstrip('-') for name in fields] for fields in columns]
+
+    def is_index_backed(self, field_name, equality_fields):
+        for fields in self.get_index_columns():
+            # Leading columns pinned by equality filters can be skipped
+            position = 0
+            while position < len(fields) and fields[position] in equality_fields:
+                position += 1
+            if position < len(fields) and fields[position] == field_name:
+                return True
+        return False
+
+    def index_error(self, field_name):
+        """Explain which filters would make the request index-backed"""
+        param_names = {filter_.field_name: param for param, filter_ in self.filters.items()}
+        required = sorted({
+            ' + '.join(param_names.get(name, name) for name in fields[:fields.index(field_name)])
+            for fields in self.get_index_columns()
+            if field_name in fields[1:]
+        })
+        if not required:
+            return f'Filtering or ordering by {field_name} is not supported'
+        return f'Filtering or ordering by {field_name} requires filtering by one of: {", ".join(required)}'
+
+    def filter_queryset(self, queryset):
+        for param, value in self.cleaned_data.items():
+            queryset = self.filters[param].apply(queryset, value)
+
+        if self.search:
+            queryset = queryset.search(self.search)
+
+        if self.ordering:
+            queryset = queryset.order_by(self.ordering, '-id')
+
+        return queryset
+
+
+class UserFilter(FilterSet):
+    """Filters for user lists"""
+    model = User
+    filters = {
+        'role': Filter('role', field=UpperChoiceField(choices=User.ROLE_CHOICES)),
+        'branch': Filter('gym_branch', field=serializers.IntegerField()),
+        'created_after': Filter('created_at', 'gte', serializers.DateTimeField()),
+        'created_before': Filter('created_at', 'lte', serializers.DateTimeField()),
+    }
+    ordering_fields = ['created_at', 'email']
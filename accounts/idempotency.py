@@ -0,0 +1,125 @@
+import functools
+import hashlib
+import json
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+def request_fingerprint(request):
+    """Hash of what the request does, so a key cannot be replayed for a different payload"""
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f'{request.method} {request.path}\n{payload}'.encode()
+    ).hexdigest()
+
+
+def claim_key(user, key, fingerprint):
+    """
+    Insert the key row, which doubles as the lock for concurrent retries.
+    Returns (record, claimed); claimed is False when another request owns the key.
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic(using=router.db_for_write(IdempotencyKey)):
+            record = IdempotencyKey.objects.create(
+                user=user,
+                key=key,
+                request_hash=fingerprint,
+                created_at=now,
+                expires_at=now + IdempotencyKey.TTL
+            )
+        return record, True
+    except IntegrityError:
+        pass
+
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if record is None:
+        # Pruned in the meantime; let the client retry
+        return None, False
+
+    if record.is_expired or record.is_abandoned:
+        # Take over with a conditional update so only one retry wins
+        taken = IdempotencyKey.objects.filter(
+            pk=record.pk,
+            created_at=record.created_at
+        ).update(
+            request_hash=fingerprint,
+            status_code=None,
+            response_body=None,
+            created_at=now,
+            expires_at=now + IdempotencyKey.TTL
+        )
+        if taken:
+            record.request_hash = fingerprint
+            record.status_code = None
+            record.response_body = None
+            record.created_at = now
+            record.expires_at = now + IdempotencyKey.TTL
+            return record, True
+
+    return record, False
+
+
+def idempotent(view_method):
+    """
+    Make a create method (e.g. APIView.post) safe to retry with an Idempotency-Key header.
+
+    The first response for a key is stored and replayed for retries with the
+    same payload. A retry that arrives while the original is still running
+    gets 409, and reusing a key for a different payload gets 422. Server
+    errors are not stored, so those requests can be retried.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > 255:
+            return Response(
+                {'detail': f'{IDEMPOTENCY_HEADER} must be at most 255 characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        record, claimed = claim_key(request.user, key, fingerprint)
+
+        if not claimed:
+            # A different payload is a client error even while the first request runs
+            if record is not None and record.request_hash != fingerprint:
+                return Response(
+                    {'detail': 'This Idempotency-Key was already used for a different request'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if record is None or record.status_code is None:
+                return Response(
+                    {'detail': 'A request with this Idempotency-Key is still in progress'},
+                    status=status.HTTP_409_CONFLICT,
+                    headers={'Retry-After': '1'}
+                )
+            return Response(
+                record.response_body,
+                status=record.status_code,
+                headers={'Idempotent-Replayed': 'true'}
+            )
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['status_code', 'response_body'])
+        return response
+
+    return wrapper
@@ -0,0 +1,179 @@
+"""
+Bulk user import from CSV or JSON, for onboarding a branch in one go.
+
+Rows are read lazily and handled in batches: each batch is validated with a
+single query for emails that already exist, its passwords are hashed
+(optionally in a process pool, as PBKDF2 is deliberately slow and holds the
+GIL) and its users are inserted with one bulk_create. Every row gets an entry
+in the report.
+"""
+
+import codecs
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, router, transaction
+from gyms.sharding import gather
+from .models import User
+from .serializers import UserImportRowSerializer
+
+# Rows validated, hashed and inserted together
+BATCH_SIZE = 500
+
+# Largest import the API runs within the request: its passwords are hashed
+# in the request process (~0.4s each), which must finish within the
+# serverless request timeout
+MAX_ROWS = 20
+
+# Largest import accepted by the API; those above MAX_ROWS are queued for the
+# run_user_imports command. The import_users command has no limit.
+MAX_QUEUED_ROWS = 5000
+
+# Trainers allowed per branch (see GymBranch.can_add_trainer)
+MAX_TRAINERS = 3
+
+
+def read_upload(upload):
+    """
+    Rows of an uploaded .json file (a list of objects) or CSV file with an
+    email,password[,role] header. Returns (rows, count); raises ValueError
+    for unreadable files.
+    """
+    if upload.name.lower().endswith('.json'):
+        try:
+            rows = json.load(upload)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ValueError(f'Invalid JSON: {exc}')
+        if not isinstance(rows, list):
+            raise ValueError('A JSON import must be a list of users')
+        return rows, len(rows)
+
+    # Upper bound without parsing (quoted fields may span lines)
+    count = max(sum(1 for _ in upload) - 1, 0)
+    upload.seek(0)
+    return read_csv(codecs.iterdecode(upload, 'utf-8-sig')), count
+
+
+def read_csv(lines):
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or not {'email', 'password'} <= set(reader.fieldnames):
+        raise ValueError('CSV header must include email and password')
+    for row in reader:
+        # Blank cells count as missing, so the role falls back to its default
+        yield {key: value.strip() for key, value in row.items() if key and value and value.strip()}
+
+
+def hash_password(password):
+    return make_password(password)
+
+
+class UserImporter:
+    """Creates Trainers and Members in one branch from an iterable of row dicts"""
+
+    def __init__(self, gym_branch, workers=1, batch_size=BATCH_SIZE):
+        self.gym_branch = gym_branch
+        self.workers = workers
+        self.batch_size = batch_size
+        self.seen = set()
+        self.trainer_slots = MAX_TRAINERS - User.objects.filter(
+            gym_branch=gym_branch, role='TRAINER'
+        ).count()
+        self.report = {'received': 0, 'created': 0, 'failed': 0, 'rows': []}
+
+    def run(self, rows):
+        numbered = enumerate(rows, start=1)
+        pool = None
+        if self.workers > 1:
+            # Workers set Django up themselves when not forked from a configured process
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=django.setup)
+        try:
+            while True:
+                batch = list(islice(numbered, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.report['rows'].sort(key=lambda entry: entry['row'])
+        return self.report
+
+    def fail(self, row_number, email, errors):
+        self.report['failed'] += 1
+        self.report['rows'].append({'row': row_number, 'email': email, 'errors': errors})
+
+    def import_batch(self, batch, pool):
+        self.report['received'] += len(batch)
+        valid = []
+        for row_number, row in batch:
+            if not isinstance(row, dict):
+                self.fail(row_number, None, {'non_field_errors': ['Expected an object']})
+                continue
+            serializer = UserImportRowSerializer(data=row)
+            if not serializer.is_valid():
+                self.fail(row_number, row.get('email'), serializer.errors)
+                continue
+            data = serializer.validated_data
+            if data['email'] in self.seen:
+                self.fail(row_number, data['email'], {'email': ['Appears earlier in this import']})
+                continue
+            self.seen.add(data['email'])
+            valid.append((row_number, data))
+
+        # One query for the whole batch (per shard) instead of a unique check per row
+        existing = set(gather(User.objects.filter(
+            email__in=[data['email'] for _, data in valid]
+        ).values_list('email', flat=True)))
+
+        accepted = []
+        for row_number, data in valid:
+            if data['email'] in existing:
+                self.fail(row_number, data['email'], {'email': ['User with this email already exists.']})
+            elif data['role'] == 'TRAINER' and self.trainer_slots <= 0:
+                self.fail(row_number, data['email'], {'role': ['This gym branch already has 3 trainers.']})
+            else:
+                if data['role'] == 'TRAINER':
+                    self.trainer_slots -= 1
+                accepted.append((row_number, data))
+        if not accepted:
+            return
+
+        passwords = [data['password'] for _, data in accepted]
+        if pool is not None:
+            chunksize = max(len(passwords) // (self.workers * 4), 1)
+            hashes = list(pool.map(hash_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [hash_password(password) for password in passwords]
+
+        users = [
+            User(email=data['email'], role=data['role'], gym_branch=self.gym_branch, password=password_hash)
+            for (_, data), password_hash in zip(accepted, hashes)
+        ]
+        self.insert(accepted, users)
+
+    def insert(self, accepted, users):
+        try:
+            with transaction.atomic(using=router.db_for_write(User)):
+                User.objects.bulk_create(users)
+        except IntegrityError:
+            # Someone created one of these emails since the check; drop those and retry once
+            taken = set(gather(User.objects.filter(
+                email__in=[user.email for user in users]
+            ).values_list('email', flat=True)))
+            remaining = []
+            for (row_number, data), user in zip(accepted, users):
+                if user.email in taken:
+                    self.fail(row_number, user.email, {'email': ['User with this email already exists.']})
+                else:
+                    remaining.append(((row_number, data), user))
+            accepted = [entry for entry, _ in remaining]
+            users = [user for _, user in remaining]
+            with transaction.atomic(using=router.db_for_write(User)):
+                User.objects.bulk_create(users)
+
+        self.report['created'] += len(users)
+        for (row_number, data), user in zip(accepted, users):
+            self.report['rows'].append({'row': row_number, 'email': user.email, 'id': user.pk})
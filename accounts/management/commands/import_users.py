@@ -0,0 +1,63 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from accounts.imports import BATCH_SIZE, UserImporter, read_csv
+from gyms.models import GymBranch
+from gyms.sharding import use_branch_shard
+
+
+class Command(BaseCommand):
+    help = 'Create trainers and members of a gym branch from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV with an email,password[,role] header, or a .json list of users')
+        parser.add_argument('--branch', type=int, required=True, help='Gym branch id')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help=f'Number of users validated and inserted together (default: {BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            help='Password hashing processes (default: PASSWORD_HASH_WORKERS)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            branch = GymBranch.objects.get(pk=options['branch'])
+        except GymBranch.DoesNotExist:
+            raise CommandError(f'Gym branch {options["branch"]} not found')
+
+        if branch.is_moving:
+            raise CommandError(f'Gym branch {branch.id} is being moved to another database')
+
+        # Users are created on the branch's shard
+        with use_branch_shard(branch.pk):
+            importer = UserImporter(
+                branch,
+                workers=options['workers'] or settings.PASSWORD_HASH_WORKERS,
+                batch_size=options['batch_size']
+            )
+            self.stdout.write(f'Importing users into {branch.name} with {importer.workers} hashing process(es)...')
+
+            try:
+                with open(options['path'], newline='', encoding='utf-8-sig') as file:
+                    if options['path'].lower().endswith('.json'):
+                        rows = json.load(file)
+                        if not isinstance(rows, list):
+                            raise CommandError('A JSON import must be a list of users')
+                    else:
+                        rows = read_csv(file)
+                    report = importer.run(rows)
+            except (OSError, ValueError) as exc:
+                raise CommandError(str(exc))
+
+        for entry in report['rows']:
+            if 'errors' in entry:
+                errors = '; '.join(
+                    f'{field}: {" ".join(map(str, messages))}' for field, messages in entry['errors'].items()
+                )
+                self.stdout.write(f'  Row {entry["row"]} ({entry["email"]}): {errors}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Created {report["created"]} of {report["received"]} users ({report["failed"]} failed)'
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of keys deleted per statement (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        total = 0
+
+        while True:
+            # Oldest first over the expires_at index; each batch is a short delete
+            ids = list(
+                IdempotencyKey.objects.filter(
+                    expires_at__lte=now
+                ).order_by('expires_at').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            IdempotencyKey.objects.filter(id__in=ids, expires_at__lte=now).delete()
+            total += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Deleted {total} expired idempotency keys'))
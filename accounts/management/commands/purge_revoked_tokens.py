@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh tokens that have expired anyway, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of tokens deleted per statement (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        total = 0
+
+        while True:
+            # Oldest first over the expires_at index; each batch is a short delete
+            jtis = list(
+                RevokedToken.objects.filter(
+                    expires_at__lte=now
+                ).order_by('expires_at').values_list('jti', flat=True)[:batch_size]
+            )
+            if not jtis:
+                break
+
+            RevokedToken.objects.filter(jti__in=jtis).delete()
+            total += len(jtis)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Deleted {total} expired revoked tokens'))
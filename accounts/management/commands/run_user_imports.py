@@ -0,0 +1,58 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from accounts.imports import UserImporter
+from accounts.models import UserImport
+
+
+class Command(BaseCommand):
+    help = 'Run bulk user imports queued by the import endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            help='Password hashing processes (default: PASSWORD_HASH_WORKERS)'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait when nothing is queued (default: 5)'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once nothing is queued instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or settings.PASSWORD_HASH_WORKERS
+        if workers < 1:
+            raise CommandError('--workers must be at least 1')
+
+        self.stdout.write(f'Running user imports with {workers} hashing process(es)...')
+        count = 0
+
+        try:
+            while True:
+                # Several workers can run at once; each claims a different import
+                job = UserImport.objects.claim()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                self.stdout.write(f'  Import {job.pk}: {job.row_count} rows for branch {job.gym_branch_id}')
+                try:
+                    report = UserImporter(job.gym_branch, workers=workers).run(job.rows)
+                except Exception as exc:
+                    job.finish(UserImport.FAILED, {'detail': str(exc)})
+                    self.stderr.write(f'  Import {job.pk} failed: {exc}')
+                else:
+                    job.finish(UserImport.DONE, report)
+                    self.stdout.write(
+                        f'  Import {job.pk}: created {report["created"]} of {report["received"]} users'
+                    )
+                count += 1
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Ran {count} user imports'))
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_user_email_trgm'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['created_at'], name='users_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['gym_branch', 'created_at'], name='users_branch_created'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tokens_valid_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('jti', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'revoked_tokens',
+                'indexes': [models.Index(fields=['expires_at'], name='revoked_tokens_expires')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 21:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_token_revocation'),
+        ('gyms', '0003_gymbranch_database'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('row_count', models.PositiveIntegerField()),
+                ('rows', models.JSONField(blank=True, null=True)),
+                ('report', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('gym_branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_imports', to='gyms.gymbranch')),
+            ],
+            options={
+                'db_table': 'user_imports',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='user_imports_status')],
+            },
+        ),
+    ]
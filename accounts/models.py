@@ -1,9 +1,35 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import TrigramSimilarity
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, router, transaction
+from django.db.models.functions import Upper
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from gyms.sharding import exclude_moving
+from .tokens import ISSUED_AT_CLAIM
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Users visible to the given user: everyone for Super Admin, the branch for Managers"""
+        if user.role == 'SUPER_ADMIN':
+            # Users of branches scheduled for deletion are hidden
+            return self.exclude(gym_branch__deleted_at__isnull=False)
+        if user.role == 'MANAGER':
+            return self.filter(gym_branch_id=user.gym_branch_id)
+        return self.filter(pk=user.pk)
+    
+    def search(self, query):
+        """Case-insensitive email fragment search, best matches first"""
+        return self.filter(email__icontains=query).annotate(
+            rank=TrigramSimilarity('email', query)
+        ).order_by('-rank', '-created_at')
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('Email address is required')
@@ -43,6 +69,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Tokens issued up to this moment are rejected ("log out everywhere")
+    tokens_valid_after = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     objects = UserManager()
@@ -53,19 +81,227 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         db_table = 'users'
         ordering = ['-created_at']
+        indexes = [
+            # Serves email__icontains lookups, which compare UPPER(email)
+            GinIndex(
+                OpClass(Upper('email'), name='gin_trgm_ops'),
+                name='users_email_trgm'
+            ),
+            models.Index(fields=['created_at'], name='users_created'),
+            models.Index(fields=['gym_branch', 'created_at'], name='users_branch_created'),
+        ]
     
     def __str__(self):
         return f"{self.email} ({self.role})"
     
     def clean(self):
         # Super Admin should not have a gym branch
-        if self.role == 'SUPER_ADMIN' and self.gym_branch:
+        if self.role == 'SUPER_ADMIN' and self.gym_branch_id:
             raise ValidationError('Super Admin cannot be assigned to a gym branch')
         
         # Other roles must have a gym branch
-        if self.role != 'SUPER_ADMIN' and not self.gym_branch:
+        if self.role != 'SUPER_ADMIN' and not self.gym_branch_id:
             raise ValidationError(f'{self.get_role_display()} must be assigned to a gym branch')
     
     def save(self, *args, **kwargs):
         # self.full_clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+    
+    def revoke_all_tokens(self):
+        """Invalidate every access and refresh token issued to this user so far"""
+        self.tokens_valid_after = timezone.now()
+        self.save(update_fields=['tokens_valid_after'])
+    
+    def is_token_revoked(self, token):
+        if self.tokens_valid_after is None:
+            return False
+        issued_at = token.get(ISSUED_AT_CLAIM)
+        if issued_at is None:
+            # Older tokens only have iat, with one second precision, so tokens
+            # from the revoking second are rejected too
+            return token['iat'] <= int(self.tokens_valid_after.timestamp())
+        return issued_at <= self.tokens_valid_after.timestamp()
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a create request sent with an Idempotency-Key header.
+    The row is inserted before the request runs, so its unique constraint acts
+    as the lock for concurrent retries; the response is filled in afterwards
+    and replayed until the key expires.
+    """
+    # How long responses are kept for replay
+    TTL = timedelta(hours=24)
+    # In-progress keys older than this are treated as abandoned (e.g. worker crash)
+    LOCK_TIMEOUT = timedelta(seconds=60)
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=255)
+    # Hash of method, path and payload; a key cannot be reused for another request
+    request_hash = models.CharField(max_length=64)
+    # Empty while the original request is still running
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_keys_expires'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.key}"
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    @property
+    def is_abandoned(self):
+        return self.status_code is None and self.created_at <= timezone.now() - self.LOCK_TIMEOUT
+
+
+class UserImportQuerySet(models.QuerySet):
+    def claim(self):
+        """
+        Start the oldest queued import for the calling worker, or return None.
+        Imports locked by another worker are skipped, as are imports of
+        branches being moved; running imports whose worker died are taken
+        over after UserImport.LEASE.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            job = exclude_moving(self.filter(
+                models.Q(status=UserImport.PENDING) |
+                models.Q(status=UserImport.RUNNING, started_at__lte=now - UserImport.LEASE)
+            )).order_by('created_at').select_for_update(skip_locked=True, of=('self',)).first()
+            if job is None:
+                return None
+            job.status = UserImport.RUNNING
+            job.started_at = now
+            job.save(update_fields=['status', 'started_at'])
+        return job
+
+
+class UserImport(models.Model):
+    """
+    Bulk user import too large to run within a request, queued by the import
+    endpoint and run by the run_user_imports command. The rows hold
+    passwords, so they are cleared once the import has run.
+    """
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    # Running imports untouched for this long are taken over by another worker
+    LEASE = timedelta(hours=2)
+
+    gym_branch = models.ForeignKey(
+        'gyms.GymBranch',
+        on_delete=models.CASCADE,
+        related_name='user_imports'
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    row_count = models.PositiveIntegerField()
+    rows = models.JSONField(null=True, blank=True)
+    # Same format as the response of a synchronous import
+    report = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = UserImportQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'user_imports'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='user_imports_status'),
+        ]
+
+    def __str__(self):
+        return f"Import {self.pk} ({self.status})"
+
+    def finish(self, status, report):
+        self.status = status
+        self.report = report
+        self.rows = None
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'report', 'rows', 'finished_at'])
+
+
+class RevokedTokenManager(models.Manager):
+    def cache_key(self, jti):
+        return f'revoked_token:{jti}'
+
+    def revoke(self, token):
+        """
+        Revoke a refresh token until it expires. Returns False if it was
+        already revoked, e.g. a rotated token being replayed.
+        """
+        expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+        try:
+            with transaction.atomic():
+                self.create(jti=token['jti'], expires_at=expires_at)
+            revoked = True
+        except IntegrityError:
+            revoked = False
+        self.remember(token)
+        return revoked
+
+    def is_revoked(self, token):
+        """Cache hit for recently revoked tokens, else one primary key lookup"""
+        if cache.get(self.cache_key(token['jti'])):
+            return True
+        if self.filter(jti=token['jti']).exists():
+            self.remember(token)
+            return True
+        return False
+
+    def remember(self, token):
+        timeout = int(token['exp'] - timezone.now().timestamp())
+        if timeout > 0:
+            cache.set(self.cache_key(token['jti']), True, timeout)
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh tokens that were rotated or logged out. Rows are only needed until
+    the token would have expired anyway, so purge_revoked_tokens keeps the
+    table bounded.
+    """
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField()
+
+    objects = RevokedTokenManager()
+
+    class Meta:
+        db_table = 'revoked_tokens'
+        indexes = [
+            models.Index(fields=['expires_at'], name='revoked_tokens_expires'),
+        ]
+
+    def __str__(self):
+        return self.jti
@@ -56,12 +56,8 @@ class IsSameBranch(permissions.BasePermission):
         if request.user.role == 'SUPER_ADMIN':
             return True
         
-        # Check if object has gym_branch attribute
-        if hasattr(obj, 'gym_branch'):
-            return obj.gym_branch == request.user.gym_branch
-        
-        # For User objects, check their gym_branch
-        if hasattr(obj, 'role'):
-            return obj.gym_branch == request.user.gym_branch
+        # Compare ids so the related branch is never loaded
+        if hasattr(obj, 'gym_branch_id'):
+            return obj.gym_branch_id == request.user.gym_branch_id
         
         return False
\ No newline at end of file
@@ -1,7 +1,14 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
-from .models import User
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from config.routers import use_shard
+from gyms.sharding import gather, shard_for_branch
+from .filters import UpperChoiceField
+from .models import User, RevokedToken, UserImport
+from .tokens import BRANCH_CLAIM, RefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,6 +23,16 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at']
     
+    def validate_email(self, value):
+        """The unique constraint only covers one shard, so check the others too"""
+        if settings.DATABASE_SHARDS:
+            others = User.objects.filter(email=value)
+            if self.instance is not None:
+                others = others.exclude(pk=self.instance.pk)
+            if gather(others.values_list('pk', flat=True)[:1]):
+                raise serializers.ValidationError('user with this email already exists.')
+        return value
+    
     def validate_password(self, value):
         """Validate password strength"""
         try:
@@ -67,6 +84,35 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class UserImportRowSerializer(serializers.Serializer):
+    """One row of a bulk user import; the role defaults to Member"""
+    email = serializers.EmailField(max_length=254)
+    password = serializers.CharField()
+    role = UpperChoiceField(choices=['TRAINER', 'MEMBER'], default='MEMBER')
+
+    def validate_email(self, value):
+        return User.objects.normalize_email(value)
+
+    def validate(self, attrs):
+        try:
+            validate_password(attrs['password'], user=User(email=attrs['email'], role=attrs['role']))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'password': list(e.messages)})
+        return attrs
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """Queued bulk user import; the rows themselves are never returned"""
+
+    class Meta:
+        model = UserImport
+        fields = [
+            'id', 'status', 'row_count', 'report',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile (current user)"""
     gym_branch_name = serializers.CharField(source='gym_branch.name', read_only=True)
@@ -85,4 +131,52 @@ class UserProfileSerializer(serializers.ModelSerializer):
 class LoginSerializer(serializers.Serializer):
     """Serializer for login request"""
     email = serializers.EmailField()
-    password = serializers.CharField(write_only=True)
\ No newline at end of file
+    password = serializers.CharField(write_only=True)
+
+
+class RefreshTokenField(serializers.CharField):
+    """A refresh token string, returned as a verified RefreshToken"""
+
+    def to_internal_value(self, data):
+        try:
+            return RefreshToken(super().to_internal_value(data))
+        except TokenError as e:
+            raise InvalidToken(str(e))
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """
+    Issue a new access token; with ROTATE_REFRESH_TOKENS the refresh token is
+    replaced too and the old one revoked, so it can only be used once.
+    """
+    refresh = RefreshTokenField()
+
+    def validate(self, attrs):
+        token = attrs['refresh']
+        with use_shard(shard_for_branch(token.get(BRANCH_CLAIM))):
+            user = User.objects.filter(
+                pk=token[jwt_settings.USER_ID_CLAIM],
+                is_active=True
+            ).first()
+
+        if (
+            user is None or
+            user.is_token_revoked(token) or
+            RevokedToken.objects.is_revoked(token)
+        ):
+            raise InvalidToken('Token has been revoked')
+
+        if not jwt_settings.ROTATE_REFRESH_TOKENS:
+            return {'access': str(token.access_token)}
+
+        # Losing this race means another request already rotated the token
+        if jwt_settings.BLACKLIST_AFTER_ROTATION and not RevokedToken.objects.revoke(token):
+            raise InvalidToken('Token has been revoked')
+
+        refresh = RefreshToken.for_user(user)
+        return {'access': str(refresh.access_token), 'refresh': str(refresh)}
+
+
+class LogoutSerializer(serializers.Serializer):
+    """Serializer for logout request"""
+    refresh = RefreshTokenField()
@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+# Sliding window counter: the previous window's count is weighted by how much of
+# it still overlaps the sliding window. Checking and counting happen in one
+# atomic script, so a request costs a single round-trip to Redis.
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local previous_weight = tonumber(ARGV[2])
+if previous * previous_weight + current >= limit then
+    return 0
+end
+if redis.call('INCR', KEYS[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]) * 2)
+end
+return 1
+"""
+
+# After a failed call, skip Redis for this many seconds instead of waiting on timeouts
+STORE_RETRY_SECONDS = 5
+
+
+class RedisCounterStore:
+    """Shared sliding window counters in Redis"""
+
+    def __init__(self, url):
+        # Imported here so processes without a store never load the client
+        import redis
+
+        self.error_class = redis.RedisError
+        self.client = redis.Redis.from_url(
+            url,
+            socket_timeout=0.05,
+            socket_connect_timeout=0.05
+        )
+        self.script = self.client.register_script(SLIDING_WINDOW_SCRIPT)
+        self.unavailable_until = 0
+
+    @property
+    def available(self):
+        return time.monotonic() >= self.unavailable_until
+
+    def hit(self, key, limit, duration, now):
+        """
+        Count a request if it fits in the window; returns whether it was
+        allowed, or None when the store could not be reached.
+        """
+        window = int(now // duration)
+        elapsed = (now % duration) / duration
+        try:
+            allowed = self.script(
+                keys=[f'{key}:{window}', f'{key}:{window - 1}'],
+                args=[limit, 1 - elapsed, duration]
+            )
+        except self.error_class:
+            self.unavailable_until = time.monotonic() + STORE_RETRY_SECONDS
+            return None
+        return bool(allowed)
+
+
+class LocalTokenBucket:
+    """Per-process token buckets, used when the shared store is unavailable"""
+
+    max_keys = 10000
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def hit(self, key, limit, duration, now):
+        refill_rate = limit / duration
+        with self.lock:
+            tokens, updated_at = self.buckets.pop(key, (limit, now))
+            tokens = min(limit, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return allowed
+
+
+_store = None
+_store_lock = threading.Lock()
+local_buckets = LocalTokenBucket()
+
+
+def get_store():
+    global _store
+    if _store is None and settings.THROTTLE_REDIS_URL:
+        with _store_lock:
+            if _store is None:
+                _store = RedisCounterStore(settings.THROTTLE_REDIS_URL)
+    return _store
+
+
+def hit(key, limit, duration, now):
+    store = get_store()
+    if store is not None and store.available:
+        allowed = store.hit(key, limit, duration, now)
+        if allowed is not None:
+            return allowed
+    return local_buckets.hit(key, limit, duration, now)
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Scoped throttle on the shared counter store (THROTTLE_REDIS_URL), so limits
+    hold across workers. Falls back to a local token bucket per process when
+    the store is not configured or unreachable.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        return hit(self.key, self.num_requests, self.duration, self.now)
+
+    def wait(self):
+        # Upper bound: by the end of the current window the oldest requests have aged out
+        return self.duration - (self.now % self.duration)
+
+
+class AnonThrottle(SlidingWindowThrottle):
+    """Anonymous requests per client IP"""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
+
+
+class LoginThrottle(SlidingWindowThrottle):
+    """Login attempts per email and client IP, separate from other anonymous traffic"""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        # Bodies that are not objects are rejected by the view with a 400
+        data = request.data if isinstance(request.data, dict) else {}
+        email = str(data.get('email', '')).strip().lower()
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': f'{email}:{self.get_ident(request)}'
+        }
+
+
+class BranchWriteThrottle(SlidingWindowThrottle):
+    """Writes shared by everyone in a gym branch (Super Admins count per user)"""
+    scope = 'branch_write'
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        user = request.user
+        if not user or not user.is_authenticated:
+            return None
+        if user.gym_branch_id:
+            ident = f'branch-{user.gym_branch_id}'
+        else:
+            ident = f'user-{user.pk}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class RoleReadThrottle(SlidingWindowThrottle):
+    """Reads per user, with the rate taken from the read_<role> scope"""
+    scope = 'read_member'
+
+    def allow_request(self, request, view):
+        user = request.user
+        if request.method not in SAFE_METHODS or not user or not user.is_authenticated:
+            return True
+
+        self.scope = f'read_{user.role.lower()}'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': request.user.pk
+        }
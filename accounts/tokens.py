@@ -0,0 +1,20 @@
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+# Branch of the token's user, so requests can be routed to the branch's shard
+# before the user is loaded (see gyms.sharding)
+BRANCH_CLAIM = 'gym_branch'
+
+# Issue time with sub-second precision (iat is whole seconds), so tokens
+# issued right after a revocation are told apart from the revoked ones
+ISSUED_AT_CLAIM = 'issued_at'
+
+
+class RefreshToken(BaseRefreshToken):
+    """Refresh token whose access tokens carry the user's branch and issue time"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[BRANCH_CLAIM] = user.gym_branch_id
+        token[ISSUED_AT_CLAIM] = token.current_time.timestamp()
+        return token
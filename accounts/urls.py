@@ -1,11 +1,26 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
-from .views import LoginView, CurrentUserView, UserListCreateView, SuperAdminUserView
+from .views import (
+    LoginView,
+    TokenRefreshView,
+    LogoutView,
+    LogoutAllView,
+    CurrentUserView,
+    UserListCreateView,
+    UserImportView,
+    UserImportDetailView,
+    UserSessionRevokeView,
+    SuperAdminUserView
+)
 
 urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('logout/', LogoutView.as_view(), name='logout'),
+    path('logout-all/', LogoutAllView.as_view(), name='logout_all'),
     path('me/', CurrentUserView.as_view(), name='current_user'),
     path('users/', UserListCreateView.as_view(), name='user_list_create'),
+    path('users/import/', UserImportView.as_view(), name='user_import'),
+    path('users/import/<int:pk>/', UserImportDetailView.as_view(), name='user_import_detail'),
+    path('users/<int:pk>/revoke-sessions/', UserSessionRevokeView.as_view(), name='user_revoke_sessions'),
     path('admin/users/', SuperAdminUserView.as_view(), name='admin_user_management'),
 ]
\ No newline at end of file
@@ -2,16 +2,31 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.contrib.auth import authenticate
-from .models import User
-from .serializers import UserSerializer, UserProfileSerializer, LoginSerializer
+from django.urls import reverse
+from gyms.sharding import gather, scatter, use_branch_shard
+from .models import User, RevokedToken, UserImport
+from .serializers import (
+    UserSerializer,
+    UserProfileSerializer,
+    LoginSerializer,
+    TokenRefreshSerializer,
+    LogoutSerializer,
+    UserImportSerializer
+)
 from .permissions import IsManager, IsSuperAdmin
+from .filters import UserFilter
+from .idempotency import idempotent
+from .imports import MAX_QUEUED_ROWS, MAX_ROWS, UserImporter, read_upload
+from .throttling import LoginThrottle
+from .tokens import RefreshToken
 from rest_framework.pagination import PageNumberPagination
 
 class LoginView(APIView):
     """User login endpoint"""
     permission_classes = [AllowAny]
+    throttle_classes = [LoginThrottle]
     
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -44,6 +59,77 @@ class LoginView(APIView):
         })
 
 
+class TokenRefreshView(APIView):
+    """Exchange a refresh token for new tokens; the old refresh token stops working"""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    
+    def get_authenticate_header(self, request):
+        # Keep rejected tokens a 401 even though the view has no authenticators
+        return f'{jwt_settings.AUTH_HEADER_TYPES[0]} realm="api"'
+    
+    def post(self, request):
+        serializer = TokenRefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.validated_data)
+
+
+class LogoutView(APIView):
+    """Revoke the given refresh token (log out this session)"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        token = serializer.validated_data['refresh']
+        if str(token[jwt_settings.USER_ID_CLAIM]) != str(request.user.pk):
+            return Response(
+                {'detail': 'Token does not belong to the current user'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        RevokedToken.objects.revoke(token)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LogoutAllView(APIView):
+    """Revoke every token of the current user (log out everywhere)"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        request.user.revoke_all_tokens()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserSessionRevokeView(APIView):
+    """
+    Revoke every token of a user
+    Super Admin can revoke any user, Manager users of their branch
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        if request.user.role not in ['SUPER_ADMIN', 'MANAGER']:
+            return Response(
+                {'detail': 'Only managers and super admins can revoke sessions'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # Super Admins can reach users on any database
+        users = gather(User.objects.for_user(request.user).filter(pk=pk))
+        if not users:
+            return Response(
+                {'detail': 'User not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        user = users[0]
+        with use_branch_shard(user.gym_branch_id, writing=True):
+            user.revoke_all_tokens()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class CurrentUserView(APIView):
     """Get current user profile"""
     permission_classes = [IsAuthenticated]
@@ -62,14 +148,16 @@ class UserListCreateView(APIView):
     
     def get(self, request):
         """List all users in manager's branch"""
-        users = User.objects.filter(
-            gym_branch=request.user.gym_branch
-        ).select_related('gym_branch')
-        
-        # Optional role filter
-        role = request.query_params.get('role')
-        if role:
-            users = users.filter(role=role.upper())
+        users = User.objects.for_user(request.user).select_related('gym_branch')
+        
+        # Optional filters, ordering and email search
+        filterset = UserFilter(request.query_params, scope_fields=['gym_branch'])
+        if not filterset.is_valid():
+            return Response(
+                filterset.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        users = filterset.filter_queryset(users)
     
         paginator = PageNumberPagination()
 
@@ -77,6 +165,7 @@ class UserListCreateView(APIView):
         serializer = UserSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
     
+    @idempotent
     def post(self, request):
         """Create trainer or member for manager's branch"""
         data = request.data.copy()
@@ -108,6 +197,98 @@ class UserListCreateView(APIView):
         )
 
 
+class UserImportView(APIView):
+    """
+    Manager creates trainers and members for their branch in bulk, from an
+    uploaded CSV/JSON file ("file") or a JSON list of users. Up to MAX_ROWS
+    users are created within the request; larger imports are queued.
+    """
+    permission_classes = [IsAuthenticated, IsManager]
+    
+    def post(self, request):
+        """Import users; returns a report with the outcome of every row, or 202 for a queued import"""
+        upload = request.FILES.get('file')
+        if upload is not None:
+            try:
+                rows, count = read_upload(upload)
+            except ValueError as exc:
+                return Response(
+                    {'file': [str(exc)]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            rows = request.data.get('users') if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                return Response(
+                    {'detail': 'Upload a CSV or JSON file as "file", or send a list of users'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            count = len(rows)
+        
+        if count > MAX_QUEUED_ROWS:
+            return Response(
+                {'detail': f'At most {MAX_QUEUED_ROWS} users can be imported at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if count > MAX_ROWS:
+            return self.queue(request, rows)
+        
+        try:
+            report = UserImporter(request.user.gym_branch).run(rows)
+        except ValueError as exc:
+            return Response(
+                {'file': [str(exc)]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            report,
+            status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK
+        )
+    
+    def queue(self, request, rows):
+        """Store the rows for the run_user_imports command"""
+        try:
+            rows = list(rows)
+        except ValueError as exc:
+            return Response(
+                {'file': [str(exc)]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = UserImport.objects.create(
+            gym_branch=request.user.gym_branch,
+            created_by=request.user,
+            row_count=len(rows),
+            rows=rows
+        )
+        return Response(
+            {
+                'detail': 'Import queued',
+                'id': job.pk,
+                'progress_url': reverse('user_import_detail', args=[job.pk])
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class UserImportDetailView(APIView):
+    """
+    Progress of a queued user import (Manager of its branch)
+    """
+    permission_classes = [IsAuthenticated, IsManager]
+    
+    def get(self, request, pk):
+        """Status of the import, with its report once it has run"""
+        job = UserImport.objects.filter(pk=pk, gym_branch_id=request.user.gym_branch_id).first()
+        if not job:
+            return Response(
+                {'detail': 'Import not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(UserImportSerializer(job).data)
+
+
 class SuperAdminUserView(APIView):
     """
     Super Admin can create managers and view all users
@@ -116,23 +297,25 @@ class SuperAdminUserView(APIView):
     
     def get(self, request):
         """List all users (Super Admin can see all)"""
-        users = User.objects.all().select_related('gym_branch')
-        
-        # Optional filters
-        role = request.query_params.get('role')
-        branch_id = request.query_params.get('branch')
+        users = User.objects.for_user(request.user).select_related('gym_branch')
         
-        if role:
-            users = users.filter(role=role.upper())
-        if branch_id:
-            users = users.filter(gym_branch_id=branch_id)
+        # Optional filters, ordering and email search
+        filterset = UserFilter(request.query_params)
+        if not filterset.is_valid():
+            return Response(
+                filterset.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        users = filterset.filter_queryset(users)
         
         paginator = PageNumberPagination()
 
-        page = paginator.paginate_queryset(users, request)
+        # Users of every shard, merged in the requested order
+        page = paginator.paginate_queryset(scatter(users), request)
         serializer = UserSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
     
+    @idempotent
     def post(self, request):
         """Create manager or any other user"""
         data = request.data.copy()
@@ -154,7 +337,9 @@ class SuperAdminUserView(APIView):
         
         serializer = UserSerializer(data=data)
         if serializer.is_valid():
-            user = serializer.save()
+            # Created on the shard of the user's branch
+            with use_branch_shard(serializer.validated_data['gym_branch'].pk, writing=True):
+                user = serializer.save()
             return Response(
                 UserSerializer(user).data,
                 status=status.HTTP_201_CREATED
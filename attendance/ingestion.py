@@ -0,0 +1,114 @@
+"""
+Check-in ingestion: repeated scans are dropped, accepted scans are inserted
+in bulk, and the live occupancy of each branch is kept as a cache counter.
+"""
+
+from collections import Counter
+from django.core.cache import cache
+from django.utils import timezone
+from accounts.models import User
+from .models import CheckIn
+
+# A member scanning the same direction again within this window is a repeated scan
+DEDUPE_SECONDS = 60
+
+# Occupancy counters are per local day, so they reset overnight
+OCCUPANCY_TIMEOUT = 60 * 60 * 26
+
+
+def last_scan_key(member_id, direction):
+    return f'check_in:last:{member_id}:{direction}'
+
+
+def occupancy_key(gym_branch_id, day):
+    return f'check_in:occupancy:{gym_branch_id}:{day.isoformat()}'
+
+
+def get_occupancy(gym_branch_id):
+    """Current occupancy of a branch, seeded from today's check-ins on a cache miss"""
+    key = occupancy_key(gym_branch_id, timezone.localdate())
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, CheckIn.objects.occupancy(gym_branch_id, timezone.localdate()), OCCUPANCY_TIMEOUT)
+        value = cache.get(key, 0)
+    # Exits of members who entered before midnight can push the count below zero
+    return max(value, 0)
+
+
+def adjust_occupancy(deltas):
+    today = timezone.localdate()
+    for gym_branch_id, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(occupancy_key(gym_branch_id, today), delta)
+        except ValueError:
+            # Not cached yet: the seed is read from the table, which already has these rows
+            get_occupancy(gym_branch_id)
+
+
+def drop_repeated_scans(events):
+    """
+    Split scans into new ones and repeats of a scan by the same member and
+    direction within DEDUPE_SECONDS, in this batch or a recent one. Returns
+    the new scans and the last-scan cache entries to store once they are saved.
+    """
+    keys = {last_scan_key(event['member'], event['direction']) for event in events}
+    last_seen = cache.get_many(keys)
+    accepted = []
+    updates = {}
+    for event in sorted(events, key=lambda event: event['scanned_at']):
+        key = last_scan_key(event['member'], event['direction'])
+        scanned_at = event['scanned_at'].timestamp()
+        previous = last_seen.get(key)
+        if previous is not None and abs(scanned_at - previous) < DEDUPE_SECONDS:
+            continue
+        last_seen[key] = updates[key] = scanned_at
+        accepted.append(event)
+    return accepted, updates
+
+
+def ingest_check_ins(gym_branch_id, events):
+    """
+    Record a batch of validated scans for a branch. Scans of users who are not
+    active members of the branch are rejected; returns a summary of the batch.
+    """
+    member_ids = {event['member'] for event in events}
+    members = set(User.objects.filter(
+        pk__in=member_ids,
+        role='MEMBER',
+        gym_branch_id=gym_branch_id,
+        is_active=True
+    ).values_list('pk', flat=True))
+
+    rejected = [
+        {'index': index, 'detail': 'Not an active member of this gym branch'}
+        for index, event in enumerate(events)
+        if event['member'] not in members
+    ]
+    accepted, last_scans = drop_repeated_scans([
+        event for event in events if event['member'] in members
+    ])
+
+    inserted = CheckIn.objects.ingest([
+        (event['member'], gym_branch_id, event['direction'], event['scanned_at'])
+        for event in accepted
+    ])
+    # Only remembered once stored, so a failed batch can be resent as is
+    cache.set_many(last_scans, DEDUPE_SECONDS)
+
+    # Late scans from earlier days do not change today's occupancy
+    today = timezone.localdate()
+    directions = Counter(
+        direction for _, direction, scanned_at in inserted
+        if timezone.localdate(scanned_at) == today
+    )
+    adjust_occupancy({gym_branch_id: directions[CheckIn.IN] - directions[CheckIn.OUT]})
+
+    return {
+        'received': len(events),
+        'recorded': len(inserted),
+        'duplicates': len(events) - len(rejected) - len(inserted),
+        'rejected': rejected,
+        'occupancy': get_occupancy(gym_branch_id),
+    }
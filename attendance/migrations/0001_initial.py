@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('gyms', '0002_gymbranch_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckIn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('direction', models.PositiveSmallIntegerField(choices=[(1, 'IN'), (2, 'OUT')])),
+                ('scanned_at', models.DateTimeField()),
+                ('gym_branch', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='gyms.gymbranch')),
+                ('member', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'check_ins',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['gym_branch', 'scanned_at'], name='check_ins_branch')],
+                'constraints': [models.UniqueConstraint(fields=('member', 'scanned_at', 'direction'), name='unique_check_in_scan')],
+            },
+        ),
+    ]
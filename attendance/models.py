@@ -0,0 +1,108 @@
+from datetime import datetime, time
+from django.db import connections, models, router
+from django.db.models import Count, Q
+from django.utils import timezone
+from accounts.models import User
+from gyms.models import GymBranch
+
+
+class CheckInQuerySet(models.QuerySet):
+    # Rows per INSERT statement
+    INSERT_BATCH_SIZE = 1000
+
+    def for_user(self, user):
+        """Check-ins visible to the given user"""
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(gym_branch__deleted_at__isnull=True)
+        if user.role == 'MEMBER':
+            return self.filter(member_id=user.pk)
+        if user.role in ['MANAGER', 'TRAINER']:
+            return self.filter(gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def ingest(self, rows):
+        """
+        Store (member_id, gym_branch_id, direction, scanned_at) tuples with
+        multi-row INSERTs. Scans that are already stored (e.g. a turnstile
+        resending a batch) are skipped. Returns (gym_branch_id, direction,
+        scanned_at) of the rows actually inserted.
+        """
+        table = self.model._meta.db_table
+        connection = connections[router.db_for_write(self.model)]
+        inserted = []
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.INSERT_BATCH_SIZE):
+                chunk = rows[start:start + self.INSERT_BATCH_SIZE]
+                values = ', '.join(['(%s, %s, %s, %s)'] * len(chunk))
+                cursor.execute(
+                    f'INSERT INTO {table} (member_id, gym_branch_id, direction, scanned_at) '
+                    f'VALUES {values} '
+                    'ON CONFLICT (member_id, scanned_at, direction) DO NOTHING '
+                    'RETURNING gym_branch_id, direction, scanned_at',
+                    [value for row in chunk for value in row]
+                )
+                inserted += cursor.fetchall()
+        return inserted
+
+    def occupancy(self, gym_branch_id, day):
+        """Entries minus exits at the branch on the given local day"""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        counts = self.filter(
+            gym_branch_id=gym_branch_id,
+            scanned_at__gte=start
+        ).aggregate(
+            entries=Count('id', filter=Q(direction=CheckIn.IN)),
+            exits=Count('id', filter=Q(direction=CheckIn.OUT))
+        )
+        return counts['entries'] - counts['exits']
+
+
+class CheckIn(models.Model):
+    """
+    Turnstile scans, append-only. Rows are written in bulk by the ingestion
+    endpoint without model validation, and references carry no database
+    constraints to keep inserts cheap at peak hours.
+    """
+    IN = 1
+    OUT = 2
+
+    DIRECTION_CHOICES = [
+        (IN, 'IN'),
+        (OUT, 'OUT'),
+    ]
+
+    member = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    gym_branch = models.ForeignKey(
+        GymBranch,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    direction = models.PositiveSmallIntegerField(choices=DIRECTION_CHOICES)
+    scanned_at = models.DateTimeField()
+
+    objects = CheckInQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'check_ins'
+        ordering = ['-id']
+        constraints = [
+            # A resent scan is the same member, direction and timestamp; also serves member history
+            models.UniqueConstraint(
+                fields=['member', 'scanned_at', 'direction'],
+                name='unique_check_in_scan'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['gym_branch', 'scanned_at'], name='check_ins_branch'),
+        ]
+
+    def __str__(self):
+        return f"{self.member_id} {self.get_direction_display()} at {self.scanned_at}"
@@ -0,0 +1,51 @@
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework import serializers
+from accounts.filters import UpperChoiceField
+from .models import CheckIn
+
+
+class CheckInSerializer(serializers.ModelSerializer):
+    direction = serializers.CharField(source='get_direction_display', read_only=True)
+
+    class Meta:
+        model = CheckIn
+        fields = ['id', 'member', 'gym_branch', 'direction', 'scanned_at']
+        read_only_fields = fields
+
+
+class CheckInEventSerializer(serializers.Serializer):
+    """One turnstile scan in an ingestion batch"""
+    # Tolerated difference between turnstile and server clocks
+    MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+    member = serializers.IntegerField(min_value=1)
+    direction = UpperChoiceField(choices=[label for _, label in CheckIn.DIRECTION_CHOICES])
+    scanned_at = serializers.DateTimeField()
+
+    def validate_direction(self, value):
+        return CheckIn.IN if value == 'IN' else CheckIn.OUT
+
+    def validate_scanned_at(self, value):
+        if value > timezone.now() + self.MAX_CLOCK_SKEW:
+            raise serializers.ValidationError('Scan time cannot be in the future')
+        return value
+
+
+class CheckInBatchSerializer(serializers.Serializer):
+    """A batch of scans from one gym branch"""
+    MAX_EVENTS = 1000
+
+    gym_branch = serializers.IntegerField(required=False)
+    events = CheckInEventSerializer(many=True, allow_empty=False, max_length=MAX_EVENTS)
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        if user.role == 'SUPER_ADMIN':
+            if 'gym_branch' not in attrs:
+                raise serializers.ValidationError({'gym_branch': 'This field is required.'})
+        elif attrs.setdefault('gym_branch', user.gym_branch_id) != user.gym_branch_id:
+            raise serializers.ValidationError({
+                'gym_branch': 'You can only record check-ins for your own gym branch'
+            })
+        return attrs
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import CheckInListCreateView, BranchOccupancyView
+
+urlpatterns = [
+    path('check-ins/', CheckInListCreateView.as_view(), name='check_in_list_create'),
+    path('branches/<int:pk>/occupancy/', BranchOccupancyView.as_view(), name='branch_occupancy'),
+]
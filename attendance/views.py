@@ -0,0 +1,82 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import PageNumberPagination
+from django.utils import timezone
+from gyms.models import GymBranch
+from .models import CheckIn
+from .serializers import CheckInSerializer, CheckInBatchSerializer
+from .ingestion import ingest_check_ins, get_occupancy
+
+
+class CheckInListCreateView(APIView):
+    """
+    GET: List check-ins (filtered by role), ?member=<id> for one member
+    POST: Record a batch of turnstile scans (Manager or Super Admin)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        check_ins = CheckIn.objects.for_user(request.user)
+
+        member = request.query_params.get('member')
+        if member:
+            if not member.isdigit():
+                return Response(
+                    {'member': ['Must be a user id']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            check_ins = check_ins.filter(member_id=int(member))
+
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(check_ins.order_by('-id'), request)
+        serializer = CheckInSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def post(self, request):
+        if request.user.role not in ['SUPER_ADMIN', 'MANAGER']:
+            return Response(
+                {'detail': 'Only managers can record check-ins'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = CheckInBatchSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            gym_branch_id = serializer.validated_data['gym_branch']
+            if not GymBranch.objects.filter(pk=gym_branch_id).exists():
+                return Response(
+                    {'detail': 'Gym branch not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            result = ingest_check_ins(gym_branch_id, serializer.validated_data['events'])
+            return Response(result, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BranchOccupancyView(APIView):
+    """
+    Members currently in a gym branch (entries minus exits today)
+    Visible to users of the branch and Super Admins
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        user = request.user
+        if user.role != 'SUPER_ADMIN' and user.gym_branch_id != pk:
+            return Response(
+                {'detail': 'Gym branch not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if not GymBranch.objects.filter(pk=pk).exists():
+            return Response(
+                {'detail': 'Gym branch not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response({
+            'gym_branch': pk,
+            'date': timezone.localdate(),
+            'occupancy': get_occupancy(pk),
+        })
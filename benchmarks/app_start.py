@@ -0,0 +1,86 @@
+"""
+App start latency: the mobile app's launch requests one by one versus one batch.
+
+Logs in against a running server, then repeatedly loads the launch requests
+(profile, pending and in-progress tasks, plans) sequentially and through
+/api/batch/, over a fresh connection per request like a mobile client. The
+report adds --rtt per round trip to the measured times, to estimate the
+latency on a slow link.
+
+Usage:
+    python benchmarks/app_start.py --email member@gmail.com --password Member@123 [--runs 20] [--rtt 0.15]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from urllib.request import Request, urlopen
+
+LAUNCH_PATHS = [
+    '/api/auth/me/',
+    '/api/workouts/tasks/?status=PENDING',
+    '/api/workouts/tasks/?status=IN_PROGRESS',
+    '/api/workouts/plans/',
+]
+
+
+def call(url, token=None, payload=None):
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(payload).encode() if payload is not None else None
+    with urlopen(Request(url, data=data, headers=headers)) as response:
+        return json.loads(response.read() or 'null')
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--rtt', type=float, default=0.15, help='Round trip time added per request, in seconds')
+    args = parser.parse_args()
+
+    token = call(f'{args.url}/api/auth/login/', payload={'email': args.email, 'password': args.password})['access']
+
+    def sequential():
+        for path in LAUNCH_PATHS:
+            try:
+                call(f'{args.url}{path}', token)
+            except OSError:
+                # e.g. 403 on plans for members; the round trip still counts
+                pass
+
+    def batch():
+        result = call(f'{args.url}/api/batch/', token, {'requests': [{'path': path} for path in LAUNCH_PATHS]})
+        assert len(result['responses']) == len(LAUNCH_PATHS), result
+
+    # Warm up both paths (imports, connection setup)
+    sequential()
+    batch()
+
+    # Interleaved, so both see the same server conditions
+    sequential_times, batch_times = [], []
+    for _ in range(args.runs):
+        sequential_times.append(timed(sequential))
+        batch_times.append(timed(batch))
+
+    rows = [
+        ('sequential', statistics.median(sequential_times), len(LAUNCH_PATHS)),
+        ('batch', statistics.median(batch_times), 1),
+    ]
+    print(f'{"mode":<12}{"server":>10}{"round trips":>14}{f"at {args.rtt * 1000:.0f}ms rtt":>16}')
+    for mode, seconds, round_trips in rows:
+        print(f'{mode:<12}{seconds * 1000:>8.1f}ms{round_trips:>14}{(seconds + round_trips * args.rtt) * 1000:>14.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Concurrency test for class session booking.
+
+Creates a throwaway branch with one class session and many members, then has
+every member book the session at once from a thread pool (one database
+connection per thread), and cancels some bookings concurrently so the
+waitlist gets promoted. Checks that the session is never oversold, that seat
+counts match the bookings and that the waitlist keeps its order, and reports
+throughput. Everything created is deleted afterwards.
+
+Needs a database with migrations applied:
+    python benchmarks/booking_contention.py [--members 300] [--capacity 50] [--threads 50]
+"""
+
+import argparse
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from accounts.models import User  # noqa: E402
+from gyms.models import GymBranch  # noqa: E402
+from workouts.models import WorkoutPlan, ClassSession, ClassBooking  # noqa: E402
+
+
+def create_fixtures(members, capacity):
+    tag = uuid.uuid4().hex[:8]
+    branch = GymBranch.objects.create(name=f'Booking benchmark {tag}', location='-')
+    password = make_password(None)
+    trainer = User.objects.create(
+        email=f'trainer-{tag}@benchmark.local', password=password,
+        role='TRAINER', gym_branch=branch
+    )
+    plan = WorkoutPlan.objects.create(
+        title='Benchmark class', description='-', created_by=trainer, gym_branch=branch
+    )
+    starts_at = timezone.now() + timedelta(days=1)
+    session = ClassSession.objects.create(
+        workout_plan=plan, trainer=trainer, capacity=capacity,
+        starts_at=starts_at, ends_at=starts_at + timedelta(hours=1)
+    )
+    User.objects.bulk_create([
+        User(
+            email=f'member-{tag}-{index}@benchmark.local', password=password,
+            role='MEMBER', gym_branch=branch
+        )
+        for index in range(members)
+    ])
+    member_list = list(User.objects.filter(gym_branch=branch, role='MEMBER').order_by('id'))
+    return branch, session, member_list
+
+
+def run_concurrently(function, items, threads):
+    """Call function on every item from a pool of threads; returns (result, latency) pairs and wall time"""
+    work = queue.Queue()
+    for index, item in enumerate(items):
+        work.put((index, item))
+    results = [None] * len(items)
+
+    def worker():
+        try:
+            while True:
+                try:
+                    index, item = work.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.perf_counter()
+                results[index] = (function(item), time.perf_counter() - started)
+        finally:
+            # Each thread opened its own connection
+            connection.close()
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def check(label, ok, failures):
+    print(f'  [{"ok" if ok else "FAIL"}] {label}')
+    if not ok:
+        failures.append(label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--members', type=int, default=300)
+    parser.add_argument('--capacity', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--cancel', type=int, default=20,
+                        help='Booked seats cancelled concurrently in the second phase')
+    args = parser.parse_args()
+
+    branch, session, members = create_fixtures(args.members, args.capacity)
+    failures = []
+    try:
+        # Phase 1: everyone books at once
+        results, elapsed = run_concurrently(
+            lambda member: ClassBooking.objects.book(session, member),
+            members, args.threads
+        )
+        latencies = [latency for _, latency in results]
+        print(f'Booking: {len(results)} requests from {args.threads} threads in {elapsed:.2f}s '
+              f'({len(results) / elapsed:.0f}/s), latency p50 {statistics.median(latencies) * 1000:.1f}ms '
+              f'p95 {percentile(latencies, 0.95) * 1000:.1f}ms')
+
+        bookings = ClassBooking.objects.filter(session=session)
+        booked = bookings.filter(status=ClassBooking.BOOKED).count()
+        waitlisted = bookings.filter(status=ClassBooking.WAITLISTED).count()
+        session.refresh_from_db()
+        expected_booked = min(args.capacity, args.members)
+        check(f'{booked} booked == {expected_booked}', booked == expected_booked, failures)
+        check(f'{waitlisted} waitlisted == {args.members - expected_booked}',
+              waitlisted == args.members - expected_booked, failures)
+        check(f'seats_taken {session.seats_taken} == booked', session.seats_taken == booked, failures)
+
+        # Phase 2: cancel booked seats concurrently; the oldest waitlisted bookings take them
+        to_cancel = list(bookings.filter(status=ClassBooking.BOOKED).order_by('?')[:args.cancel])
+        next_in_line = list(
+            bookings.filter(status=ClassBooking.WAITLISTED).order_by('id')
+            .values_list('id', flat=True)[:len(to_cancel)]
+        )
+        results, elapsed = run_concurrently(ClassBooking.objects.cancel, to_cancel, args.threads)
+        print(f'Cancelling: {len(results)} requests in {elapsed:.2f}s')
+
+        session.refresh_from_db()
+        booked_ids = set(bookings.filter(status=ClassBooking.BOOKED).values_list('id', flat=True))
+        booked = len(booked_ids)
+        expected_booked = min(args.capacity, args.members - len(to_cancel))
+        check(f'{booked} booked == {expected_booked} after cancellations',
+              booked == expected_booked, failures)
+        check(f'seats_taken {session.seats_taken} == booked', session.seats_taken == booked, failures)
+        check('waitlist promoted oldest first', set(next_in_line) <= booked_ids, failures)
+    finally:
+        GymBranch.all_objects.filter(pk=branch.pk).delete()
+
+    if failures:
+        print(f'{len(failures)} check(s) failed')
+        sys.exit(1)
+    print('All checks passed')
+
+
+if __name__ == '__main__':
+    main()
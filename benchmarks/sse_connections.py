@@ -0,0 +1,167 @@
+"""
+Load test for the task event stream (GET /api/workouts/tasks/stream/).
+
+Opens many idle SSE connections as one user against a running ASGI server,
+holds them, then creates a task through the API and measures how long it
+takes to reach every stream. With --pid, the server's memory is sampled
+before and after connecting to report the cost per idle connection.
+
+Start the server first (one worker), e.g.:
+    ulimit -n 65536
+    uvicorn config.asgi:application --port 8000 --workers 1 --no-access-log
+
+Then, as a trainer so the new task reaches all streams:
+    python benchmarks/sse_connections.py --email trainer@gmail.com --password Trainer@123 \\
+        --connections 5000 --plan 1 --member 7 --pid <uvicorn pid>
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+import urllib.request
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+STREAM_PATH = '/api/workouts/tasks/stream/'
+
+
+def api_request(base_url, path, payload, token=None):
+    request = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def rss_kb(pid):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def raise_file_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+class Stream:
+    """One raw HTTP/1.1 SSE connection"""
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.received_at = None
+
+    async def open(self, host, port, token):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write((
+            f'GET {STREAM_PATH} HTTP/1.1\r\n'
+            f'Host: {host}:{port}\r\n'
+            f'Authorization: Bearer {token}\r\n'
+            'Accept: text/event-stream\r\n\r\n'
+        ).encode())
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if b' 200 ' not in status_line:
+            raise RuntimeError(f'Stream refused: {status_line.decode().strip()}')
+        await self.reader.readuntil(b'\r\n\r\n')
+
+    async def wait_for_task_event(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            if b'event: task' in line:
+                self.received_at = time.perf_counter()
+                return
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50, help='Connections opened at once')
+    parser.add_argument('--hold', type=float, default=10, help='Seconds to hold the idle connections')
+    parser.add_argument('--plan', type=int, help='Workout plan of the task created to test fan-out')
+    parser.add_argument('--member', type=int, help='Member of the task created to test fan-out')
+    parser.add_argument('--pid', type=int, help='Server process id, to report its memory')
+    args = parser.parse_args()
+
+    limit = raise_file_limit(args.connections + 100)
+    if limit < args.connections + 100:
+        sys.exit(f'Open file limit is {limit}; raise it (ulimit -n) to test {args.connections} connections')
+
+    token = api_request(args.url, '/api/auth/login/', {
+        'email': args.email, 'password': args.password
+    })['access']
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+
+    rss_before = rss_kb(args.pid) if args.pid else None
+    streams = [Stream() for _ in range(args.connections)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def open_stream(stream):
+        async with semaphore:
+            await stream.open(host, port, token)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(open_stream(stream) for stream in streams))
+    elapsed = time.perf_counter() - started
+    print(f'Opened {len(streams)} streams in {elapsed:.2f}s ({len(streams) / elapsed:.0f}/s)')
+
+    await asyncio.sleep(args.hold)
+    if args.pid:
+        rss_after = rss_kb(args.pid)
+        print(f'Server RSS {rss_before / 1024:.0f} MB -> {rss_after / 1024:.0f} MB '
+              f'({(rss_after - rss_before) / len(streams):.1f} KB per idle connection)')
+
+    failures = 0
+    if args.plan and args.member:
+        waiters = [asyncio.create_task(stream.wait_for_task_event()) for stream in streams]
+        published = time.perf_counter()
+        await asyncio.to_thread(api_request, args.url, '/api/workouts/tasks/', {
+            'workout_plan': args.plan,
+            'member': args.member,
+            'due_date': str(date.today() + timedelta(days=7)),
+        }, token)
+        done, pending = await asyncio.wait(waiters, timeout=30)
+        for task in pending:
+            task.cancel()
+        latencies = [
+            stream.received_at - published for stream in streams if stream.received_at
+        ]
+        failures = len(streams) - len(latencies)
+        print(f'Task event reached {len(latencies)}/{len(streams)} streams')
+        if latencies:
+            latencies.sort()
+            print(f'  fan-out latency p50 {statistics.median(latencies) * 1000:.0f}ms, '
+                  f'max {latencies[-1] * 1000:.0f}ms')
+
+    for stream in streams:
+        stream.close()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Cold start benchmark for the WSGI entry point.
+
+Each run starts a fresh interpreter, imports config.wsgi (which sets up Django)
+and serves one unauthenticated API request through the WSGI callable, so no
+database is needed. The full settings are compared with the slim API profile
+(config.settings_api) used for serverless deployments.
+
+Usage:
+    python benchmarks/startup.py [--runs 15] [--path /api/workouts/tasks/]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROFILES = ['config.settings', 'config.settings_api']
+
+# The slim profile should cut cold start time (import + first request) by at least
+# this much. Most of a cold start is importing Django, DRF and simplejwt themselves
+# (simplejwt's settings module alone pulls in django.test), which no settings
+# profile can avoid, so the achievable reduction is modest.
+TARGET_REDUCTION = 0.05
+
+
+def measure(path):
+    """Runs in the child interpreter and prints the timings as JSON"""
+    from io import BytesIO
+    from wsgiref.util import setup_testing_defaults
+
+    started = time.perf_counter()
+    from config.wsgi import application
+    imported = time.perf_counter()
+
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', 'wsgi.input': BytesIO()}
+    setup_testing_defaults(environ)
+    environ['HTTP_HOST'] = 'localhost'
+    statuses = []
+    body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+    responded = time.perf_counter()
+
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'first_request_ms': (responded - imported) * 1000,
+        'status': statuses[0],
+        'modules': len(sys.modules),
+        'body_bytes': len(body),
+    }))
+
+
+def run_once(settings_module, path):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': settings_module,
+        'PYTHONPATH': str(BASE_DIR),
+    }
+    # Settings require database variables even though nothing connects here
+    for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST'):
+        env.setdefault(name, 'benchmark')
+    env.setdefault('DB_PORT', '5432')
+
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', '--path', path],
+        env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--path', default='/api/workouts/tasks/')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.path)
+        return
+
+    print(f'Cold start of config.wsgi, median of {args.runs} fresh interpreters, GET {args.path}\n')
+    print(f'{"settings":<22} {"import ms":>10} {"1st req ms":>11} {"total ms":>9} {"modules":>8}  status')
+
+    # Profiles alternate so machine noise affects both alike
+    runs = {settings_module: [] for settings_module in PROFILES}
+    for _ in range(args.runs):
+        for settings_module in PROFILES:
+            runs[settings_module].append(run_once(settings_module, args.path))
+
+    totals = {}
+    for settings_module, results in runs.items():
+        import_ms = statistics.median(r['import_ms'] for r in results)
+        request_ms = statistics.median(r['first_request_ms'] for r in results)
+        total_ms = statistics.median(r['import_ms'] + r['first_request_ms'] for r in results)
+        totals[settings_module] = total_ms
+        print(
+            f'{settings_module:<22} {import_ms:>10.1f} {request_ms:>11.1f} {total_ms:>9.1f} '
+            f'{results[0]["modules"]:>8}  {results[0]["status"]}'
+        )
+
+    baseline, slim = totals['config.settings'], totals['config.settings_api']
+    reduction = 1 - slim / baseline
+    verdict = 'met' if reduction >= TARGET_REDUCTION else 'NOT met'
+    print(
+        f'\nCold start reduction: {reduction:.0%} '
+        f'(target: at least {TARGET_REDUCTION:.0%}, {verdict})'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Batch endpoint: several GET requests to the API in one round trip.
+
+The batch request is authenticated once; each sub-request then runs its own
+view in the same thread (and so on the same database connection) with that
+user forced in, so the token is not decoded and the user not loaded again.
+View permissions, throttles, filters and pagination apply as usual.
+"""
+
+import copy
+from urllib.parse import urlsplit
+from django.http import QueryDict
+from django.urls import Resolver404, path, resolve
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Sub-requests accepted in one batch
+MAX_REQUESTS = 10
+
+
+class SubRequestSerializer(serializers.Serializer):
+    # Only reads, so a batch can never half-apply a set of changes
+    method = serializers.ChoiceField(choices=['GET'], default='GET')
+    path = serializers.CharField(max_length=2048)
+
+    def validate_path(self, value):
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError('Must be an API path, e.g. /api/auth/me/')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False, max_length=MAX_REQUESTS)
+
+
+class BatchView(APIView):
+    """Run up to MAX_REQUESTS GET requests and return their responses in order"""
+    permission_classes = [IsAuthenticated]
+    # Each sub-request counts against the read limits of its own view
+    throttle_classes = []
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        responses = [
+            self.run(request, sub_request['path'])
+            for sub_request in serializer.validated_data['requests']
+        ]
+        return Response({'responses': responses})
+
+    def run(self, request, full_path):
+        url = urlsplit(full_path)
+        try:
+            match = resolve(url.path, getattr(request._request, 'urlconf', None))
+        except Resolver404:
+            return {'path': full_path, 'status': status.HTTP_404_NOT_FOUND, 'body': {'detail': 'Not found.'}}
+
+        view_class = getattr(match.func, 'cls', None)
+        # Only DRF views return data to embed; streams and the batch endpoint itself are left out
+        if view_class is None or not issubclass(view_class, APIView) or issubclass(view_class, BatchView):
+            return {
+                'path': full_path,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'body': {'detail': 'This endpoint cannot be batched'}
+            }
+
+        response = match.func(self.sub_request(request, url, match), *match.args, **match.kwargs)
+        return {'path': full_path, 'status': response.status_code, 'body': response.data}
+
+    def sub_request(self, request, url, match):
+        """GET request for the given URL, sharing the batch request's headers and user"""
+        sub_request = copy.copy(request._request)
+        sub_request.method = 'GET'
+        sub_request.path = sub_request.path_info = url.path
+        sub_request.META = {
+            key: value for key, value in request.META.items()
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH')
+        }
+        sub_request.META.update(REQUEST_METHOD='GET', PATH_INFO=url.path, QUERY_STRING=url.query)
+        sub_request.GET = QueryDict(url.query)
+        sub_request.resolver_match = match
+        # DRF skips authentication for requests carrying these
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        return sub_request
+
+
+urlpatterns = [
+    path('', BatchView.as_view(), name='batch'),
+]
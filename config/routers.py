@@ -0,0 +1,207 @@
+"""
+Database routing for requests: primary/replica reads and branch shards.
+
+ReplicaRoutingMiddleware marks safe-method requests as allowed to read from a
+replica. PrimaryReplicaRouter then sends their reads to a random replica and
+everything else (including locking reads) to the primary. Once a request
+changes data, its remaining reads go to the primary and the user is pinned to the primary for REPLICA_PIN_SECONDS,
+so the next requests see the write despite replication lag. Pins are stored in
+the cache, so they are shared between workers when REDIS_URL is set.
+
+With DB_SHARDS, BranchShardRouter keeps each branch's data on its own
+database (see gyms.sharding). JWTAuthentication points each request at the
+shard of the user's branch; everything else runs on the default database.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+class RoutingState:
+    """Routing decisions of the current request"""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+# Unset outside requests (management commands, shell), which always use the primary
+routing_state = ContextVar('routing_state', default=None)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (
+            state is None or
+            not state.use_replica or
+            state.wrote or
+            connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """Decide per request whether reads may use a replica, and pin users after writes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pin_key = self.get_pin_key(request)
+        pinned = pin_key is not None and cache.get(pin_key)
+
+        state = RoutingState(use_replica=request.method in SAFE_METHODS and not pinned)
+        token = routing_state.set(state)
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(self.track_writes(state)):
+                response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if pin_key is not None and state.wrote:
+            cache.set(pin_key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def track_writes(self, state):
+        """
+        Flag the request once a statement changes data on the primary. Locking
+        reads (e.g. task materialization finding nothing to do on GET) do not
+        pin the user.
+        """
+        def wrapper(execute, sql, params, many, context):
+            if not state.wrote and sql.lstrip()[:6].upper() in WRITE_STATEMENTS:
+                state.wrote = True
+            return execute(sql, params, many, context)
+        return wrapper
+
+    def get_pin_key(self, request):
+        """
+        Cache key for the requesting user, read from the bearer token before
+        DRF authenticates it. The signature is not checked here: a forged token
+        can at most move its sender's own reads to the primary.
+        """
+        header = request.headers.get('Authorization', '')
+        scheme, _, token = header.partition(' ')
+        if scheme not in jwt_settings.AUTH_HEADER_TYPES or not token:
+            return None
+        try:
+            claims = jwt.decode(token, options={'verify_signature': False})
+        except jwt.InvalidTokenError:
+            return None
+        user_id = claims.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return None
+        return f'replica_pin:{user_id}'
+
+
+# Apps whose tables hold branch data; gym branches and Django's own tables stay
+# on the default database
+SHARDED_APPS = {'accounts', 'workouts', 'attendance', 'notifications'}
+
+# Keyed by jti rather than user, so there is no branch to shard them by
+UNSHARDED_MODELS = {'accounts.RevokedToken'}
+
+
+class ShardState:
+    """Database holding the data of the current request's branch"""
+
+    def __init__(self, alias=DEFAULT_DB_ALIAS):
+        self.alias = alias
+
+
+# Unset outside requests; commands pick a shard with use_shard()
+shard_state = ContextVar('shard_state', default=None)
+
+
+def current_shard():
+    state = shard_state.get()
+    return DEFAULT_DB_ALIAS if state is None else state.alias
+
+
+def route_to_shard(alias):
+    """Send the rest of the current request's branch data queries to the given database"""
+    state = shard_state.get()
+    if state is not None:
+        state.alias = alias
+
+
+@contextmanager
+def use_shard(alias):
+    token = shard_state.set(ShardState(alias))
+    try:
+        yield
+    finally:
+        shard_state.reset(token)
+
+
+class BranchShardRouter:
+    """
+    Sends branch data to the shard of its branch: the shard of a gym branch
+    instance the query starts from (e.g. branch.users), the database of any
+    other instance, or else the current request's shard. Returns None for the
+    default database, so PrimaryReplicaRouter still spreads its reads.
+    """
+
+    def route(self, model, hints):
+        if model._meta.app_label not in SHARDED_APPS or model._meta.label in UNSHARDED_MODELS:
+            return None
+
+        instance = hints.get('instance')
+        if instance is not None and instance._meta.label == 'gyms.GymBranch':
+            from gyms.sharding import shard_for_branch
+            alias = shard_for_branch(instance.pk)
+        elif instance is not None and instance._state.db:
+            alias = instance._state.db
+        else:
+            alias = current_shard()
+        return None if alias == DEFAULT_DB_ALIAS else alias
+
+    def db_for_read(self, model, **hints):
+        return self.route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self.route(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Gym branches are mirrored to every shard
+        if 'gyms.GymBranch' in (obj1._meta.label, obj2._meta.label):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every shard has the full schema
+        if db in settings.DATABASE_SHARDS:
+            return True
+        return None
+
+
+class ShardRoutingMiddleware:
+    """Give each request its own shard state, set once the user is authenticated"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with use_shard(DEFAULT_DB_ALIAS):
+            return self.get_response(request)
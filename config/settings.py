@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -48,6 +49,8 @@ INSTALLED_APPS = [
     'accounts',
     'gyms',
     'workouts',
+    'attendance',
+    'notifications',
 ]
 
 MIDDLEWARE = [
@@ -105,6 +108,54 @@ DATABASES = {
     }
 }
 
+# Optional read replicas, e.g. DB_REPLICA_HOSTS=replica1.example.com,replica2.example.com:6432
+# Safe-method requests read from a replica; users are pinned to the primary
+# for REPLICA_PIN_SECONDS after they write, so they see their own changes.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, config('DB_REPLICA_HOSTS', default='').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': int(port) if port else DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['config.routers.PrimaryReplicaRouter']
+    MIDDLEWARE.append('config.routers.ReplicaRoutingMiddleware')
+
+# Optional branch shards, e.g. DB_SHARDS=shard1=gym_shard1,shard2=gym_shard2@db2.example.com:5432
+# Each entry is alias=database[@host[:port]] with the default credentials.
+# Gym branches live on the default database (mirrored to every shard); the
+# data of a branch lives on the database in GymBranch.database, which is
+# changed with the move_branch command. See gyms.sharding.
+DATABASE_SHARDS = []
+for shard in filter(None, config('DB_SHARDS', default='').split(',')):
+    alias, _, location = shard.strip().partition('=')
+    name, _, address = location.partition('@')
+    host, _, port = address.partition(':')
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'HOST': host or DATABASES['default']['HOST'],
+        'PORT': int(port) if port else DATABASES['default']['PORT'],
+    }
+    DATABASE_SHARDS.append(alias)
+
+if DATABASE_SHARDS:
+    # Shards first: their routing takes priority, and the replica router
+    # still handles whatever stays on the default database
+    DATABASE_ROUTERS = ['config.routers.BranchShardRouter', *globals().get('DATABASE_ROUTERS', [])]
+    MIDDLEWARE.append('config.routers.ShardRoutingMiddleware')
+
+    # Login looks the email up on every shard
+    AUTHENTICATION_BACKENDS = ['accounts.backends.ShardedModelBackend']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -124,6 +175,11 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Processes hashing passwords in the import_users and run_user_imports
+# commands; 1 hashes in the command's process. Imports run within API
+# requests always hash in the request process.
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=1, cast=int)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
@@ -152,29 +208,58 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     "DEFAULT_THROTTLE_CLASSES": (
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "accounts.throttling.AnonThrottle",
+        "accounts.throttling.BranchWriteThrottle",
+        "accounts.throttling.RoleReadThrottle",
     ),
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "10/min",     # not logged in
-        "user": "120/min",    # authenticated users
+        "anon": "10/min",           # not logged in, per IP
+        "login": "5/min",           # per email + IP
+        "branch_write": "300/min",  # writes shared by a gym branch
+        "read_super_admin": "300/min",
+        "read_manager": "240/min",
+        "read_trainer": "180/min",
+        "read_member": "120/min",
     },
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
 }
 
+REDIS_URL = config('REDIS_URL', default='')
+
+# Shared counter store for throttling; without it limits are per process
+THROTTLE_REDIS_URL = REDIS_URL
+
+# Carries task stream events between worker processes (see workouts.realtime);
+# the local broker only reaches streams in the process that made the change
+REALTIME_BROKER = 'workouts.realtime.RedisBroker' if REDIS_URL else 'workouts.realtime.LocalBroker'
+
+# Delivers outbox notifications (see notifications.sinks); the local stub only logs them
+NOTIFICATION_SINK = config('NOTIFICATION_SINK', default='notifications.sinks.LocalSink')
+NOTIFICATION_SINK_FAIL_RATE = config('NOTIFICATION_SINK_FAIL_RATE', default=0.0, cast=float)
+
+# Shared cache (e.g. revoked refresh tokens); local memory per process otherwise
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
-    'ROTATE_REFRESH_TOKENS': False,
+    # Rotated refresh tokens are revoked in accounts.RevokedToken
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
     
@@ -0,0 +1,36 @@
+"""
+Slim settings for serving the JSON API only (e.g. serverless deployments).
+
+Drops the admin, sessions, messages, static files and templates, which the
+JWT-authenticated API never uses, so cold starts import and initialize less.
+Use config.settings for the admin and management commands.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+UNUSED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in UNUSED_APPS]
+
+UNUSED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in UNUSED_MIDDLEWARE]
+
+TEMPLATES = []
+
+# JSON only; the browsable API needs templates and static files
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+    ),
+}
@@ -0,0 +1,33 @@
+"""
+Settings for the test suite: python manage.py test --settings=config.settings_test
+
+Runs with a branch shard and a read replica next to the default database,
+whatever DB_SHARDS and DB_REPLICA_HOSTS say, so the routers are tested
+against several local databases. The shard gets its own test database; the
+replica is a test mirror of the default one.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': DATABASES['default'],
+    'shard1': {**DATABASES['default'], 'NAME': f"{DATABASES['default']['NAME']}_shard1"},
+    'replica1': {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}},
+}
+DATABASE_SHARDS = ['shard1']
+DATABASE_REPLICAS = ['replica1']
+
+DATABASE_ROUTERS = ['config.routers.BranchShardRouter', 'config.routers.PrimaryReplicaRouter']
+ROUTING_MIDDLEWARE = ['config.routers.ReplicaRoutingMiddleware', 'config.routers.ShardRoutingMiddleware']
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in ROUTING_MIDDLEWARE] + ROUTING_MIDDLEWARE
+AUTHENTICATION_BACKENDS = ['accounts.backends.ShardedModelBackend']
+
+# Replica pins and shard locations are cached; keep them per test process
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Test users are created with known passwords; hashing them slowly buys nothing
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
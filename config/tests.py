@@ -0,0 +1,74 @@
+from unittest import skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from accounts.tokens import RefreshToken
+from gyms.models import GymBranch
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'Run with --settings=config.settings_test')
+class PrimaryReplicaRoutingTests(TransactionTestCase):
+    """
+    Reads of safe requests go to the replica, everything else to the primary.
+    Not a TestCase: the router keeps reads inside a transaction on the primary.
+    """
+    databases = {'default', 'replica1', 'shard1'}
+
+    def setUp(self):
+        cache.clear()
+        self.replica = settings.DATABASE_REPLICAS[0]
+        branch = GymBranch.objects.create(name='Downtown Fitness', location='123 Main Street')
+        self.trainer = User.objects.create_user(
+            'trainer@example.com', 'Trainer@123', role='TRAINER', gym_branch=branch
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.trainer).access_token}'
+        )
+
+    def request(self, method, url, data=None):
+        """The response and the SQL run on the primary and on the replica"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[self.replica]) as replica:
+            response = getattr(self.client, method)(url, data, format='json')
+        return response, [query['sql'] for query in primary], [query['sql'] for query in replica]
+
+    def create_plan(self):
+        return self.request('post', reverse('plan_list_create'), {
+            'title': 'Full body', 'description': 'Three rounds'
+        })
+
+    def test_safe_reads_go_to_the_replica(self):
+        response, primary, replica = self.request('get', reverse('current_user'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, [])
+        self.assertTrue(any('"users"' in sql for sql in replica))
+
+    def test_writes_go_to_the_primary(self):
+        response, primary, replica = self.create_plan()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(any(sql.startswith('INSERT INTO "workout_plans"') for sql in primary))
+        self.assertFalse(any(sql.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')) for sql in replica))
+
+    def test_reads_after_a_write_go_to_the_primary_while_pinned(self):
+        self.create_plan()
+
+        response, primary, replica = self.request('get', reverse('plan_list_create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(replica, [])
+        self.assertTrue(any('"workout_plans"' in sql for sql in primary))
+
+        # As once REPLICA_PIN_SECONDS have passed
+        cache.delete(f'replica_pin:{self.trainer.pk}')
+        response, primary, replica = self.request('get', reverse('plan_list_create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, [])
+        self.assertTrue(any('"workout_plans"' in sql for sql in replica))
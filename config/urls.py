@@ -14,12 +14,30 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path, include
+from django.apps import apps
+from django.urls import path
+from django.urls.resolvers import RoutePattern, URLResolver
+
+
+def lazy_include(route, urlconf):
+    """
+    Like path(route, include(urlconf)), but the URLconf (and its views) is only
+    imported when a request first matches the route, which keeps cold starts
+    from loading every app up front.
+    """
+    return URLResolver(RoutePattern(route, is_endpoint=False), urlconf)
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/auth/', include('accounts.urls')),
-    path('api/gyms/', include('gyms.urls')),
-    path('api/workouts/', include('workouts.urls')),
-]
\ No newline at end of file
+    lazy_include('api/auth/', 'accounts.urls'),
+    lazy_include('api/gyms/', 'gyms.urls'),
+    lazy_include('api/workouts/', 'workouts.urls'),
+    lazy_include('api/attendance/', 'attendance.urls'),
+    lazy_include('api/batch/', 'config.batch'),
+]
+
+# Not installed in the slim API settings (config.settings_api)
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
\ No newline at end of file
@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class GymsConfig(AppConfig):
     name = 'gyms'
+
+    def ready(self):
+        from .sharding import reserve_id_range
+        post_migrate.connect(reserve_id_range)
@@ -0,0 +1,31 @@
+import argparse
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from config.routers import use_shard
+from gyms.sharding import all_databases
+
+
+class Command(BaseCommand):
+    help = 'Run a management command once on each database holding branch data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append',
+            help='Only run on this database (repeatable), e.g. one long-running dispatcher per shard'
+        )
+        parser.add_argument('command_name', help='Command to run, e.g. archive_tasks')
+        parser.add_argument('args', nargs=argparse.REMAINDER, help='Arguments for the command')
+
+    def handle(self, *args, **options):
+        databases = options['database'] or all_databases()
+        unknown = set(databases) - set(all_databases())
+        if unknown:
+            raise CommandError(f'Unknown database(s): {", ".join(sorted(unknown))}')
+
+        for alias in databases:
+            self.stdout.write(f'{options["command_name"]} on {alias}:')
+            # Branch data queries of the command go to this database
+            with use_shard(alias):
+                call_command(options['command_name'], *args, stdout=self.stdout, stderr=self.stderr)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Ran {options["command_name"]} on {len(databases)} database(s)'))
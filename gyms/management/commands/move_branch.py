@@ -0,0 +1,105 @@
+import time
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from gyms.models import GymBranch
+from gyms.sharding import (
+    SHARD_MAP_CACHE_SECONDS, all_databases, branch_data, cache_key, copy_rows, mirror_branches
+)
+
+
+class Command(BaseCommand):
+    help = "Move a gym branch's data to another database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('branch_id', type=int, help='Gym branch id')
+        parser.add_argument('database', help='Target database alias, e.g. shard2')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows copied or deleted per statement (default: 1000)'
+        )
+        parser.add_argument(
+            '--no-wait', action='store_true',
+            help=f"Don't wait {SHARD_MAP_CACHE_SECONDS}s for cached shard maps to expire "
+                 '(only safe when no server is running)'
+        )
+
+    def handle(self, *args, **options):
+        target = options['database']
+        if target not in all_databases():
+            raise CommandError(f'Unknown database: {target}')
+        try:
+            branch = GymBranch.all_objects.get(pk=options['branch_id'])
+        except GymBranch.DoesNotExist:
+            raise CommandError(f'Gym branch {options["branch_id"]} not found')
+
+        source = branch.database
+        if source == target:
+            raise CommandError(f'Gym branch {branch.id} is already on {target}')
+
+        batch_size = options['batch_size']
+        self.wait = not options['no_wait']
+        self.stdout.write(f'Moving branch {branch.id} ({branch.name}) from {source} to {target}...')
+
+        # Reads carry on from the source; writes are refused until the move is done
+        self.update_branch(branch, is_moving=True)
+        try:
+            self.wait_for_caches()
+            mirror_branches([branch], [target])
+
+            # All or nothing on the target, so a failed copy leaves nothing to clean up
+            with transaction.atomic(using=target):
+                for model, lookup in branch_data():
+                    rows = model._base_manager.using(source).filter(**{lookup: branch})
+                    copied = self.copy(rows, target, batch_size)
+                    if model._base_manager.using(target).filter(**{lookup: branch}).count() != rows.count():
+                        raise CommandError(f'{model._meta.label} rows changed during the copy; nothing was moved')
+                    self.stdout.write(f'  Copied {copied} {model._meta.verbose_name_plural}')
+        except BaseException:
+            self.update_branch(branch, is_moving=False)
+            raise
+
+        self.update_branch(branch, database=target, is_moving=False)
+        self.stdout.write(f'  Branch {branch.id} now reads and writes {target}')
+
+        # Processes that cached the old location still read the source until they refresh
+        self.wait_for_caches()
+        for model, lookup in reversed(branch_data()):
+            rows = model._base_manager.using(source).filter(**{lookup: branch})
+            deleted = self.delete(rows, batch_size)
+            self.stdout.write(f'  Deleted {deleted} {model._meta.verbose_name_plural} from {source}')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Moved branch {branch.id} to {target}'))
+
+    def update_branch(self, branch, **fields):
+        for name, value in fields.items():
+            setattr(branch, name, value)
+        branch.save(update_fields=list(fields))
+        cache.delete(cache_key(branch.pk))
+
+    def wait_for_caches(self):
+        if self.wait:
+            self.stdout.write(f'  Waiting {SHARD_MAP_CACHE_SECONDS}s for cached shard maps to expire...')
+            time.sleep(SHARD_MAP_CACHE_SECONDS)
+
+    def copy(self, rows, target, batch_size):
+        # Keyset pagination along the primary key
+        rows = rows.order_by('pk')
+        total = 0
+        last_pk = None
+        while True:
+            batch = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:batch_size])
+            if not batch:
+                return total
+            copy_rows(rows.model, batch, target)
+            total += len(batch)
+            last_pk = batch[-1].pk
+
+    def delete(self, rows, batch_size):
+        total = 0
+        while True:
+            ids = list(rows.order_by().values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return total
+            rows.model._base_manager.using(rows.db).filter(pk__in=ids).delete()
+            total += len(ids)
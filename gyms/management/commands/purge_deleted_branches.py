@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import User, UserImport
+from gyms.models import GymBranch
+from gyms.sharding import use_branch_shard
+from attendance.models import CheckIn
+from notifications.models import Notification
+from workouts.models import (
+    WorkoutPlan, WorkoutSchedule, WorkoutTask, ArchivedWorkoutTask, WorkoutTaskEvent,
+    WorkoutTaskDailyStat, ClassSession, ClassBooking, WorkoutSetLog, WorkoutSetWeeklyStat
+)
+
+
+class Command(BaseCommand):
+    help = 'Delete the data of gym branches scheduled for deletion in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows deleted per statement (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        branches = GymBranch.all_objects.filter(
+            deleted_at__isnull=False,
+            purged_at__isnull=True
+        )
+
+        for branch in branches:
+            self.stdout.write(f'Purging branch {branch.id} ({branch.name})...')
+
+            # Children first, so every batch is a small delete with nothing left to cascade
+            steps = [
+                ('task stats', WorkoutTaskDailyStat.objects.filter(gym_branch=branch)),
+                ('check-ins', CheckIn.objects.filter(gym_branch=branch)),
+                # Reached through the branch's members, which the member index serves
+                ('task events', WorkoutTaskEvent.objects.filter(member__gym_branch=branch)),
+                ('set logs', WorkoutSetLog.objects.filter(member__gym_branch=branch)),
+                ('set stats', WorkoutSetWeeklyStat.objects.filter(member__gym_branch=branch)),
+                ('notifications', Notification.objects.filter(recipient__gym_branch=branch)),
+                ('archived tasks', ArchivedWorkoutTask.objects.filter(workout_plan__gym_branch=branch)),
+                ('workout tasks', WorkoutTask.objects.filter(gym_branch=branch)),
+                ('workout schedules', WorkoutSchedule.objects.filter(workout_plan__gym_branch=branch)),
+                ('class bookings', ClassBooking.objects.filter(session__workout_plan__gym_branch=branch)),
+                ('class sessions', ClassSession.objects.filter(workout_plan__gym_branch=branch)),
+                ('workout plans', WorkoutPlan.objects.filter(gym_branch=branch)),
+                ('user imports', UserImport.objects.filter(gym_branch=branch)),
+                ('users', User.objects.filter(gym_branch=branch)),
+            ]
+            # The querysets run on the branch's shard
+            with use_branch_shard(branch.pk):
+                for label, queryset in steps:
+                    deleted = self.delete_in_batches(queryset, batch_size)
+                    self.stdout.write(f'  Deleted {deleted} {label}')
+
+            branch.purged_at = timezone.now()
+            branch.save(update_fields=['purged_at'])
+            self.stdout.write(self.style.SUCCESS(f'✓ Purged branch {branch.id}'))
+
+    def delete_in_batches(self, queryset, batch_size):
+        model = queryset.model
+        total = 0
+        while True:
+            ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return total
+            model.objects.filter(pk__in=ids).delete()
+            total += len(ids)
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gyms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gymbranch',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gymbranch',
+            name='purged_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gyms', '0002_gymbranch_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gymbranch',
+            name='database',
+            field=models.CharField(default='default', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='gymbranch',
+            name='is_moving',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,11 +1,30 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+
+class GymBranchManager(models.Manager):
+    """Hides branches that have been scheduled for deletion"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class GymBranch(models.Model):
     name = models.CharField(max_length=200)
     location = models.CharField(max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when deletion is requested; branch data is purged in the background
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    # Set once the purge job has removed all of the branch's data
+    purged_at = models.DateTimeField(null=True, blank=True)
+    # Database holding the branch's data (see gyms.sharding); changed by move_branch
+    database = models.CharField(max_length=50, default='default')
+    # Writes to the branch's data are refused while move_branch copies it
+    is_moving = models.BooleanField(default=False)
+    
+    objects = GymBranchManager()
+    all_objects = models.Manager()
     
     class Meta:
         db_table = 'gym_branches'
@@ -15,6 +34,12 @@ class GymBranch(models.Model):
     def __str__(self):
         return f"{self.name} - {self.location}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Every shard keeps a copy, for joins and foreign keys from branch data
+        from .sharding import mirror_branches
+        mirror_branches([self])
+    
     @property
     def trainer_count(self):
         """Get count of trainers in this branch"""
@@ -25,6 +50,23 @@ class GymBranch(models.Model):
         """Get count of managers in this branch"""
         return self.users.filter(role='MANAGER').count()
     
+    @property
+    def is_deleted(self):
+        return self.deleted_at is not None
+    
+    def schedule_deletion(self):
+        """Hide the branch and lock out its users; data is purged later in batches"""
+        from .sharding import branch_location, use_branch_shard
+        alias = branch_location(self.pk)[0]
+        # The users live on the branch's shard: a transaction on each database,
+        # so a failure rolls both back. The shard commits first; should the
+        # default database then fail, the users stay locked out and deleting
+        # the branch again finishes the job.
+        with use_branch_shard(self.pk, writing=True), transaction.atomic(), transaction.atomic(using=alias):
+            self.deleted_at = timezone.now()
+            self.save(update_fields=['deleted_at'])
+            self.users.update(is_active=False)
+    
     def can_add_trainer(self):
         """Check if branch can have more trainers (max 3)"""
         return self.trainer_count < 3
@@ -3,7 +3,11 @@ from .models import GymBranch
 
 
 class GymBranchSerializer(serializers.ModelSerializer):
-    trainer_count = serializers.IntegerField(read_only=True)
+    """
+    Pass user_counts ({(branch id, role): count}) in the context to serialize
+    many branches without a count query per branch
+    """
+    trainer_count = serializers.SerializerMethodField()
     member_count = serializers.SerializerMethodField()
     manager_count = serializers.SerializerMethodField()
     
@@ -15,13 +19,23 @@ class GymBranchSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at']
     
+    def count_users(self, obj, role):
+        user_counts = self.context.get('user_counts')
+        if user_counts is not None:
+            return user_counts.get((obj.pk, role), 0)
+        return obj.users.filter(role=role).count()
+    
+    def get_trainer_count(self, obj):
+        """Get count of trainers in this branch"""
+        return self.count_users(obj, 'TRAINER')
+    
     def get_member_count(self, obj):
         """Get count of members in this branch"""
-        return obj.users.filter(role='MEMBER').count()
+        return self.count_users(obj, 'MEMBER')
     
     def get_manager_count(self, obj):
         """Get count of managers in this branch"""
-        return obj.users.filter(role='MANAGER').count()
+        return self.count_users(obj, 'MANAGER')
     
     def validate_name(self, value):
         """Ensure branch name is unique"""
@@ -0,0 +1,276 @@
+"""
+Branch shards: each gym branch's data lives on one database (GymBranch.database).
+
+Gym branches themselves stay on the default database and are mirrored to
+every shard, so joins and foreign keys to them work on each shard. Users,
+plans, tasks and the rest of a branch's data are routed by
+config.routers.BranchShardRouter to the shard of the request's branch.
+
+Serial ids are reserved in a separate range per shard (SHARD_ID_RANGE), so
+rows keep their ids when the move_branch command copies a branch to
+another database.
+"""
+
+from contextlib import contextmanager
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from config.routers import SHARDED_APPS, UNSHARDED_MODELS, route_to_shard, use_shard
+from .models import GymBranch
+
+# How long processes may keep using a branch's old shard after it changes;
+# move_branch waits this long before and after copying
+SHARD_MAP_CACHE_SECONDS = 30
+
+# Ids available to each shard: shard N starts its sequences at N * SHARD_ID_RANGE
+SHARD_ID_RANGE = 2 ** 40
+
+# Models holding a branch's data and the lookup from each to its branch,
+# parents first
+BRANCH_DATA = [
+    ('accounts.User', 'gym_branch'),
+    ('accounts.UserImport', 'gym_branch'),
+    ('accounts.IdempotencyKey', 'user__gym_branch'),
+    ('workouts.WorkoutPlan', 'gym_branch'),
+    ('workouts.WorkoutSchedule', 'workout_plan__gym_branch'),
+    ('workouts.WorkoutTask', 'gym_branch'),
+    ('workouts.ArchivedWorkoutTask', 'workout_plan__gym_branch'),
+    ('workouts.WorkoutTaskEvent', 'member__gym_branch'),
+    ('workouts.WorkoutTaskDailyStat', 'gym_branch'),
+    ('workouts.ClassSession', 'workout_plan__gym_branch'),
+    ('workouts.ClassBooking', 'session__workout_plan__gym_branch'),
+    ('workouts.WorkoutSetLog', 'member__gym_branch'),
+    ('workouts.WorkoutSetWeeklyStat', 'member__gym_branch'),
+    ('attendance.CheckIn', 'gym_branch'),
+    ('notifications.Notification', 'recipient__gym_branch'),
+]
+
+
+class BranchMoving(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'This gym branch is being moved to another database; try again in a few minutes.'
+    default_code = 'branch_moving'
+
+
+def all_databases():
+    """Every database that can hold branch data"""
+    return [DEFAULT_DB_ALIAS, *settings.DATABASE_SHARDS]
+
+
+def cache_key(branch_id):
+    return f'branch_shard:{branch_id}'
+
+
+def branch_location(branch_id):
+    """(database, is_moving) of a branch, cached for SHARD_MAP_CACHE_SECONDS"""
+    if branch_id is None or not settings.DATABASE_SHARDS:
+        return DEFAULT_DB_ALIAS, False
+    key = cache_key(branch_id)
+    location = cache.get(key)
+    if location is None:
+        location = GymBranch.all_objects.using(DEFAULT_DB_ALIAS).filter(
+            pk=branch_id
+        ).values_list('database', 'is_moving').first() or (DEFAULT_DB_ALIAS, False)
+        cache.set(key, location, SHARD_MAP_CACHE_SECONDS)
+    return tuple(location)
+
+
+def shard_for_branch(branch_id):
+    return branch_location(branch_id)[0]
+
+
+def route_to_branch(branch_id, writing=False):
+    """
+    Point the current request at the shard of the given branch and return it.
+    Writes are refused while the branch is being moved, so none are lost.
+    """
+    alias, moving = branch_location(branch_id)
+    if writing and moving:
+        raise BranchMoving()
+    route_to_shard(alias)
+    return alias
+
+
+@contextmanager
+def use_branch_shard(branch_id, writing=False):
+    """Run code outside requests (or for another branch) on the branch's shard"""
+    alias, moving = branch_location(branch_id)
+    if writing and moving:
+        raise BranchMoving()
+    with use_shard(alias):
+        yield
+
+
+def exclude_moving(queryset):
+    """
+    The queryset of branch data without the rows of branches being moved.
+    Background commands write through it, as they work on every branch of a
+    database at once; move_branch waits SHARD_MAP_CACHE_SECONDS before copying,
+    so batches filtered before a move started are done by then.
+    """
+    if not settings.DATABASE_SHARDS:
+        return queryset
+    moving = list(GymBranch.all_objects.using(DEFAULT_DB_ALIAS).filter(
+        is_moving=True
+    ).values_list('pk', flat=True))
+    if not moving:
+        return queryset
+    lookup = dict(BRANCH_DATA)[queryset.model._meta.label]
+    return queryset.exclude(**{f'{lookup}__in': moving})
+
+
+def gather(queryset):
+    """Rows of the queryset from every database, concatenated"""
+    if not settings.DATABASE_SHARDS:
+        return list(queryset)
+    return [row for alias in all_databases() for row in queryset.using(alias)]
+
+
+def gather_branches(queryset):
+    """
+    Rows of a queryset of branch data from every database, each only for the
+    branches it holds, so rows move_branch has not yet deleted from a
+    branch's old database are not counted twice (e.g. in aggregates)
+    """
+    if not settings.DATABASE_SHARDS:
+        return list(queryset)
+    lookup = dict(BRANCH_DATA)[queryset.model._meta.label]
+    branches = {}
+    for branch_id, alias in GymBranch.all_objects.using(DEFAULT_DB_ALIAS).values_list('pk', 'database'):
+        branches.setdefault(alias, []).append(branch_id)
+    return [
+        row
+        for alias, branch_ids in branches.items()
+        for row in queryset.using(alias).filter(**{f'{lookup}__in': branch_ids})
+    ]
+
+
+class ScatteredQuerySet:
+    """
+    Read-only view of a queryset (of model instances or values() dicts, also
+    unions) across every database, enough for pagination: count() adds up the
+    counts and a slice fetches up to its end from each database, then merges
+    the rows by the queryset's ordering. Deep pages cost more than on one
+    database.
+    """
+    ordered = True
+
+    def __init__(self, queryset, databases):
+        self.queryset = queryset
+        self.databases = databases
+        self.ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+
+    def count(self):
+        return sum(self.queryset.using(alias).count() for alias in self.databases)
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self.merge(self.queryset))
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        stop = index.stop
+        return self.merge(self.queryset if stop is None else self.queryset[:stop])[index]
+
+    def merge(self, queryset):
+        rows = [row for alias in self.databases for row in queryset.using(alias)]
+        # Stable sorts from the last ordering field to the first; Postgres
+        # puts NULLs last ascending and first descending, and so does this
+        for field in reversed(self.ordering):
+            descending = field.startswith('-')
+            path = field.lstrip('-').split('__')
+            rows.sort(key=lambda row: sort_value(row, path), reverse=descending)
+        return rows
+
+
+def sort_value(row, path):
+    value = row
+    for name in path:
+        # Model instances, or dicts of values() querysets
+        value = value.get(name) if isinstance(value, dict) else getattr(value, name, None)
+        if value is None:
+            break
+    return (value is None, value if value is not None else 0)
+
+
+def scatter(queryset):
+    """The queryset across every shard, or unchanged without shards"""
+    if not settings.DATABASE_SHARDS:
+        return queryset
+    return ScatteredQuerySet(queryset, all_databases())
+
+
+def copy_rows(model, objs, alias, upsert=False):
+    """
+    Insert the rows of model instances into another database as they are,
+    ids and auto_now_add timestamps included (bulk_create would reset those).
+    With upsert, rows that already exist are overwritten.
+    """
+    if not objs:
+        return
+    connection = connections[alias]
+    quote = connection.ops.quote_name
+    fields = [field for field in model._meta.concrete_fields if not field.generated]
+    columns = [quote(field.column) for field in fields]
+    row = '(%s)' % ', '.join(['%s'] * len(fields))
+    sql = 'INSERT INTO %s (%s) VALUES %s' % (
+        quote(model._meta.db_table), ', '.join(columns), ', '.join([row] * len(objs))
+    )
+    if upsert:
+        pk_column = quote(model._meta.pk.column)
+        sql += ' ON CONFLICT (%s) DO UPDATE SET %s' % (
+            pk_column,
+            ', '.join(f'{column} = EXCLUDED.{column}' for column in columns if column != pk_column)
+        )
+    params = [
+        field.get_db_prep_save(getattr(obj, field.attname), connection)
+        for obj in objs
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def mirror_branches(branches, databases=None):
+    """Copy gym branch rows to every shard (or the given databases)"""
+    for alias in settings.DATABASE_SHARDS if databases is None else databases:
+        copy_rows(GymBranch, branches, alias, upsert=True)
+
+
+def branch_data():
+    """(model, lookup) pairs of BRANCH_DATA"""
+    return [(apps.get_model(label), lookup) for label, lookup in BRANCH_DATA]
+
+
+def reserve_id_range(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate: start a shard's sequences at its own id range, so rows
+    copied in from another database never collide with its own
+    """
+    if using not in settings.DATABASE_SHARDS or sender.label not in SHARDED_APPS:
+        return
+    start = (settings.DATABASE_SHARDS.index(using) + 1) * SHARD_ID_RANGE
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        # Partial migrations (migrate app_label migration_name) send the signal too
+        tables = set(connection.introspection.table_names(cursor))
+        for model in sender.get_models(include_auto_created=True):
+            if (
+                model._meta.label in UNSHARDED_MODELS or
+                model._meta.db_table not in tables or
+                not isinstance(model._meta.pk, models.BigAutoField)
+            ):
+                continue
+            table, column = model._meta.db_table, model._meta.pk.column
+            cursor.execute(
+                f'SELECT setval(pg_get_serial_sequence(%s, %s), '
+                f'GREATEST(%s, (SELECT COALESCE(MAX({quote(column)}), 0) FROM {quote(table)})))',
+                [table, column, start]
+            )
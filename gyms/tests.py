@@ -1,3 +1,128 @@
+from datetime import date
+from io import StringIO
+from unittest import skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, router
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from config.routers import use_shard
+from workouts.models import WorkoutPlan, WorkoutTask
+from .models import GymBranch
+from .sharding import (
+    SHARD_ID_RANGE, branch_data, copy_rows, gather, gather_branches, scatter, use_branch_shard
+)
 
-# Create your tests here.
+
+@skipUnless(settings.DATABASE_SHARDS, 'Run with --settings=config.settings_test')
+class BranchShardTests(TestCase):
+    """Branch data on the default database and a shard, routed by BranchShardRouter"""
+    databases = {'default', 'shard1'}
+
+    def setUp(self):
+        cache.clear()
+        self.shard = settings.DATABASE_SHARDS[0]
+        self.branch = self.create_branch('Downtown Fitness')
+        self.other_branch = self.create_branch('Uptown Gym')
+
+    def create_branch(self, name):
+        branch = GymBranch.objects.create(name=name, location=f'{name} street')
+        with use_branch_shard(branch.pk, writing=True):
+            trainer = User.objects.create_user(
+                f'trainer{branch.pk}@example.com', 'Trainer@123', role='TRAINER', gym_branch=branch
+            )
+            member = User.objects.create_user(
+                f'member{branch.pk}@example.com', 'Member@123', role='MEMBER', gym_branch=branch
+            )
+            plan = WorkoutPlan.objects.create(
+                title=f'{name} plan', description='Full body', created_by=trainer, gym_branch=branch
+            )
+            for day in (1, 2):
+                WorkoutTask.objects.create(workout_plan=plan, member=member, due_date=date(2026, 11, day))
+        return branch
+
+    def move(self, branch, database):
+        call_command('move_branch', branch.pk, database, '--no-wait', stdout=StringIO())
+        branch.refresh_from_db()
+
+    def test_move_branch_copies_data_to_the_shard(self):
+        with use_shard(DEFAULT_DB_ALIAS):
+            task_ids = set(WorkoutTask.objects.filter(gym_branch=self.branch).values_list('pk', flat=True))
+
+        self.move(self.branch, self.shard)
+
+        self.assertEqual(self.branch.database, self.shard)
+        self.assertFalse(self.branch.is_moving)
+        # Rows keep their ids on the new database and are gone from the old one
+        with use_branch_shard(self.branch.pk):
+            self.assertEqual(router.db_for_read(WorkoutTask), self.shard)
+            self.assertEqual(
+                set(WorkoutTask.objects.filter(gym_branch=self.branch).values_list('pk', flat=True)),
+                task_ids
+            )
+        self.assertFalse(User.objects.using(DEFAULT_DB_ALIAS).filter(gym_branch=self.branch).exists())
+        # The other branch stays on the default database
+        with use_branch_shard(self.other_branch.pk):
+            self.assertEqual(WorkoutTask.objects.filter(gym_branch=self.other_branch).count(), 2)
+
+    def test_router_follows_the_branch_instance(self):
+        self.move(self.branch, self.shard)
+
+        self.assertEqual(self.branch.users.all().db, self.shard)
+        self.assertEqual(self.other_branch.users.all().db, DEFAULT_DB_ALIAS)
+        member = self.branch.users.get(role='MEMBER')
+        # Related lookups stay on the database the instance came from
+        self.assertEqual(member.workout_tasks.all().db, self.shard)
+        self.assertEqual(member.workout_tasks.count(), 2)
+
+    def test_moved_branch_is_read_back_through_the_api(self):
+        self.move(self.branch, self.shard)
+
+        client = APIClient()
+        response = client.post(
+            reverse('login'),
+            {'email': f'member{self.branch.pk}@example.com', 'password': 'Member@123'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+        response = client.get(reverse('task_list_create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_shard_ids_start_at_its_own_range(self):
+        self.move(self.branch, self.shard)
+
+        with use_branch_shard(self.branch.pk, writing=True):
+            plan = WorkoutPlan.objects.get(gym_branch=self.branch)
+            member = self.branch.users.get(role='MEMBER')
+            task = WorkoutTask.objects.create(workout_plan=plan, member=member, due_date=date(2026, 11, 3))
+        with use_branch_shard(self.other_branch.pk):
+            other_task = WorkoutTask.objects.filter(gym_branch=self.other_branch).first()
+
+        self.assertGreaterEqual(task.pk, SHARD_ID_RANGE)
+        self.assertLess(other_task.pk, SHARD_ID_RANGE)
+
+    def test_scatter_merges_every_database(self):
+        self.move(self.branch, self.shard)
+
+        tasks = scatter(WorkoutTask.objects.order_by('due_date', 'gym_branch_id'))
+        self.assertEqual(tasks.count(), 4)
+        self.assertEqual(
+            [(task.due_date.day, task.gym_branch_id) for task in tasks[1:3]],
+            [(1, self.other_branch.pk), (2, self.branch.pk)]
+        )
+
+    def test_gather_branches_skips_rows_left_on_the_old_database(self):
+        self.move(self.branch, self.shard)
+        # As between move_branch's copy and its cleanup of the old database
+        for model, lookup in branch_data():
+            rows = list(model._base_manager.using(self.shard).filter(**{lookup: self.branch}))
+            copy_rows(model, rows, DEFAULT_DB_ALIAS)
+
+        self.assertEqual(len(gather(WorkoutTask.objects.all())), 6)
+        self.assertEqual(len(gather_branches(WorkoutTask.objects.all())), 4)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import GymBranchListCreateView, GymBranchDetailView
+from .views import GymBranchListCreateView, GymBranchDetailView, GymBranchDeletionView
 
 urlpatterns = [
     path('branches/', GymBranchListCreateView.as_view(), name='branch_list_create'),
     path('branches/<int:pk>/', GymBranchDetailView.as_view(), name='branch_detail'),
+    path('branches/<int:pk>/deletion/', GymBranchDeletionView.as_view(), name='branch_deletion'),
 ]
\ No newline at end of file
@@ -2,12 +2,35 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from collections import defaultdict
+from django.db.models import Count
+from django.urls import reverse
 from .models import GymBranch
 from .serializers import GymBranchSerializer
+from .sharding import use_branch_shard
+from accounts.models import User
 from accounts.permissions import IsSuperAdmin
+from config.routers import use_shard
 from rest_framework.pagination import PageNumberPagination
 
 
+def count_users_by_role(branches):
+    """{(branch id, role): users} for the given branches, one query per shard"""
+    branch_ids = defaultdict(list)
+    for branch in branches:
+        branch_ids[branch.database].append(branch.pk)
+    
+    user_counts = {}
+    for alias, ids in branch_ids.items():
+        with use_shard(alias):
+            rows = User.objects.filter(gym_branch_id__in=ids).values(
+                'gym_branch', 'role'
+            ).annotate(count=Count('id')).order_by()
+            for row in rows:
+                user_counts[(row['gym_branch'], row['role'])] = row['count']
+    return user_counts
+
+
 class GymBranchListCreateView(APIView):
     """
     Super Admin can create and list gym branches
@@ -20,7 +43,12 @@ class GymBranchListCreateView(APIView):
         paginator = PageNumberPagination()
 
         page = paginator.paginate_queryset(branches, request)
-        serializer = GymBranchSerializer(page, many=True)
+        # Gathered from the shards holding the page's branches
+        serializer = GymBranchSerializer(
+            page,
+            many=True,
+            context={'user_counts': count_users_by_role(page)}
+        )
         return paginator.get_paginated_response(serializer.data)
     
     def post(self, request):
@@ -91,5 +119,45 @@ class GymBranchDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        branch.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        # The branch disappears immediately; its data is purged in the background
+        branch.schedule_deletion()
+        return Response(
+            {
+                'detail': 'Gym branch scheduled for deletion',
+                'progress_url': reverse('branch_deletion', args=[branch.pk])
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class GymBranchDeletionView(APIView):
+    """
+    Progress of a branch deletion (Super Admin only)
+    """
+    permission_classes = [IsAuthenticated, IsSuperAdmin]
+    
+    def get(self, request, pk):
+        """Report how much of a deleted branch's data is left to purge"""
+        try:
+            branch = GymBranch.all_objects.get(pk=pk, deleted_at__isnull=False)
+        except GymBranch.DoesNotExist:
+            return Response(
+                {'detail': 'No deletion found for this gym branch'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        with use_branch_shard(branch.pk):
+            remaining = {
+                'users': branch.users.count(),
+                'workout_plans': branch.workout_plans.count(),
+                'workout_tasks': branch.workout_tasks.count(),
+            }
+        
+        return Response({
+            'id': branch.id,
+            'name': branch.name,
+            'status': 'DELETED' if branch.purged_at else 'DELETING',
+            'deleted_at': branch.deleted_at,
+            'purged_at': branch.purged_at,
+            'remaining': remaining
+        })
\ No newline at end of file
@@ -0,0 +1,26 @@
+import logging
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+def dispatch_batch(sink, batch_size):
+    """
+    Claim one batch of due notifications and hand it to the sink. Returns
+    (sent, retrying, failed) counts, or None when nothing was due.
+    """
+    notifications = Notification.objects.claim(batch_size)
+    if not notifications:
+        return None
+
+    try:
+        failures = sink.send(notifications)
+    except Exception as exc:
+        logger.warning('Notification batch of %d failed', len(notifications), exc_info=True)
+        failures = [(notification, exc) for notification in notifications]
+
+    failed_ids = {notification.pk for notification, _ in failures}
+    sent = [notification for notification in notifications if notification.pk not in failed_ids]
+    Notification.objects.mark_sent(sent)
+    gave_up = Notification.objects.mark_failed(failures) if failures else 0
+    return len(sent), len(failures) - gave_up, gave_up
@@ -0,0 +1,50 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from notifications.dispatcher import dispatch_batch
+from notifications.sinks import get_sink
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending notifications from the outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of notifications claimed and sent at once (default: 100)'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2,
+            help='Seconds to wait when nothing is due (default: 2)'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once nothing is due instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        sink = get_sink()
+        totals = [0, 0, 0]
+
+        self.stdout.write(f'Dispatching notifications with {type(sink).__name__}...')
+
+        try:
+            while True:
+                # Several dispatchers can run at once; each claims different rows
+                counts = dispatch_batch(sink, options['batch_size'])
+                if counts is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                totals = [total + count for total, count in zip(totals, counts)]
+                self.stdout.write('  Sent {}, retrying {}, failed {}'.format(*counts))
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            '✓ Sent {} notifications ({} to retry, {} failed)'.format(*totals)
+        ))
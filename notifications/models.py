@@ -0,0 +1,142 @@
+import random
+from datetime import timedelta
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from accounts.models import User
+from gyms.sharding import exclude_moving
+
+
+class NotificationQuerySet(models.QuerySet):
+    def enqueue(self, notifications):
+        """
+        Add unsaved Notification objects to the outbox. Call inside the
+        transaction of the change they announce, so both commit or neither does.
+        """
+        return self.bulk_create(notifications, batch_size=1000)
+
+    def claim(self, batch_size):
+        """
+        Lease up to batch_size due notifications to the calling dispatcher.
+        Rows locked by another dispatcher are skipped. Claimed rows are pushed
+        LEASE_SECONDS into the future, so they come back if this dispatcher
+        dies before marking them. Notifications of branches being moved wait
+        until the move is done, so their SENT marks are not lost.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            ids = list(
+                exclude_moving(self.filter(status=Notification.PENDING, available_at__lte=now))
+                .order_by('available_at')
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return []
+            self.filter(id__in=ids).update(
+                attempts=F('attempts') + 1,
+                available_at=now + timedelta(seconds=Notification.LEASE_SECONDS)
+            )
+        return list(self.filter(id__in=ids).select_related('recipient').order_by('id'))
+
+    def mark_sent(self, notifications):
+        return self.filter(id__in=[notification.pk for notification in notifications]).update(
+            status=Notification.SENT,
+            sent_at=timezone.now(),
+            last_error=''
+        )
+
+    def mark_failed(self, failures):
+        """
+        Schedule a retry with exponential backoff for each (notification, error)
+        pair, or give up on notifications that used all their attempts.
+        Returns the number given up on.
+        """
+        now = timezone.now()
+        gave_up = 0
+        for notification, error in failures:
+            notification.last_error = str(error)[:1000]
+            if notification.attempts >= Notification.MAX_ATTEMPTS:
+                notification.status = Notification.FAILED
+                gave_up += 1
+            else:
+                notification.available_at = now + notification.retry_delay()
+        self.bulk_update(
+            [notification for notification, _ in failures],
+            ['status', 'available_at', 'last_error']
+        )
+        return gave_up
+
+
+class Notification(models.Model):
+    """
+    Transactional outbox of messages to users. Rows are written together with
+    the change they announce and delivered afterwards by the
+    dispatch_notifications command, so a slow or failing provider never
+    affects the request that made the change.
+    """
+    TASK_ASSIGNED = 'TASK_ASSIGNED'
+
+    KIND_CHOICES = [
+        (TASK_ASSIGNED, 'Task Assigned'),
+    ]
+
+    PENDING = 'PENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    # Delivery attempts before a notification is marked FAILED
+    MAX_ATTEMPTS = 8
+
+    # First retry delay, doubled after each failed attempt up to MAX_RETRY_DELAY
+    RETRY_DELAY = 30
+    MAX_RETRY_DELAY = 60 * 60
+
+    # How long a claimed notification stays with its dispatcher
+    LEASE_SECONDS = 5 * 60
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'notification_outbox'
+        ordering = ['-created_at']
+        indexes = [
+            # Only pending rows are polled, so delivered ones cost the index nothing
+            models.Index(
+                fields=['available_at'],
+                condition=Q(status='PENDING'),
+                name='notification_outbox_pending'
+            ),
+            models.Index(fields=['recipient'], name='notification_outbox_recipient'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.recipient_id} ({self.status})"
+
+    def retry_delay(self):
+        """Exponential backoff with jitter, so failed batches don't retry in lockstep"""
+        delay = min(self.RETRY_DELAY * 2 ** (self.attempts - 1), self.MAX_RETRY_DELAY)
+        return timedelta(seconds=delay * random.uniform(0.5, 1))
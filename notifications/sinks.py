@@ -0,0 +1,95 @@
+"""
+Delivery backends for the notification outbox (NOTIFICATION_SINK).
+
+A sink's send() takes a batch of claimed notifications and returns
+(notification, error) pairs for the ones that failed; raising fails the
+whole batch. Failed notifications are retried by the dispatcher.
+"""
+
+import logging
+import random
+import threading
+from collections import deque
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = {
+    Notification.TASK_ASSIGNED: (
+        'New workout task: {workout_plan}',
+        'You have been assigned "{workout_plan}", due on {due_date}.'
+    ),
+}
+
+# Notifications announcing several items at once (payload count > 1)
+BATCH_MESSAGES = {
+    Notification.TASK_ASSIGNED: (
+        '{count} new workout tasks',
+        'You have been assigned {count} tasks ({workout_plan}), the first due on {due_date}.'
+    ),
+}
+
+
+def render(notification):
+    """Subject and body of a notification"""
+    messages = BATCH_MESSAGES if notification.payload.get('count', 1) > 1 else MESSAGES
+    subject, body = messages[notification.kind]
+    return subject.format(**notification.payload), body.format(**notification.payload)
+
+
+class LocalSink:
+    """
+    Stub for development and offline testing: delivered notifications are
+    logged and the last OUTBOX_SIZE are kept in the sink's outbox. Set
+    NOTIFICATION_SINK_FAIL_RATE to fail a share of them and exercise the
+    retries.
+    """
+    # Bounded, as the dispatcher may run for a long time
+    OUTBOX_SIZE = 1000
+
+    def __init__(self, fail_rate=None, outbox_size=OUTBOX_SIZE):
+        self.fail_rate = settings.NOTIFICATION_SINK_FAIL_RATE if fail_rate is None else fail_rate
+        self.outbox = deque(maxlen=outbox_size)
+
+    def send(self, notifications):
+        failures = []
+        for notification in notifications:
+            if random.random() < self.fail_rate:
+                failures.append((notification, 'Simulated delivery failure'))
+                continue
+            subject, _ = render(notification)
+            logger.info('Notification %s to %s: %s', notification.pk, notification.recipient.email, subject)
+            self.outbox.append(notification)
+        return failures
+
+
+class EmailSink:
+    """Sends each notification as an email, over one connection per batch"""
+
+    def send(self, notifications):
+        failures = []
+        with get_connection() as connection:
+            for notification in notifications:
+                subject, body = render(notification)
+                message = EmailMessage(subject, body, to=[notification.recipient.email], connection=connection)
+                try:
+                    message.send()
+                except Exception as exc:
+                    failures.append((notification, exc))
+        return failures
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sink():
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = import_string(settings.NOTIFICATION_SINK)()
+    return _sink
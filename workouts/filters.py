@@ -0,0 +1,53 @@
+from rest_framework import serializers
+from accounts.filters import (
+    Filter, ContainsFilter, FilterSet, CommaSeparatedField, UpperChoiceField
+)
+from .models import WorkoutPlan, WorkoutTask
+
+
+def exercises_with(key):
+    """Plans with an exercise listing each value under key (any exercise per value)"""
+    def build(values):
+        return {'exercises': [{key: [value]} for value in values]}
+    return build
+
+
+class WorkoutPlanFilter(FilterSet):
+    """Filters for workout plan lists"""
+    model = WorkoutPlan
+    filters = {
+        'trainer': Filter('created_by', field=serializers.IntegerField()),
+        'branch': Filter('gym_branch', field=serializers.IntegerField()),
+        'created_after': Filter('created_at', 'gte', serializers.DateTimeField()),
+        'created_before': Filter('created_at', 'lte', serializers.DateTimeField()),
+        'equipment': ContainsFilter(
+            'content', exercises_with('equipment'), CommaSeparatedField(max_length=200)
+        ),
+        'muscle_group': ContainsFilter(
+            'content', exercises_with('muscle_groups'), CommaSeparatedField(max_length=200)
+        ),
+        'exercise': ContainsFilter(
+            'content',
+            lambda name: {'exercises': [{'name': name.strip().lower()}]},
+            serializers.CharField(max_length=100)
+        ),
+    }
+    ordering_fields = ['created_at']
+
+
+class WorkoutTaskFilter(FilterSet):
+    """Filters for workout task lists"""
+    model = WorkoutTask
+    filters = {
+        'status': Filter('status', field=UpperChoiceField(choices=WorkoutTask.STATUS_CHOICES)),
+        'overdue': Filter('is_overdue', field=serializers.BooleanField()),
+        'plan': Filter('workout_plan', field=serializers.IntegerField()),
+        'member': Filter('member', field=serializers.IntegerField()),
+        'trainer': Filter('workout_plan__created_by', field=serializers.IntegerField()),
+        'branch': Filter('gym_branch', field=serializers.IntegerField()),
+        'due_after': Filter('due_date', 'gte', serializers.DateField()),
+        'due_before': Filter('due_date', 'lte', serializers.DateField()),
+        'created_after': Filter('created_at', 'gte', serializers.DateTimeField()),
+        'created_before': Filter('created_at', 'lte', serializers.DateTimeField()),
+    }
+    ordering_fields = ['created_at', 'due_date']
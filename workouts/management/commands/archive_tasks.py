@@ -0,0 +1,60 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.utils import timezone
+from gyms.sharding import exclude_moving
+from workouts.models import WorkoutTask, ArchivedWorkoutTask
+
+
+class Command(BaseCommand):
+    help = 'Move completed workout tasks older than N days into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=90,
+            help='Archive completed tasks created more than this many days ago (default: 90)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of tasks moved per transaction (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        total = 0
+
+        self.stdout.write(f'Archiving completed tasks created before {cutoff:%Y-%m-%d}...')
+
+        while True:
+            # Each batch is copied and removed in one short transaction, so the
+            # first run also works through any existing backlog incrementally.
+            # Branches being moved are left for the next run.
+            with transaction.atomic(using=router.db_for_write(WorkoutTask)):
+                rows = list(
+                    exclude_moving(WorkoutTask.objects.filter(
+                        status='COMPLETED',
+                        created_at__lt=cutoff
+                    )).order_by('created_at').select_for_update(
+                        skip_locked=True,
+                        of=('self',)
+                    ).values(*ArchivedWorkoutTask.COPIED_FIELDS)[:batch_size]
+                )
+                if not rows:
+                    break
+
+                ArchivedWorkoutTask.objects.bulk_create(
+                    [ArchivedWorkoutTask(**row) for row in rows],
+                    ignore_conflicts=True
+                )
+                WorkoutTask.objects.filter(
+                    id__in=[row['id'] for row in rows]
+                ).delete()
+
+            total += len(rows)
+            self.stdout.write(f'  Archived {total} tasks so far')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Archived {total} tasks'))
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from gyms.sharding import exclude_moving
+from workouts.models import WorkoutSchedule
+
+
+class Command(BaseCommand):
+    help = 'Create the upcoming tasks of recurring workout schedules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=WorkoutSchedule.MATERIALIZE_DAYS,
+            help=f'Materialize occurrences due within this many days (default: {WorkoutSchedule.MATERIALIZE_DAYS})'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Number of schedules handled per transaction (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days cannot be negative')
+
+        until = timezone.localdate() + timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        total = 0
+        last_id = 0
+
+        self.stdout.write(f'Materializing schedule occurrences up to {until}...')
+
+        while True:
+            # Keyset batches over the partial index of active schedules; branches
+            # being moved are left for the next run
+            batch = list(
+                exclude_moving(WorkoutSchedule.objects.behind(until)).filter(
+                    id__gt=last_id
+                ).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            last_id = batch[-1]
+            total += WorkoutSchedule.objects.filter(id__in=batch).materialize(until)
+            self.stdout.write(f'  Created {total} tasks so far')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Created {total} tasks'))
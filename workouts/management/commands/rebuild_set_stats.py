@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from workouts.models import WorkoutSetWeeklyStat
+
+
+class Command(BaseCommand):
+    help = 'Recompute the weekly set rollups used by progress charts from the set logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--member', type=int, action='append', dest='members',
+            help='Only rebuild this member (repeatable; default: everyone)'
+        )
+
+    def handle(self, *args, **options):
+        members = options['members']
+        scope = f'members {", ".join(map(str, members))}' if members else 'all members'
+        self.stdout.write(f'Rebuilding set stats for {scope}...')
+        count = WorkoutSetWeeklyStat.objects.rebuild(members)
+        self.stdout.write(self.style.SUCCESS(f'✓ Wrote {count} weekly rows'))
@@ -0,0 +1,39 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from workouts.models import WorkoutTaskDailyStat
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily task stats used by the analytics endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='Number of trailing days to refresh (default: only days changed since the last run)'
+        )
+        parser.add_argument('--start', help='First day to refresh (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to refresh (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        if not any(options[name] for name in ('days', 'start', 'end')):
+            # Incremental run: only days that can have new task events
+            (start_date, end_date), count = WorkoutTaskDailyStat.objects.refresh_incremental()
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Wrote {count} stats rows for {start_date} to {end_date}'
+            ))
+            return
+
+        end_date = parse_date(options['end']) if options['end'] else timezone.localdate()
+        if options['start']:
+            start_date = parse_date(options['start'])
+        else:
+            start_date = end_date - timedelta(days=options['days'] or 30)
+
+        if not start_date or not end_date or start_date > end_date:
+            raise CommandError('Invalid date range')
+
+        self.stdout.write(f'Refreshing task stats from {start_date} to {end_date}...')
+        count = WorkoutTaskDailyStat.objects.refresh(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f'✓ Wrote {count} stats rows'))
@@ -0,0 +1,79 @@
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from gyms.sharding import exclude_moving
+from workouts.models import WorkoutTask, WorkoutTaskEvent
+
+
+class Command(BaseCommand):
+    help = 'Flag open workout tasks whose due date has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of tasks flagged per UPDATE (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        today = timezone.localdate()
+        branch_counts = Counter()
+        last_due_date, last_id = None, None
+
+        self.stdout.write(f'Sweeping tasks due before {today}...')
+
+        while True:
+            # Keyset pagination over the partial index (due_date, id); branches
+            # being moved are left for the next run
+            candidates = exclude_moving(WorkoutTask.objects.filter(
+                is_overdue=False,
+                due_date__lt=today
+            ).exclude(status='COMPLETED'))
+            if last_id is not None:
+                candidates = candidates.filter(
+                    Q(due_date__gt=last_due_date) |
+                    Q(due_date=last_due_date, id__gt=last_id)
+                )
+
+            batch = list(
+                candidates.order_by('due_date', 'id').values_list(
+                    'id', 'due_date'
+                )[:batch_size]
+            )
+            if not batch:
+                break
+
+            last_id, last_due_date = batch[-1]
+
+            # Each batch is its own short transaction that only locks the batch rows;
+            # tasks completed since the scan are skipped
+            with transaction.atomic(using=router.db_for_write(WorkoutTask)):
+                flagged = list(
+                    WorkoutTask.objects.filter(
+                        id__in=[task_id for task_id, _ in batch],
+                        is_overdue=False
+                    ).exclude(status='COMPLETED').select_related(
+                        'workout_plan'
+                    ).select_for_update(
+                        skip_locked=True,
+                        of=('self',)
+                    ).only(
+                        'id', 'member_id',
+                        'workout_plan__gym_branch_id', 'workout_plan__created_by_id'
+                    )
+                )
+                WorkoutTask.objects.filter(
+                    id__in=[task.id for task in flagged]
+                ).update(is_overdue=True)
+                WorkoutTaskEvent.objects.record(flagged, WorkoutTaskEvent.OVERDUE)
+
+            branch_counts.update(task.workout_plan.gym_branch_id for task in flagged)
+
+        for branch_id, count in sorted(branch_counts.items()):
+            self.stdout.write(f'  Branch {branch_id}: {count} overdue')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Flagged {sum(branch_counts.values())} overdue tasks'
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gyms', '0001_initial'),
+        ('workouts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutTaskDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('tasks_created', models.PositiveIntegerField(default=0)),
+                ('tasks_completed', models.PositiveIntegerField(default=0)),
+                ('tasks_overdue', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('gym_branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to='gyms.gymbranch')),
+                ('trainer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'workout_task_daily_stats',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'gym_branch', 'trainer'), name='unique_task_stat_per_day')],
+            },
+        ),
+    ]
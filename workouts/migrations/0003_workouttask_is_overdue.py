@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('workouts', '0002_workouttaskdailystat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workouttask',
+            name='is_overdue',
+            field=models.BooleanField(default=False),
+        ),
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(condition=models.Q(('is_overdue', False), models.Q(('status', 'COMPLETED'), _negated=True)), fields=['due_date', 'id'], name='workout_tasks_overdue_scan'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('workouts', '0003_workouttask_is_overdue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWorkoutTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed')], max_length=20)),
+                ('due_date', models.DateField()),
+                ('is_overdue', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'workout_tasks_archive',
+                'ordering': ['-created_at'],
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(condition=models.Q(('status', 'COMPLETED')), fields=['created_at'], name='workout_tasks_archive_scan'),
+        ),
+        migrations.AddField(
+            model_name='archivedworkouttask',
+            name='member',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_workout_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedworkouttask',
+            name='workout_plan',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='workouts.workoutplan'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('workouts', '0005_workoutplan_search_vector'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='workoutplan',
+            index=models.Index(fields=['gym_branch', 'created_at'], name='workout_plans_branch_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(fields=['created_at'], name='workout_tasks_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(fields=['member', 'due_date'], name='workout_tasks_member_due'),
+        ),
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(fields=['workout_plan', 'due_date'], name='workout_tasks_plan_due'),
+        ),
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(fields=['status', 'due_date'], name='workout_tasks_status_due'),
+        ),
+    ]
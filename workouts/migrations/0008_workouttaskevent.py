@@ -0,0 +1,74 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:10
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Seed history for existing tasks in time order (keeps the BRIN index effective).
+# Completion and overdue times were not recorded before, so completed tasks fall
+# back to their due date and overdue tasks to the day after it, matching how
+# analytics bucketed them until now.
+BACKFILL_EVENTS = """
+WITH tasks AS (
+    SELECT id, workout_plan_id, member_id, status, due_date, is_overdue, completed_at, created_at
+    FROM workout_tasks
+    UNION ALL
+    SELECT id, workout_plan_id, member_id, status, due_date, is_overdue, completed_at, created_at
+    FROM workout_tasks_archive
+)
+INSERT INTO workout_task_events (task_id, member_id, gym_branch_id, trainer_id, event, occurred_at)
+SELECT task_id, member_id, gym_branch_id, trainer_id, event, occurred_at
+FROM (
+    SELECT t.id AS task_id, t.member_id, p.gym_branch_id, p.created_by_id AS trainer_id,
+           1 AS event, t.created_at AS occurred_at
+    FROM tasks t JOIN workout_plans p ON p.id = t.workout_plan_id
+    UNION ALL
+    SELECT t.id, t.member_id, p.gym_branch_id, p.created_by_id,
+           4, COALESCE(t.completed_at, t.due_date::timestamptz)
+    FROM tasks t JOIN workout_plans p ON p.id = t.workout_plan_id
+    WHERE t.status = 'COMPLETED'
+    UNION ALL
+    SELECT t.id, t.member_id, p.gym_branch_id, p.created_by_id,
+           5, (t.due_date + 1)::timestamptz
+    FROM tasks t JOIN workout_plans p ON p.id = t.workout_plan_id
+    WHERE t.is_overdue
+) events
+ORDER BY occurred_at
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gyms', '0002_gymbranch_soft_delete'),
+        ('workouts', '0007_task_status_transitions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutTaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('event', models.PositiveSmallIntegerField(choices=[(1, 'CREATED'), (2, 'STARTED'), (3, 'RESET'), (4, 'COMPLETED'), (5, 'OVERDUE')])),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('gym_branch', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='gyms.gymbranch')),
+                ('member', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('trainer', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'workout_task_events',
+                'ordering': ['-id'],
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['occurred_at'], name='workout_task_events_time'), models.Index(fields=['task_id', 'id'], name='workout_task_events_task'), models.Index(fields=['member', 'id'], name='workout_task_events_member')],
+            },
+        ),
+        migrations.RunSQL(
+            BACKFILL_EVENTS,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
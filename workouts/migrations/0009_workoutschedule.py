@@ -0,0 +1,68 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:50
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('workouts', '0008_workouttaskevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekdays', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveSmallIntegerField(), size=None)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('materialized_until', models.DateField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(limit_choices_to={'role': 'TRAINER'}, on_delete=django.db.models.deletion.CASCADE, related_name='created_workout_schedules', to=settings.AUTH_USER_MODEL)),
+                ('member', models.ForeignKey(limit_choices_to={'role': 'MEMBER'}, on_delete=django.db.models.deletion.CASCADE, related_name='workout_schedules', to=settings.AUTH_USER_MODEL)),
+                ('workout_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='workouts.workoutplan')),
+            ],
+            options={
+                'db_table': 'workout_schedules',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedworkouttask',
+            name='schedule',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to='workouts.workoutschedule'),
+        ),
+        migrations.AddField(
+            model_name='workouttask',
+            name='schedule',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tasks', to='workouts.workoutschedule'),
+        ),
+        # Build the unique index without blocking writes to workout_tasks
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='workouttask',
+                    constraint=models.UniqueConstraint(condition=models.Q(('schedule__isnull', False)), fields=('schedule', 'due_date'), name='unique_schedule_occurrence'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS unique_schedule_occurrence '
+                    'ON workout_tasks (schedule_id, due_date) WHERE schedule_id IS NOT NULL',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS unique_schedule_occurrence',
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='workoutschedule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['materialized_until'], name='workout_schedules_pending'),
+        ),
+    ]
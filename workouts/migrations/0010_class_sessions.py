@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0009_workoutschedule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('seats_taken', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('trainer', models.ForeignKey(limit_choices_to={'role': 'TRAINER'}, on_delete=django.db.models.deletion.CASCADE, related_name='class_sessions', to=settings.AUTH_USER_MODEL)),
+                ('workout_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_sessions', to='workouts.workoutplan')),
+            ],
+            options={
+                'db_table': 'class_sessions',
+                'ordering': ['starts_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('BOOKED', 'Booked'), ('WAITLISTED', 'Waitlisted'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('promoted_at', models.DateTimeField(blank=True, null=True)),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True)),
+                ('member', models.ForeignKey(limit_choices_to={'role': 'MEMBER'}, on_delete=django.db.models.deletion.CASCADE, related_name='class_bookings', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='workouts.classsession')),
+            ],
+            options={
+                'db_table': 'class_bookings',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='classsession',
+            index=models.Index(fields=['starts_at'], name='class_sessions_starts'),
+        ),
+        migrations.AddConstraint(
+            model_name='classsession',
+            constraint=models.CheckConstraint(condition=models.Q(('seats_taken__lte', models.F('capacity'))), name='class_session_not_overbooked'),
+        ),
+        migrations.AddIndex(
+            model_name='classbooking',
+            index=models.Index(condition=models.Q(('status', 'WAITLISTED')), fields=['session', 'id'], name='class_bookings_waitlist'),
+        ),
+        migrations.AddConstraint(
+            model_name='classbooking',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'CANCELLED'), _negated=True), fields=('session', 'member'), name='unique_active_class_booking'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('workouts', '0010_class_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutplan',
+            name='content',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        AddIndexConcurrently(
+            model_name='workoutplan',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('content', name='jsonb_path_ops'), name='workout_plans_content'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:30
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0011_workoutplan_content'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutSetLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('exercise', models.CharField(max_length=100)),
+                ('set_number', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('reps', models.PositiveSmallIntegerField()),
+                ('weight_kg', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)),
+                ('performed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('member', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'workout_set_logs',
+                'ordering': ['-id'],
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['performed_at'], name='workout_set_logs_time'), models.Index(fields=['member', 'exercise', 'performed_at'], name='workout_set_logs_member'), models.Index(fields=['task_id', 'id'], name='workout_set_logs_task')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkoutSetWeeklyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exercise', models.CharField(max_length=100)),
+                ('week', models.DateField()),
+                ('sets', models.PositiveIntegerField(default=0)),
+                ('reps', models.PositiveIntegerField(default=0)),
+                ('volume_kg', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('max_weight_kg', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('member', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='set_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'workout_set_weekly_stats',
+                'ordering': ['member', 'exercise', 'week'],
+                'constraints': [models.UniqueConstraint(fields=('member', 'exercise', 'week'), name='unique_set_stat_per_week')],
+            },
+        ),
+    ]
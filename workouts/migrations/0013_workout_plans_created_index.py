@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 20:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('workouts', '0012_workout_set_logs'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='workoutplan',
+            index=models.Index(fields=['created_at'], name='workout_plans_created'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 21:05
+
+from django.db import migrations
+
+
+def lowercase_exercise_names(apps, schema_editor):
+    WorkoutPlan = apps.get_model('workouts', 'WorkoutPlan')
+    plans = WorkoutPlan.objects.using(schema_editor.connection.alias).exclude(content={})
+    changed = []
+    for plan in plans.only('id', 'content').iterator(chunk_size=500):
+        exercises = plan.content.get('exercises', []) if isinstance(plan.content, dict) else []
+        names = [exercise.get('name') for exercise in exercises]
+        for exercise in exercises:
+            if isinstance(exercise.get('name'), str):
+                exercise['name'] = exercise['name'].strip().lower()
+        if names != [exercise.get('name') for exercise in exercises]:
+            changed.append(plan)
+    WorkoutPlan.objects.using(schema_editor.connection.alias).bulk_update(changed, ['content'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0013_workout_plans_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_exercise_names, migrations.RunPython.noop),
+    ]
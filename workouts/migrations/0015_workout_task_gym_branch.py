@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL_TASK_BRANCHES = """
+UPDATE {table} AS task
+SET gym_branch_id = plan.gym_branch_id
+FROM workout_plans AS plan
+WHERE plan.id = task.workout_plan_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gyms', '0003_gymbranch_database'),
+        ('workouts', '0014_lowercase_exercise_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workouttask',
+            name='gym_branch',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='workout_tasks', to='gyms.gymbranch'),
+        ),
+        migrations.AddField(
+            model_name='archivedworkouttask',
+            name='gym_branch',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='gyms.gymbranch'),
+        ),
+        migrations.RunSQL(
+            BACKFILL_TASK_BRANCHES.format(table='workout_tasks'),
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(
+            BACKFILL_TASK_BRANCHES.format(table='workout_tasks_archive'),
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        migrations.AlterField(
+            model_name='workouttask',
+            name='gym_branch',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='workout_tasks', to='gyms.gymbranch'),
+        ),
+        migrations.AlterField(
+            model_name='archivedworkouttask',
+            name='gym_branch',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='gyms.gymbranch'),
+        ),
+    ]
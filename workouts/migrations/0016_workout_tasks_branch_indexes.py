@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('workouts', '0015_workout_task_gym_branch'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(fields=['gym_branch', 'created_at'], name='workout_tasks_branch_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='workouttask',
+            index=models.Index(fields=['gym_branch', 'due_date'], name='workout_tasks_branch_due'),
+        ),
+    ]
@@ -1,12 +1,391 @@
-from django.db import models
+import re
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncWeek
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from accounts.models import User
 from gyms.models import GymBranch
+from notifications.models import Notification
+from .realtime import publish_events
+
+
+def prefix_search_query(text):
+    """
+    Match every word of the input as a prefix, e.g. 'str train' -> str:* & train:*
+    Returns None when the input has no searchable words.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config='english'
+    )
+
+
+def notify_assigned(tasks):
+    """
+    Queue a TASK_ASSIGNED notification to each member of the tasks, one per
+    member however many tasks they got (e.g. a schedule's occurrences). Call
+    in the transaction that created the tasks; their workout_plan must be loaded.
+    """
+    tasks_by_member = {}
+    for task in tasks:
+        tasks_by_member.setdefault(task.member_id, []).append(task)
+
+    notifications = []
+    for member_id, member_tasks in tasks_by_member.items():
+        member_tasks.sort(key=lambda task: task.due_date)
+        first = member_tasks[0]
+        payload = {
+            'task': first.pk,
+            'workout_plan': first.workout_plan.title,
+            'due_date': first.due_date,
+        }
+        if len(member_tasks) > 1:
+            payload.update(
+                tasks=[task.pk for task in member_tasks],
+                count=len(member_tasks),
+                workout_plan=', '.join(dict.fromkeys(task.workout_plan.title for task in member_tasks))
+            )
+        notifications.append(Notification(
+            recipient_id=member_id,
+            kind=Notification.TASK_ASSIGNED,
+            payload=payload
+        ))
+    Notification.objects.enqueue(notifications)
+
+
+class WorkoutPlanQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Plans visible to the given user; Members cannot see plans directly"""
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(gym_branch__deleted_at__isnull=True)
+        if user.role in ['MANAGER', 'TRAINER']:
+            return self.filter(gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def search(self, query):
+        """Full-text prefix search over title and description, best matches first"""
+        search_query = prefix_search_query(query)
+        if search_query is None:
+            return self.none()
+        return self.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-created_at')
+
+
+class WorkoutScheduleQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Schedules visible to the given user, scoped like their tasks"""
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(workout_plan__gym_branch__deleted_at__isnull=True)
+        if user.role == 'MEMBER':
+            return self.filter(member_id=user.pk)
+        if user.role in ['MANAGER', 'TRAINER']:
+            return self.filter(workout_plan__gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def behind(self, until):
+        """Active schedules with occurrences up to the given date not yet materialized"""
+        return self.filter(
+            Q(materialized_until__lt=until) & Q(materialized_until__lt=F('end_date')),
+            is_active=True
+        )
+
+    def materialize(self, until):
+        """
+        Create the tasks of these schedules that are due up to the given date,
+        in one INSERT, together with their CREATED events and one notification
+        per member. Schedules locked by
+        another worker are skipped. Returns the number of tasks created.
+        """
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            schedules = list(
+                self.behind(until).select_related('workout_plan').select_for_update(
+                    skip_locked=True,
+                    of=('self',)
+                )
+            )
+            tasks = []
+            for schedule in schedules:
+                last_date = min(until, schedule.end_date)
+                tasks += [
+                    WorkoutTask(
+                        workout_plan=schedule.workout_plan,
+                        gym_branch_id=schedule.workout_plan.gym_branch_id,
+                        member_id=schedule.member_id,
+                        schedule=schedule,
+                        due_date=day
+                    )
+                    for day in schedule.occurrences(
+                        schedule.materialized_until + timedelta(days=1), last_date
+                    )
+                ]
+                schedule.materialized_until = last_date
+
+            created = WorkoutTask.objects.bulk_create(tasks, batch_size=1000)
+            WorkoutTaskEvent.objects.record(created, WorkoutTaskEvent.CREATED)
+            notify_assigned(created)
+            WorkoutSchedule.objects.bulk_update(schedules, ['materialized_until'], batch_size=1000)
+        return len(created)
+
+
+class TaskScopeQuerySet(models.QuerySet):
+    """Read-only scopes shared by workout tasks and their archive"""
+
+    def for_user(self, user):
+        """
+        Tasks visible to the given user. Members see their own tasks,
+        Managers and Trainers see their branch, Super Admin sees every active branch.
+        """
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(gym_branch__deleted_at__isnull=True)
+        if user.role == 'MEMBER':
+            return self.filter(member_id=user.pk)
+        if user.role in ['MANAGER', 'TRAINER']:
+            return self.filter(gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def search(self, query):
+        """Prefix search over the title and description of each task's workout plan"""
+        search_query = prefix_search_query(query)
+        if search_query is None:
+            return self.none()
+        return self.filter(workout_plan__search_vector=search_query)
+
+
+class WorkoutTaskQuerySet(TaskScopeQuerySet):
+    def update_status(self, task, status, version=None, actor=None):
+        """
+        Move the task to a new status with a conditional UPDATE that only matches
+        if the row is still at the expected version (default: the version that was
+        read) and inside this queryset's scope (e.g. for_user()). No row locks are
+        taken; returns False when another write got there first.
+        The matching history event is written in the same transaction.
+        """
+        expected_version = task.version if version is None else version
+        changes = task.get_transition_changes(status)
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            updated = self.filter(pk=task.pk, version=expected_version).update(
+                version=F('version') + 1,
+                **changes
+            )
+            if updated:
+                WorkoutTaskEvent.objects.record(
+                    [task], WorkoutTaskEvent.STATUS_EVENTS[status], actor=actor
+                )
+        if updated:
+            for field, value in changes.items():
+                setattr(task, field, value)
+            task.version = expected_version + 1
+        return bool(updated)
+
+
+class WorkoutTaskEventQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Events visible to the given user, scoped like their tasks"""
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(gym_branch__deleted_at__isnull=True)
+        if user.role == 'MEMBER':
+            return self.filter(member_id=user.pk)
+        if user.role in ['MANAGER', 'TRAINER']:
+            return self.filter(gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def record(self, tasks, event, actor=None):
+        """
+        Append one event per task with a single INSERT. Call it inside the
+        transaction that changed the tasks; their workout_plan must be loaded.
+        """
+        occurred_at = timezone.now()
+        events = self.bulk_create([
+            self.model(
+                task_id=task.pk,
+                member_id=task.member_id,
+                gym_branch_id=task.workout_plan.gym_branch_id,
+                trainer_id=task.workout_plan.created_by_id,
+                actor=actor,
+                event=event,
+                occurred_at=occurred_at
+            )
+            for task in tasks
+        ], batch_size=1000)
+        # Pushed to open task streams once the change is visible
+        transaction.on_commit(lambda: publish_events(events), using=router.db_for_write(self.model))
+        return events
+
+
+class ClassSessionQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Sessions visible to the given user; everyone in a branch sees its sessions"""
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(workout_plan__gym_branch__deleted_at__isnull=True)
+        if user.role in ['MANAGER', 'TRAINER', 'MEMBER']:
+            return self.filter(workout_plan__gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def claim_seat(self, session_id):
+        """
+        Take one seat if any is left, with a single conditional UPDATE.
+        The session row stays locked until the surrounding transaction ends,
+        so call this as the last statement before committing.
+        """
+        return self.filter(
+            pk=session_id,
+            seats_taken__lt=F('capacity')
+        ).update(seats_taken=F('seats_taken') + 1) == 1
+
+    def release_seat(self, session_id):
+        self.filter(pk=session_id, seats_taken__gt=0).update(
+            seats_taken=F('seats_taken') - 1
+        )
+
+
+class ClassBookingQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Bookings visible to the given user, scoped like their tasks"""
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(session__workout_plan__gym_branch__deleted_at__isnull=True)
+        if user.role == 'MEMBER':
+            return self.filter(member_id=user.pk)
+        if user.role in ['MANAGER', 'TRAINER']:
+            return self.filter(session__workout_plan__gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def book(self, session, member):
+        """
+        Book a seat for the member, or put them on the waitlist when the
+        session is full. Raises IntegrityError if the member already holds a
+        booking for the session.
+        """
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            # Inserted first, so the session row is only locked by the seat claim until commit
+            booking = self.create(session=session, member=member, status=ClassBooking.BOOKED)
+            if not ClassSession.objects.claim_seat(session.pk):
+                booking.status = ClassBooking.WAITLISTED
+                self.filter(pk=booking.pk).update(status=booking.status)
+
+        if booking.status == ClassBooking.WAITLISTED:
+            # A seat freed between our claim and commit was offered to a waitlist we were not on yet
+            if self.fill_from_waitlist(session.pk):
+                booking.refresh_from_db(fields=['status', 'promoted_at'])
+        return booking
+
+    def cancel(self, booking):
+        """
+        Cancel a booking and hand a freed seat to the waitlist. Returns False
+        if the booking was already cancelled.
+        """
+        handed_over = False
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            current = self.select_for_update().filter(pk=booking.pk).values_list(
+                'status', flat=True
+            ).first()
+            if current in (None, ClassBooking.CANCELLED):
+                return False
+            booking.status = ClassBooking.CANCELLED
+            booking.cancelled_at = timezone.now()
+            self.filter(pk=booking.pk).update(
+                status=booking.status,
+                cancelled_at=booking.cancelled_at
+            )
+            if current == ClassBooking.BOOKED:
+                # The seat passes straight to the next member, without touching the session row
+                handed_over = self.promote_next(booking.session_id)
+                if not handed_over:
+                    ClassSession.objects.release_seat(booking.session_id)
+
+        if current == ClassBooking.BOOKED and not handed_over:
+            self.fill_from_waitlist(booking.session_id)
+        return True
+
+    def promote_next(self, session_id):
+        """
+        Give a seat the caller already holds to the oldest waitlisted booking.
+        Bookings locked by concurrent promotions are skipped rather than
+        waited for. Call inside a transaction; returns whether one was promoted.
+        """
+        booking = self.filter(
+            session_id=session_id,
+            status=ClassBooking.WAITLISTED
+        ).order_by('id').select_for_update(skip_locked=True).only('id').first()
+        if booking is None:
+            return False
+        self.filter(pk=booking.pk).update(
+            status=ClassBooking.BOOKED,
+            promoted_at=timezone.now()
+        )
+        return True
+
+    def fill_from_waitlist(self, session_id):
+        """
+        Promote waitlisted bookings, oldest first, while seats are free.
+        Returns the number of promoted bookings.
+        """
+        promoted = 0
+        using = router.db_for_write(self.model)
+        while True:
+            with transaction.atomic(using=using):
+                if not ClassSession.objects.claim_seat(session_id):
+                    return promoted
+                if not self.promote_next(session_id):
+                    # Nobody to promote: give the seat back
+                    transaction.set_rollback(True, using=using)
+                    return promoted
+            promoted += 1
+
+
+def week_start(moment):
+    """Monday of the local week containing the given datetime"""
+    day = timezone.localdate(moment)
+    return day - timedelta(days=day.weekday())
+
+
+class WorkoutSetLogQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Set logs visible to the given user, scoped like their tasks"""
+        if user.role == 'SUPER_ADMIN':
+            return self.filter(member__gym_branch__deleted_at__isnull=True)
+        if user.role == 'MEMBER':
+            return self.filter(member_id=user.pk)
+        if user.role in ['MANAGER', 'TRAINER']:
+            return self.filter(member__gym_branch_id=user.gym_branch_id)
+        return self.none()
+
+    def ingest(self, logs):
+        """
+        Store unsaved WorkoutSetLog objects with multi-row INSERTs and add
+        them to the weekly rollups in the same transaction.
+        """
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            created = self.bulk_create(logs, batch_size=1000)
+            WorkoutSetWeeklyStat.objects.add(created)
+        return created
 
 
 class WorkoutPlan(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
+    # Structured exercises: {"exercises": [{"name", "sets", "reps", "rest_seconds",
+    # "equipment", "muscle_groups", "notes"}]}, validated by PlanContentField
+    content = models.JSONField(default=dict, blank=True)
+    # Maintained by Postgres; titles weigh more than descriptions when ranking
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='english') +
+            SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True
+    )
     created_by = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -20,17 +399,27 @@ class WorkoutPlan(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = WorkoutPlanQuerySet.as_manager()
+    
     class Meta:
         db_table = 'workout_plans'
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='workout_plans_search'),
+            # jsonb_path_ops only supports @>, and is smaller and faster for it
+            GinIndex(OpClass('content', name='jsonb_path_ops'), name='workout_plans_content'),
+            models.Index(fields=['gym_branch', 'created_at'], name='workout_plans_branch_created'),
+            # Super Admin lists span every branch
+            models.Index(fields=['created_at'], name='workout_plans_created'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.gym_branch.name}"
     
     def clean(self):
         # Ensure trainer belongs to the same branch
-        if self.created_by and self.gym_branch:
-            if self.created_by.gym_branch != self.gym_branch:
+        if self.created_by_id and self.gym_branch_id:
+            if self.created_by.gym_branch_id != self.gym_branch_id:
                 raise ValidationError(
                     'Trainer must belong to the same gym branch as the workout plan'
                 )
@@ -40,6 +429,93 @@ class WorkoutPlan(models.Model):
         super().save(*args, **kwargs)
 
 
+class WorkoutSchedule(models.Model):
+    """
+    Recurring assignment of a workout plan to a member, e.g. every Mon/Wed/Fri
+    for 8 weeks. Only occurrences inside a rolling window are stored as tasks;
+    the rest are materialized later by the materialize_schedules command or
+    when tasks are listed.
+    """
+    # How far ahead occurrences are materialized
+    MATERIALIZE_DAYS = 14
+    # Schedules a member's task list catches up on its own; the rest is left to the job
+    LAZY_MATERIALIZE_LIMIT = 5
+
+    workout_plan = models.ForeignKey(
+        WorkoutPlan,
+        on_delete=models.CASCADE,
+        related_name='schedules'
+    )
+    member = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='workout_schedules',
+        limit_choices_to={'role': 'MEMBER'}
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='created_workout_schedules',
+        limit_choices_to={'role': 'TRAINER'}
+    )
+    # Days of the week, 0 = Monday ... 6 = Sunday
+    weekdays = ArrayField(models.PositiveSmallIntegerField())
+    start_date = models.DateField()
+    end_date = models.DateField()
+    # Last day whose occurrence exists as a task
+    materialized_until = models.DateField()
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WorkoutScheduleQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'workout_schedules'
+        ordering = ['-created_at']
+        indexes = [
+            # Active schedules the materialize job still has to work on
+            models.Index(
+                fields=['materialized_until'],
+                condition=Q(is_active=True),
+                name='workout_schedules_pending'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.workout_plan.title} - {self.member.email} (recurring)"
+
+    @classmethod
+    def materialize_horizon(cls):
+        return timezone.localdate() + timedelta(days=cls.MATERIALIZE_DAYS)
+
+    def occurrences(self, start, end):
+        """Dates of this schedule between start and end, inclusive"""
+        day = max(start, self.start_date)
+        last_day = min(end, self.end_date)
+        dates = []
+        while day <= last_day:
+            if day.weekday() in self.weekdays:
+                dates.append(day)
+            day += timedelta(days=1)
+        return dates
+
+    def clean(self):
+        # Ensure member belongs to the same branch as the workout plan
+        if self.member_id and self.workout_plan_id:
+            if self.member.gym_branch_id != self.workout_plan.gym_branch_id:
+                raise ValidationError(
+                    'Cannot assign schedule to member from a different gym branch'
+                )
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValidationError('End date cannot be before start date')
+
+    def save(self, *args, **kwargs):
+        if self.materialized_until is None and self.start_date:
+            self.materialized_until = self.start_date - timedelta(days=1)
+        self.full_clean()
+        super().save(*args, **kwargs)
+
+
 class WorkoutTask(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
@@ -47,11 +523,26 @@ class WorkoutTask(models.Model):
         ('COMPLETED', 'Completed'),
     ]
     
+    # Allowed status changes; COMPLETED is final
+    STATUS_TRANSITIONS = {
+        'PENDING': ['IN_PROGRESS', 'COMPLETED'],
+        'IN_PROGRESS': ['PENDING', 'COMPLETED'],
+        'COMPLETED': [],
+    }
+    
     workout_plan = models.ForeignKey(
         WorkoutPlan,
         on_delete=models.CASCADE,
         related_name='tasks'
     )
+    # Copy of workout_plan.gym_branch (plans never change branch), so
+    # branch-scoped task lists filter and sort on an index without a join
+    gym_branch = models.ForeignKey(
+        GymBranch,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='workout_tasks'
+    )
     member = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -64,23 +555,609 @@ class WorkoutTask(models.Model):
         default='PENDING'
     )
     due_date = models.DateField()
+    # Set for occurrences materialized from a recurring schedule
+    schedule = models.ForeignKey(
+        WorkoutSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='tasks'
+    )
+    # Set by the overdue sweep once due_date passes without completion
+    is_overdue = models.BooleanField(default=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    # Incremented on every status change, used for optimistic concurrency (ETag / If-Match)
+    version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = WorkoutTaskQuerySet.as_manager()
+    
     class Meta:
         db_table = 'workout_tasks'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='workout_tasks_created'),
+            models.Index(fields=['gym_branch', 'created_at'], name='workout_tasks_branch_created'),
+            models.Index(fields=['gym_branch', 'due_date'], name='workout_tasks_branch_due'),
+            models.Index(fields=['member', 'due_date'], name='workout_tasks_member_due'),
+            models.Index(fields=['workout_plan', 'due_date'], name='workout_tasks_plan_due'),
+            models.Index(fields=['status', 'due_date'], name='workout_tasks_status_due'),
+            # Only open, unflagged tasks are candidates for the overdue sweep
+            models.Index(
+                fields=['due_date', 'id'],
+                condition=Q(is_overdue=False) & ~Q(status='COMPLETED'),
+                name='workout_tasks_overdue_scan'
+            ),
+            # Old completed tasks are candidates for the archive command
+            models.Index(
+                fields=['created_at'],
+                condition=Q(status='COMPLETED'),
+                name='workout_tasks_archive_scan'
+            ),
+        ]
+        constraints = [
+            # One task per schedule occurrence; also serves lookups by schedule
+            models.UniqueConstraint(
+                fields=['schedule', 'due_date'],
+                condition=Q(schedule__isnull=False),
+                name='unique_schedule_occurrence'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.workout_plan.title} - {self.member.email}"
     
+    # Fields with no cross-field invariants; saving only these skips full_clean()
+    LEAN_UPDATE_FIELDS = {'status', 'is_overdue', 'started_at', 'completed_at', 'version'}
+    
+    def can_transition_to(self, status):
+        return status in self.STATUS_TRANSITIONS[self.status]
+    
+    def get_transition_changes(self, status):
+        """Column values to write when moving to the given status"""
+        now = timezone.now()
+        if status == 'IN_PROGRESS':
+            return {'status': status, 'started_at': now}
+        if status == 'COMPLETED':
+            return {'status': status, 'started_at': self.started_at or now, 'completed_at': now}
+        return {'status': status, 'started_at': None}
+    
     def clean(self):
         # Ensure member belongs to the same branch as the workout plan
-        if self.member and self.workout_plan:
-            if self.member.gym_branch != self.workout_plan.gym_branch:
+        if self.member_id and self.workout_plan_id:
+            if self.member.gym_branch_id != self.workout_plan.gym_branch_id:
                 raise ValidationError(
                     'Cannot assign task to member from a different gym branch'
                 )
     
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.workout_plan_id:
+            self.gym_branch_id = self.workout_plan.gym_branch_id
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) <= self.LEAN_UPDATE_FIELDS:
+            # Validate just the written columns (choices, type), no related lookups
+            self.clean_fields(exclude=[
+                field.name for field in self._meta.fields
+                if field.name not in update_fields
+            ])
+        else:
+            self.full_clean()
+        
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        
+        # New tasks get their CREATED event and the member's notification in the same transaction
+        with transaction.atomic(using=router.db_for_write(WorkoutTask, instance=self)):
+            super().save(*args, **kwargs)
+            WorkoutTaskEvent.objects.record([self], WorkoutTaskEvent.CREATED)
+            notify_assigned([self])
+
+
+class ArchivedWorkoutTask(models.Model):
+    """
+    Completed tasks moved out of workout_tasks by the archive_tasks command.
+    Rows keep their original task id so references stay stable.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    workout_plan = models.ForeignKey(
+        WorkoutPlan,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks'
+    )
+    gym_branch = models.ForeignKey(
+        GymBranch,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='archived_tasks'
+    )
+    member = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_workout_tasks'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=WorkoutTask.STATUS_CHOICES
+    )
+    due_date = models.DateField()
+    schedule = models.ForeignKey(
+        WorkoutSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='archived_tasks'
+    )
+    is_overdue = models.BooleanField(default=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # Archived rows are only read, so none of the task write helpers
+    objects = TaskScopeQuerySet.as_manager()
+
+    # Columns copied verbatim from workout_tasks when archiving
+    COPIED_FIELDS = [
+        'id', 'workout_plan_id', 'gym_branch_id', 'member_id', 'status', 'due_date', 'schedule_id',
+        'is_overdue', 'started_at', 'completed_at', 'version', 'created_at'
+    ]
+
+    class Meta:
+        db_table = 'workout_tasks_archive'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.workout_plan.title} - {self.member.email} (archived)"
+
+
+class WorkoutTaskEvent(models.Model):
+    """
+    Append-only history of task lifecycle changes, written in the same
+    transaction as the change itself. Rows are never updated.
+
+    References are stored without database constraints so history survives
+    archiving; task_id points at either workout_tasks or the archive.
+    """
+    CREATED = 1
+    STARTED = 2
+    RESET = 3
+    COMPLETED = 4
+    OVERDUE = 5
+
+    EVENT_CHOICES = [
+        (CREATED, 'CREATED'),
+        (STARTED, 'STARTED'),
+        (RESET, 'RESET'),
+        (COMPLETED, 'COMPLETED'),
+        (OVERDUE, 'OVERDUE'),
+    ]
+
+    # Event written when a task moves to each status
+    STATUS_EVENTS = {
+        'PENDING': RESET,
+        'IN_PROGRESS': STARTED,
+        'COMPLETED': COMPLETED,
+    }
+
+    task_id = models.BigIntegerField()
+    member = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    gym_branch = models.ForeignKey(
+        GymBranch,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    # Trainer who owns the task's workout plan, for per-trainer analytics
+    trainer = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    # User who made the change; empty for creations and the overdue sweep
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        related_name='+'
+    )
+    event = models.PositiveSmallIntegerField(choices=EVENT_CHOICES)
+    occurred_at = models.DateTimeField(default=timezone.now)
+
+    objects = WorkoutTaskEventQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'workout_task_events'
+        ordering = ['-id']
+        indexes = [
+            # Rows are appended in time order, so a tiny BRIN index serves time ranges
+            BrinIndex(fields=['occurred_at'], name='workout_task_events_time'),
+            models.Index(fields=['task_id', 'id'], name='workout_task_events_task'),
+            models.Index(fields=['member', 'id'], name='workout_task_events_member'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} {self.get_event_display()} at {self.occurred_at}"
+
+
+class WorkoutTaskDailyStatManager(models.Manager):
+    # Events that happened shortly before the last refresh may commit after it
+    INCREMENTAL_MARGIN = timedelta(minutes=10)
+
+    def refresh(self, start_date, end_date):
+        """
+        Recompute the stats rows for every day in [start_date, end_date] from
+        the task event log. Tasks count towards the day they were created,
+        completed or flagged overdue.
+        """
+        window_start = timezone.make_aware(
+            datetime.combine(start_date, time.min)
+        )
+        window_end = timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+
+        counts = WorkoutTaskEvent.objects.filter(
+            occurred_at__gte=window_start,
+            occurred_at__lt=window_end,
+            event__in=[WorkoutTaskEvent.CREATED, WorkoutTaskEvent.COMPLETED, WorkoutTaskEvent.OVERDUE]
+        ).values(
+            'gym_branch', 'trainer', date=TruncDate('occurred_at')
+        ).annotate(
+            tasks_created=Count('id', filter=Q(event=WorkoutTaskEvent.CREATED)),
+            tasks_completed=Count('id', filter=Q(event=WorkoutTaskEvent.COMPLETED)),
+            tasks_overdue=Count('id', filter=Q(event=WorkoutTaskEvent.OVERDUE))
+        ).order_by()
+
+        stats = [
+            self.model(
+                gym_branch_id=row['gym_branch'],
+                trainer_id=row['trainer'],
+                date=row['date'],
+                tasks_created=row['tasks_created'],
+                tasks_completed=row['tasks_completed'],
+                tasks_overdue=row['tasks_overdue']
+            )
+            for row in counts
+        ]
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            self.filter(date__gte=start_date, date__lte=end_date).delete()
+            self.bulk_create(stats, batch_size=1000)
+        return len(stats)
+
+    def refresh_incremental(self, default_days=30):
+        """
+        Refresh only the days that can have new events since the last run.
+        Returns the refreshed (start_date, end_date) and the number of rows written.
+        """
+        end_date = timezone.localdate()
+        last_refresh = self.aggregate(last=Max('refreshed_at'))['last']
+        if last_refresh is None:
+            start_date = end_date - timedelta(days=default_days)
+        else:
+            start_date = timezone.localdate(last_refresh - self.INCREMENTAL_MARGIN)
+        return (start_date, end_date), self.refresh(start_date, end_date)
+
+
+class WorkoutTaskDailyStat(models.Model):
+    """
+    Precomputed per-branch, per-trainer, per-day task counts.
+    Reporting queries read this table instead of scanning workout_tasks.
+    """
+    gym_branch = models.ForeignKey(
+        GymBranch,
+        on_delete=models.CASCADE,
+        related_name='task_stats'
+    )
+    trainer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='task_stats'
+    )
+    date = models.DateField()
+    tasks_created = models.PositiveIntegerField(default=0)
+    tasks_completed = models.PositiveIntegerField(default=0)
+    tasks_overdue = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    objects = WorkoutTaskDailyStatManager()
+
+    class Meta:
+        db_table = 'workout_task_daily_stats'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'gym_branch', 'trainer'],
+                name='unique_task_stat_per_day'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.gym_branch_id} / {self.trainer_id} - {self.date}"
+
+
+class ClassSession(models.Model):
+    """A group class run by a trainer, with a fixed number of seats"""
+    MAX_CAPACITY = 500
+
+    workout_plan = models.ForeignKey(
+        WorkoutPlan,
+        on_delete=models.CASCADE,
+        related_name='class_sessions'
+    )
+    trainer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='class_sessions',
+        limit_choices_to={'role': 'TRAINER'}
+    )
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    capacity = models.PositiveIntegerField()
+    # Only changed by conditional updates (see ClassSessionQuerySet.claim_seat)
+    seats_taken = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ClassSessionQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'class_sessions'
+        ordering = ['starts_at']
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(seats_taken__lte=F('capacity')),
+                name='class_session_not_overbooked'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['starts_at'], name='class_sessions_starts'),
+        ]
+
+    def __str__(self):
+        return f"{self.workout_plan.title} at {self.starts_at}"
+
+    @property
+    def seats_available(self):
+        return max(self.capacity - self.seats_taken, 0)
+
+    @property
+    def has_started(self):
+        return self.starts_at <= timezone.now()
+
+    def clean(self):
+        if self.trainer_id and self.workout_plan_id:
+            if self.trainer.gym_branch_id != self.workout_plan.gym_branch_id:
+                raise ValidationError(
+                    'Trainer must belong to the same gym branch as the workout plan'
+                )
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError('End time must be after start time')
+
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class ClassBooking(models.Model):
+    """
+    A member's seat in a class session, or their place on its waitlist.
+    Bookings are created and changed through ClassBookingQuerySet, which
+    keeps them in step with the session's seat count.
+    """
+    BOOKED = 'BOOKED'
+    WAITLISTED = 'WAITLISTED'
+    CANCELLED = 'CANCELLED'
+
+    STATUS_CHOICES = [
+        (BOOKED, 'Booked'),
+        (WAITLISTED, 'Waitlisted'),
+        (CANCELLED, 'Cancelled'),
+    ]
+
+    session = models.ForeignKey(
+        ClassSession,
+        on_delete=models.CASCADE,
+        related_name='bookings'
+    )
+    member = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='class_bookings',
+        limit_choices_to={'role': 'MEMBER'}
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ClassBookingQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'class_bookings'
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'member'],
+                condition=~Q(status='CANCELLED'),
+                name='unique_active_class_booking'
+            ),
+        ]
+        indexes = [
+            # The waitlist queue, oldest first
+            models.Index(
+                fields=['session', 'id'],
+                condition=Q(status='WAITLISTED'),
+                name='class_bookings_waitlist'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.member.email} - {self.session_id} ({self.status})"
+
+
+class WorkoutSetLog(models.Model):
+    """
+    A set performed by a member, append-only. References carry no database
+    constraints, like the task event log, so logs survive task archiving;
+    task_id points at either workout_tasks or the archive.
+    """
+    task_id = models.BigIntegerField()
+    member = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    # Lowercase exercise name, the key of progress series
+    exercise = models.CharField(max_length=100)
+    set_number = models.PositiveSmallIntegerField(null=True, blank=True)
+    reps = models.PositiveSmallIntegerField()
+    # Empty for bodyweight exercises
+    weight_kg = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    performed_at = models.DateTimeField(default=timezone.now)
+
+    objects = WorkoutSetLogQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'workout_set_logs'
+        ordering = ['-id']
+        indexes = [
+            # Logs arrive roughly in time order, so a tiny BRIN index serves time ranges
+            BrinIndex(fields=['performed_at'], name='workout_set_logs_time'),
+            models.Index(fields=['member', 'exercise', 'performed_at'], name='workout_set_logs_member'),
+            models.Index(fields=['task_id', 'id'], name='workout_set_logs_task'),
+        ]
+
+    def __str__(self):
+        return f"{self.exercise}: {self.reps} x {self.weight_kg or 'BW'} ({self.member_id})"
+
+
+class WorkoutSetWeeklyStatManager(models.Manager):
+    def add(self, logs):
+        """
+        Fold new set logs into their weekly rows with one upsert per 1000 rows.
+        Rows are written in key order so concurrent batches cannot deadlock.
+        """
+        totals = {}
+        for log in logs:
+            key = (log.member_id, log.exercise, week_start(log.performed_at))
+            sets, reps, volume, max_weight = totals.get(key, (0, 0, Decimal(0), None))
+            weight = log.weight_kg
+            if weight is not None:
+                volume += weight * log.reps
+                if max_weight is None or weight > max_weight:
+                    max_weight = weight
+            totals[key] = (sets + 1, reps + log.reps, volume, max_weight)
+        if not totals:
+            return 0
+
+        table = self.model._meta.db_table
+        rows = [key + values for key, values in sorted(totals.items())]
+        connection = connections[router.db_for_write(self.model)]
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), 1000):
+                chunk = rows[start:start + 1000]
+                values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, now())'] * len(chunk))
+                cursor.execute(
+                    f'INSERT INTO {table} AS stats '
+                    '(member_id, exercise, week, sets, reps, volume_kg, max_weight_kg, updated_at) '
+                    f'VALUES {values} '
+                    'ON CONFLICT (member_id, exercise, week) DO UPDATE SET '
+                    'sets = stats.sets + EXCLUDED.sets, '
+                    'reps = stats.reps + EXCLUDED.reps, '
+                    'volume_kg = stats.volume_kg + EXCLUDED.volume_kg, '
+                    'max_weight_kg = GREATEST(stats.max_weight_kg, EXCLUDED.max_weight_kg), '
+                    'updated_at = EXCLUDED.updated_at',
+                    [value for row in chunk for value in row]
+                )
+        return len(rows)
+
+    def rebuild(self, member_ids=None):
+        """Recompute weekly rows from the set logs, for all or the given members"""
+        logs = WorkoutSetLog.objects.all()
+        stats = self.all()
+        if member_ids is not None:
+            logs = logs.filter(member_id__in=member_ids)
+            stats = stats.filter(member_id__in=member_ids)
+
+        weekly = logs.values(
+            'member', 'exercise', week=TruncWeek('performed_at', output_field=models.DateField())
+        ).annotate(
+            sets=Count('id'),
+            total_reps=Sum('reps'),
+            volume_kg=Coalesce(
+                Sum(F('reps') * F('weight_kg'), output_field=models.DecimalField()),
+                Decimal(0)
+            ),
+            max_weight_kg=Max('weight_kg')
+        ).order_by()
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            stats.delete()
+            created = self.bulk_create([
+                self.model(
+                    member_id=row['member'],
+                    exercise=row['exercise'],
+                    week=row['week'],
+                    sets=row['sets'],
+                    reps=row['total_reps'],
+                    volume_kg=row['volume_kg'],
+                    max_weight_kg=row['max_weight_kg']
+                )
+                for row in weekly.iterator()
+            ], batch_size=1000)
+        return len(created)
+
+
+class WorkoutSetWeeklyStat(models.Model):
+    """
+    Weekly per-member, per-exercise rollup of set logs, maintained as logs
+    are ingested. Progress charts read these rows instead of the raw logs.
+    """
+    member = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='set_stats'
+    )
+    exercise = models.CharField(max_length=100)
+    # Monday of the week
+    week = models.DateField()
+    sets = models.PositiveIntegerField(default=0)
+    reps = models.PositiveIntegerField(default=0)
+    # Sum of reps x weight
+    volume_kg = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    max_weight_kg = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = WorkoutSetWeeklyStatManager()
+
+    class Meta:
+        db_table = 'workout_set_weekly_stats'
+        ordering = ['member', 'exercise', 'week']
+        constraints = [
+            # Also serves a member's series, filtered by exercise and week range
+            models.UniqueConstraint(
+                fields=['member', 'exercise', 'week'],
+                name='unique_set_stat_per_week'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.member_id} {self.exercise} - {self.week}"
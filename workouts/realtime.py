@@ -0,0 +1,214 @@
+"""
+Push delivery of task events to Server-Sent Events streams.
+
+Every task event (see WorkoutTaskEvent) is published after its transaction
+commits to the channels that may see it, mirroring the task list scopes:
+member:<id> for the member, branch:<id> for the branch's staff and 'all'
+for Super Admins. Each worker process keeps one Hub that fans messages out
+to the queues of its open streams. A broker backend carries messages between
+processes (REALTIME_BROKER): RedisBroker when REDIS_URL is set, otherwise
+LocalBroker, which only reaches streams in the publishing process.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Messages a slow stream may have pending before it is closed; the client
+# reconnects with Last-Event-ID and catches up from the event log
+QUEUE_SIZE = 100
+
+# Sent to a queue to close its stream
+CLOSE = None
+
+
+def channels_for_user(user):
+    """Channels a user's stream subscribes to, scoped like WorkoutTaskListCreateView"""
+    if user.role == 'SUPER_ADMIN':
+        return ['all']
+    if user.role == 'MEMBER':
+        return [f'member:{user.pk}']
+    if user.role in ['MANAGER', 'TRAINER'] and user.gym_branch_id:
+        return [f'branch:{user.gym_branch_id}']
+    return []
+
+
+def channels_for_event(event):
+    return ['all', f'member:{event.member_id}', f'branch:{event.gym_branch_id}']
+
+
+def format_event(event):
+    """One SSE frame for a WorkoutTaskEvent, encoded once for every subscriber"""
+    data = json.dumps({
+        'id': event.pk,
+        'task': event.task_id,
+        'event': event.get_event_display(),
+        'member': event.member_id,
+        'gym_branch': event.gym_branch_id,
+        'actor': event.actor_id,
+        'occurred_at': event.occurred_at,
+    }, cls=DjangoJSONEncoder)
+    return f'id: {event.pk}\nevent: task\ndata: {data}\n\n'
+
+
+class Hub:
+    """Open streams of this process by channel; only touched on the event loop"""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def subscribe(self, channels):
+        """Register a new stream; call from the event loop serving it"""
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.get_running_loop()
+                get_broker().start(self)
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        for channel in channels:
+            self.subscribers.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channels, queue):
+        for channel in channels:
+            queues = self.subscribers.get(channel)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[channel]
+
+    def dispatch(self, messages):
+        """Deliver (channel, event id, frame) messages to the local streams"""
+        for channel, event_id, frame in messages:
+            for queue in list(self.subscribers.get(channel, ())):
+                try:
+                    queue.put_nowait((event_id, frame))
+                except asyncio.QueueFull:
+                    # Too far behind: drop its backlog and close it
+                    self.unsubscribe([channel], queue)
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait((0, CLOSE))
+
+    def dispatch_threadsafe(self, messages):
+        # No stream was ever opened in this process (e.g. WSGI workers, commands)
+        if self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.dispatch, messages)
+
+
+class LocalBroker:
+    """Delivers to the streams of the publishing process only (development, single worker)"""
+
+    def start(self, hub):
+        pass
+
+    def publish(self, messages):
+        hub.dispatch_threadsafe(messages)
+
+
+class RedisBroker:
+    """
+    Carries messages between processes over Redis pub/sub. Each process
+    holds a single Redis subscription and fans out locally through its Hub.
+    Publishing hands the messages to a background thread, so the request that
+    committed the events never waits on Redis, even when it is slow or down.
+    """
+    prefix = 'task_events'
+    retry_seconds = 1
+    # Batches waiting to be published; newer ones are dropped beyond this
+    outbox_size = 1000
+
+    def __init__(self, url=None):
+        # Imported here so processes without a broker never load the client
+        import redis
+
+        self.url = url or settings.REDIS_URL
+        self.error_class = redis.RedisError
+        self.client = redis.Redis.from_url(self.url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.task = None
+        self.outbox = None
+        self.outbox_pid = None
+        self.outbox_lock = threading.Lock()
+
+    def start(self, hub):
+        self.task = asyncio.get_running_loop().create_task(self.listen(hub))
+
+    async def listen(self, hub):
+        import redis.asyncio
+
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.prefix)
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            hub.dispatch([tuple(item) for item in json.loads(message['data'])])
+            except self.error_class:
+                logger.warning('Task event subscription lost, reconnecting', exc_info=True)
+                await asyncio.sleep(self.retry_seconds)
+            finally:
+                await client.aclose()
+
+    def publish(self, messages):
+        try:
+            self.get_outbox().put_nowait(messages)
+        except queue.Full:
+            # Streams miss these events until their clients reconnect and replay them
+            logger.warning('Task event outbox full, dropped %d events', len(messages))
+
+    def get_outbox(self):
+        # Per process: a forked worker does not inherit the parent's thread
+        if self.outbox_pid != os.getpid():
+            with self.outbox_lock:
+                if self.outbox_pid != os.getpid():
+                    self.outbox = queue.Queue(maxsize=self.outbox_size)
+                    threading.Thread(
+                        target=self.send, args=(self.outbox,), name='task-event-publisher', daemon=True
+                    ).start()
+                    self.outbox_pid = os.getpid()
+        return self.outbox
+
+    def send(self, outbox):
+        while True:
+            messages = outbox.get()
+            # One message per batch; every process filters by channel locally
+            try:
+                self.client.publish(self.prefix, json.dumps(messages))
+            except self.error_class:
+                logger.warning('Could not publish %d task events', len(messages), exc_info=True)
+
+
+hub = Hub()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.REALTIME_BROKER)()
+    return _broker
+
+
+def publish_events(events):
+    """Publish saved WorkoutTaskEvent objects to their channels"""
+    messages = [
+        (channel, event.pk, format_event(event))
+        for event in events
+        for channel in channels_for_event(event)
+    ]
+    if messages:
+        get_broker().publish(messages)
@@ -1,6 +1,52 @@
 from rest_framework import serializers
-from .models import WorkoutPlan, WorkoutTask
+from .models import (
+    WorkoutPlan, WorkoutSchedule, WorkoutTask, ArchivedWorkoutTask, WorkoutTaskEvent,
+    ClassSession, ClassBooking, WorkoutSetLog
+)
 from django.utils import timezone
+from datetime import timedelta
+
+
+class ExerciseSerializer(serializers.Serializer):
+    """One exercise of a workout plan's structured content"""
+    name = serializers.CharField(max_length=100)
+    sets = serializers.IntegerField(min_value=1, max_value=20)
+    reps = serializers.IntegerField(min_value=1, max_value=200)
+    rest_seconds = serializers.IntegerField(min_value=0, max_value=900, required=False)
+    equipment = serializers.ListField(
+        child=serializers.CharField(max_length=50), max_length=10, required=False
+    )
+    muscle_groups = serializers.ListField(
+        child=serializers.CharField(max_length=50), max_length=10, required=False
+    )
+    notes = serializers.CharField(max_length=500, required=False, allow_blank=True)
+
+    def validate_name(self, value):
+        # Lowercase like set logs, so ?exercise= and progress charts match any spelling
+        return value.strip().lower()
+
+    def validate_equipment(self, value):
+        # Lowercase tags, so containment filters like ?equipment=barbell match reliably
+        return sorted({item.strip().lower() for item in value if item.strip()})
+
+    def validate_muscle_groups(self, value):
+        return sorted({item.strip().lower() for item in value if item.strip()})
+
+
+class PlanContentSerializer(serializers.Serializer):
+    exercises = ExerciseSerializer(many=True, max_length=50)
+
+
+class PlanContentField(serializers.JSONField):
+    """Workout plan content, validated against PlanContentSerializer"""
+
+    def to_internal_value(self, data):
+        data = super().to_internal_value(data)
+        serializer = PlanContentSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        return {
+            'exercises': [dict(exercise) for exercise in serializer.validated_data['exercises']]
+        }
 
 
 class WorkoutPlanSerializer(serializers.ModelSerializer):
@@ -11,18 +57,27 @@ class WorkoutPlanSerializer(serializers.ModelSerializer):
         source='gym_branch.name', read_only=True
     )
     task_count = serializers.SerializerMethodField()
+    content = PlanContentField(required=False)
 
     created_by = serializers.PrimaryKeyRelatedField(read_only=True)
     gym_branch = serializers.PrimaryKeyRelatedField(read_only=True)
 
+    # Fields a list request may leave out with ?omit=
+    OMITTABLE_FIELDS = ['content', 'description']
+
     class Meta:
         model = WorkoutPlan
         fields = [
-            'id', 'title', 'description', 'created_by', 'created_by_email',
+            'id', 'title', 'description', 'content', 'created_by', 'created_by_email',
             'gym_branch', 'gym_branch_name', 'task_count', 'created_at'
         ]
         read_only_fields = ['id', 'created_by', 'gym_branch', 'created_at']
 
+    def __init__(self, *args, omit=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name in omit:
+            self.fields.pop(field_name, None)
+
     def get_task_count(self, obj):
         return obj.tasks.count()
 
@@ -57,10 +112,14 @@ class WorkoutTaskSerializer(serializers.ModelSerializer):
         model = WorkoutTask
         fields = [
             'id', 'workout_plan', 'workout_plan_title',
-            'member', 'member_email', 'status', 'due_date',
+            'member', 'member_email', 'status', 'due_date', 'schedule',
+            'is_overdue', 'started_at', 'completed_at', 'version',
             'gym_branch', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = [
+            'id', 'status', 'schedule', 'is_overdue', 'started_at',
+            'completed_at', 'version', 'created_at'
+        ]
     
     def validate_due_date(self, value):
         """Ensure due date is not in the past"""
@@ -75,7 +134,7 @@ class WorkoutTaskSerializer(serializers.ModelSerializer):
         
         # Ensure member and workout plan are from the same branch
         if workout_plan and member:
-            if workout_plan.gym_branch != member.gym_branch:
+            if workout_plan.gym_branch_id != member.gym_branch_id:
                 raise serializers.ValidationError({
                     'member': 'Cannot assign task to member from a different gym branch'
                 })
@@ -83,6 +142,119 @@ class WorkoutTaskSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class WorkoutScheduleSerializer(serializers.ModelSerializer):
+    workout_plan_title = serializers.CharField(source='workout_plan.title', read_only=True)
+    member_email = serializers.EmailField(source='member.email', read_only=True)
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        allow_empty=False,
+        max_length=7
+    )
+    end_date = serializers.DateField(required=False)
+    weeks = serializers.IntegerField(
+        min_value=1, max_value=52, required=False, write_only=True
+    )
+
+    class Meta:
+        model = WorkoutSchedule
+        fields = [
+            'id', 'workout_plan', 'workout_plan_title', 'member', 'member_email',
+            'weekdays', 'start_date', 'end_date', 'weeks', 'materialized_until',
+            'is_active', 'created_by', 'created_at'
+        ]
+        read_only_fields = [
+            'id', 'materialized_until', 'is_active', 'created_by', 'created_at'
+        ]
+
+    def validate_weekdays(self, value):
+        return sorted(set(value))
+
+    def validate_start_date(self, value):
+        """Ensure the schedule does not start in the past"""
+        if value < timezone.now().date():
+            raise serializers.ValidationError('Start date cannot be in the past')
+        return value
+
+    def validate(self, attrs):
+        """Validate schedule assignment and derive end_date from weeks"""
+        workout_plan = attrs.get('workout_plan')
+        member = attrs.get('member')
+
+        if workout_plan and member:
+            if workout_plan.gym_branch_id != member.gym_branch_id:
+                raise serializers.ValidationError({
+                    'member': 'Cannot assign schedule to member from a different gym branch'
+                })
+
+        weeks = attrs.pop('weeks', None)
+        if weeks:
+            attrs['end_date'] = attrs['start_date'] + timedelta(weeks=weeks, days=-1)
+        if not attrs.get('end_date'):
+            raise serializers.ValidationError({
+                'end_date': 'Provide end_date or weeks'
+            })
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError({
+                'end_date': 'End date cannot be before start date'
+            })
+        if attrs['end_date'] > attrs['start_date'] + timedelta(weeks=52):
+            raise serializers.ValidationError({
+                'end_date': 'Schedules can run for at most 52 weeks'
+            })
+
+        return attrs
+
+
+class ClassSessionSerializer(serializers.ModelSerializer):
+    workout_plan_title = serializers.CharField(source='workout_plan.title', read_only=True)
+    trainer_email = serializers.EmailField(source='trainer.email', read_only=True)
+    capacity = serializers.IntegerField(min_value=1, max_value=ClassSession.MAX_CAPACITY)
+    seats_available = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ClassSession
+        fields = [
+            'id', 'workout_plan', 'workout_plan_title', 'trainer', 'trainer_email',
+            'starts_at', 'ends_at', 'capacity', 'seats_taken', 'seats_available',
+            'created_at'
+        ]
+        read_only_fields = ['id', 'trainer', 'seats_taken', 'created_at']
+
+    def validate_starts_at(self, value):
+        """Ensure the session is not in the past"""
+        if value <= timezone.now():
+            raise serializers.ValidationError('Start time must be in the future')
+        return value
+
+    def validate(self, attrs):
+        if attrs['ends_at'] <= attrs['starts_at']:
+            raise serializers.ValidationError({
+                'ends_at': 'End time must be after start time'
+            })
+        return attrs
+
+
+class ClassBookingSerializer(serializers.ModelSerializer):
+    member_email = serializers.EmailField(source='member.email', read_only=True)
+
+    class Meta:
+        model = ClassBooking
+        fields = [
+            'id', 'session', 'member', 'member_email', 'status',
+            'created_at', 'promoted_at', 'cancelled_at'
+        ]
+        read_only_fields = fields
+
+
+class ArchivedWorkoutTaskSerializer(WorkoutTaskSerializer):
+    """Read-only serializer for tasks moved to the archive table"""
+
+    class Meta:
+        model = ArchivedWorkoutTask
+        fields = WorkoutTaskSerializer.Meta.fields + ['archived_at']
+        read_only_fields = fields
+
+
 class WorkoutTaskUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating task status only"""
     
@@ -97,4 +269,106 @@ class WorkoutTaskUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 f'Invalid status. Must be one of: {", ".join(valid_statuses)}'
             )
-        return value
\ No newline at end of file
+        
+        task = self.instance
+        if task and value != task.status and not task.can_transition_to(value):
+            allowed = task.STATUS_TRANSITIONS[task.status]
+            raise serializers.ValidationError(
+                f'Cannot change status from {task.status} to {value}. '
+                f'Allowed: {", ".join(allowed) or "none"}'
+            )
+        return value
+
+
+class WorkoutTaskEventSerializer(serializers.ModelSerializer):
+    task = serializers.IntegerField(source='task_id', read_only=True)
+    event = serializers.CharField(source='get_event_display', read_only=True)
+
+    class Meta:
+        model = WorkoutTaskEvent
+        fields = ['id', 'task', 'member', 'actor', 'event', 'occurred_at']
+        read_only_fields = fields
+
+
+class WorkoutSetLogSerializer(serializers.ModelSerializer):
+    """A logged set; performed_at defaults to now"""
+    # Tolerated difference between device and server clocks
+    MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+    task = serializers.IntegerField(source='task_id')
+    reps = serializers.IntegerField(min_value=1, max_value=1000)
+    weight_kg = serializers.DecimalField(
+        max_digits=6, decimal_places=2, min_value=0, required=False, allow_null=True
+    )
+    set_number = serializers.IntegerField(
+        min_value=1, max_value=100, required=False, allow_null=True
+    )
+
+    class Meta:
+        model = WorkoutSetLog
+        fields = ['id', 'task', 'exercise', 'set_number', 'reps', 'weight_kg', 'performed_at']
+        read_only_fields = ['id']
+        extra_kwargs = {'performed_at': {'required': False}}
+
+    def validate_exercise(self, value):
+        value = value.strip().lower()
+        if not value:
+            raise serializers.ValidationError('Exercise cannot be empty')
+        return value
+
+    def validate_performed_at(self, value):
+        if value > timezone.now() + self.MAX_CLOCK_SKEW:
+            raise serializers.ValidationError('Performed time cannot be in the future')
+        return value
+
+
+class WorkoutSetLogBatchSerializer(serializers.Serializer):
+    """Sets logged by a member, possibly across several tasks"""
+    MAX_SETS = 500
+
+    sets = WorkoutSetLogSerializer(many=True, allow_empty=False, max_length=MAX_SETS)
+
+
+class ProgressQuerySerializer(serializers.Serializer):
+    """Query parameters for the member progress endpoint"""
+    BUCKET_CHOICES = ['week', 'month']
+
+    exercise = serializers.CharField(max_length=100, required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    bucket = serializers.ChoiceField(choices=BUCKET_CHOICES, default='week')
+
+    def validate_exercise(self, value):
+        return value.strip().lower()
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({
+                'start': 'Start date must be on or before end date'
+            })
+        return attrs
+
+
+class TaskAnalyticsQuerySerializer(serializers.Serializer):
+    """Query parameters for the task analytics endpoint"""
+    GROUP_BY_CHOICES = ['branch', 'trainer', 'date']
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    group_by = serializers.ChoiceField(choices=GROUP_BY_CHOICES, default='branch')
+    branch = serializers.IntegerField(required=False)
+    trainer = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        """Default to the last 30 days and reject inverted ranges"""
+        end = attrs.get('end') or timezone.localdate()
+        start = attrs.get('start') or end - timedelta(days=30)
+
+        if start > end:
+            raise serializers.ValidationError({
+                'start': 'Start date must be on or before end date'
+            })
+
+        attrs['start'] = start
+        attrs['end'] = end
+        return attrs
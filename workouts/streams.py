@@ -0,0 +1,131 @@
+"""
+Server-Sent Events stream of task events, served by the ASGI app.
+
+Plain async Django views rather than DRF APIViews, so an idle stream holds no
+thread: it is a coroutine waiting on its Hub queue.
+"""
+
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from accounts.authentication import JWTAuthentication
+from gyms.sharding import use_branch_shard
+from .models import WorkoutTaskEvent
+from .realtime import CLOSE, channels_for_user, format_event, hub
+
+# Comment line sent while idle, so proxies and clients keep the connection open
+KEEPALIVE_SECONDS = 20
+
+# Events replayed on reconnect; clients that were away longer reload the task list
+REPLAY_LIMIT = 500
+
+
+def without_connection(function):
+    """
+    Run a database call in the shared thread pool and close its connection.
+    Django would otherwise keep a thread and a connection per request until
+    the response ends, which for streams means one of each per open stream.
+    """
+    def run(*args):
+        try:
+            return function(*args)
+        finally:
+            connections.close_all()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def authenticate(request):
+    """
+    User and token expiry from the Authorization header, or from ?access_token=
+    for EventSource clients that cannot set headers.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        raw_token = request.GET.get('access_token')
+    if not raw_token:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    validated_token = authenticator.get_validated_token(raw_token)
+    return authenticator.get_user(validated_token), validated_token['exp']
+
+
+def replay(user, after, limit=REPLAY_LIMIT):
+    events = WorkoutTaskEvent.objects.for_user(user).filter(id__gt=after).order_by('id')
+    # Runs after the request's own shard routing has ended
+    with use_branch_shard(user.gym_branch_id):
+        return [(event.pk, format_event(event)) for event in events[:limit]]
+
+
+async def task_event_stream(request):
+    """
+    Stream task create/update events visible to the user. Reconnecting
+    clients send Last-Event-ID (or ?last_event_id=) to receive what they missed.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'Task streams are only served by the ASGI app (config.asgi)'},
+            status=501
+        )
+
+    try:
+        user, expires_at = await without_connection(authenticate)(request)
+    except AuthenticationFailed as exc:
+        # Same body DRF renders for the other endpoints (InvalidToken carries a dict)
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return JsonResponse(detail, status=401)
+
+    channels = channels_for_user(user)
+    if not channels:
+        return JsonResponse({'detail': 'No task stream for this user'}, status=403)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    if last_event_id is not None and not last_event_id.isdigit():
+        return JsonResponse({'last_event_id': ['Must be an event id']}, status=400)
+
+    response = StreamingHttpResponse(
+        stream(user, channels, int(last_event_id) if last_event_id else None, expires_at),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def stream(user, channels, last_event_id, expires_at):
+    # Subscribed before replaying, so nothing falls between the two
+    queue = hub.subscribe(channels)
+    try:
+        yield 'retry: 3000\n\n'
+
+        # Live events already sent by the replay are skipped
+        replayed_until = 0
+        if last_event_id is not None:
+            events = await without_connection(replay)(user, last_event_id)
+            for event_id, frame in events:
+                yield frame
+            replayed_until = events[-1][0] if events else last_event_id
+
+        while True:
+            # Streams end with their access token; clients reconnect with a fresh one
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                return
+            try:
+                event_id, frame = await asyncio.wait_for(
+                    queue.get(), min(KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if frame is CLOSE:
+                return
+            if event_id > replayed_until:
+                yield frame
+    finally:
+        hub.unsubscribe(channels, queue)
@@ -1,12 +1,36 @@
 from django.urls import path
+from .streams import task_event_stream
 from .views import (
     WorkoutPlanListCreateView,
     WorkoutTaskListCreateView,
-    WorkoutTaskDetailView
+    WorkoutTaskDetailView,
+    WorkoutScheduleListCreateView,
+    WorkoutScheduleDetailView,
+    ClassSessionListCreateView,
+    ClassSessionDetailView,
+    ClassBookingListCreateView,
+    ClassBookingDetailView,
+    WorkoutTaskHistoryView,
+    MemberTaskHistoryView,
+    WorkoutSetLogListCreateView,
+    MemberProgressView,
+    TaskAnalyticsView
 )
 
 urlpatterns = [
     path('plans/', WorkoutPlanListCreateView.as_view(), name='plan_list_create'),
     path('tasks/', WorkoutTaskListCreateView.as_view(), name='task_list_create'),
+    path('tasks/stream/', task_event_stream, name='task_stream'),
     path('tasks/<int:pk>/', WorkoutTaskDetailView.as_view(), name='task_detail'),
+    path('schedules/', WorkoutScheduleListCreateView.as_view(), name='schedule_list_create'),
+    path('schedules/<int:pk>/', WorkoutScheduleDetailView.as_view(), name='schedule_detail'),
+    path('sessions/', ClassSessionListCreateView.as_view(), name='session_list_create'),
+    path('sessions/<int:pk>/', ClassSessionDetailView.as_view(), name='session_detail'),
+    path('sessions/<int:pk>/bookings/', ClassBookingListCreateView.as_view(), name='session_bookings'),
+    path('bookings/<int:pk>/', ClassBookingDetailView.as_view(), name='booking_detail'),
+    path('tasks/<int:pk>/history/', WorkoutTaskHistoryView.as_view(), name='task_history'),
+    path('members/<int:member_id>/history/', MemberTaskHistoryView.as_view(), name='member_task_history'),
+    path('sets/', WorkoutSetLogListCreateView.as_view(), name='set_log_list_create'),
+    path('members/<int:member_id>/progress/', MemberProgressView.as_view(), name='member_progress'),
+    path('analytics/', TaskAnalyticsView.as_view(), name='task_analytics'),
 ]
\ No newline at end of file
@@ -1,19 +1,61 @@
+from datetime import timedelta
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import WorkoutPlan, WorkoutTask
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Max, Sum, Value
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .models import (
+    WorkoutPlan, WorkoutSchedule, WorkoutTask, ArchivedWorkoutTask, WorkoutTaskEvent,
+    WorkoutTaskDailyStat, ClassSession, ClassBooking, WorkoutSetLog, WorkoutSetWeeklyStat
+)
 from .serializers import (
     WorkoutPlanSerializer, 
     WorkoutTaskSerializer, 
-    WorkoutTaskUpdateSerializer
+    WorkoutTaskUpdateSerializer,
+    WorkoutScheduleSerializer,
+    ArchivedWorkoutTaskSerializer,
+    WorkoutTaskEventSerializer,
+    ClassSessionSerializer,
+    ClassBookingSerializer,
+    WorkoutSetLogSerializer,
+    WorkoutSetLogBatchSerializer,
+    ProgressQuerySerializer,
+    TaskAnalyticsQuerySerializer
 )
 from rest_framework.pagination import PageNumberPagination
+from accounts.models import User
+from accounts.idempotency import idempotent
+from accounts.permissions import IsSuperAdmin
+from gyms.sharding import branch_location, gather, gather_branches, scatter
+from .filters import WorkoutPlanFilter, WorkoutTaskFilter
+
+
+def parse_if_match(header):
+    """
+    Version number from an If-Match header such as "3" or W/"3".
+    Returns None when the header is missing or '*'; unparsable values
+    return -1 so they never match.
+    """
+    if not header or header.strip() == '*':
+        return None
+    value = header.split(',')[0].strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        return -1
+
 
 class WorkoutPlanListCreateView(APIView):
     """
     Trainer can create workout plans
     Trainer and Manager can list plans from their branch
+    ?equipment=, ?muscle_group= and ?exercise= match the structured content;
+    ?omit=content,description leaves the heavy fields out of the list
     """
     permission_classes = [IsAuthenticated]
     
@@ -21,25 +63,49 @@ class WorkoutPlanListCreateView(APIView):
         """List workout plans based on user role"""
         user = request.user
         
-        if user.role == 'SUPER_ADMIN':
-            plans = WorkoutPlan.objects.all()
-        elif user.role in ['MANAGER', 'TRAINER']:
-            plans = WorkoutPlan.objects.filter(gym_branch=user.gym_branch)
-        else:
-            # Members cannot view workout plans directly
+        # Members cannot view workout plans directly
+        if user.role == 'MEMBER':
             return Response(
                 {'detail': 'Members cannot view workout plans'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        plans = WorkoutPlan.objects.for_user(user)
+        scope_fields = [] if user.role == 'SUPER_ADMIN' else ['gym_branch']
+        
+        # Optional filters, ordering and full-text search
+        filterset = WorkoutPlanFilter(request.query_params, scope_fields=scope_fields)
+        if not filterset.is_valid():
+            return Response(
+                filterset.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        plans = filterset.filter_queryset(plans)
+
+        omit = [name for name in request.query_params.get('omit', '').split(',') if name]
+        unknown = set(omit) - set(WorkoutPlanSerializer.OMITTABLE_FIELDS)
+        if unknown:
+            allowed = ', '.join(WorkoutPlanSerializer.OMITTABLE_FIELDS)
+            return Response(
+                {'omit': [f'Must be a comma-separated list of: {allowed}']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if omit:
+            # Not even read from the database
+            plans = plans.defer(*omit)
+
         plans = plans.select_related('created_by', 'gym_branch')
         # serializer = WorkoutPlanSerializer(plans, many=True)
         # return Response(serializer.data)
+        if user.role == 'SUPER_ADMIN':
+            # Every branch, on whichever database it lives
+            plans = scatter(plans)
         paginator = PageNumberPagination()
         page = paginator.paginate_queryset(plans, request)
-        serializer = WorkoutPlanSerializer(page, many=True)
+        serializer = WorkoutPlanSerializer(page, many=True, omit=omit)
         return paginator.get_paginated_response(serializer.data)
     
+    @idempotent
     def post(self, request):
         """Create workout plan (Trainer only)"""
         if request.user.role != 'TRAINER':
@@ -77,38 +143,94 @@ class WorkoutTaskListCreateView(APIView):
     def get(self, request):
         user = request.user
 
-        if user.role == 'SUPER_ADMIN':
-            tasks = WorkoutTask.objects.all()
-        elif user.role == 'MEMBER':
-            # Members can only see their own tasks
-            tasks = WorkoutTask.objects.filter(member=user)
-        elif user.role in ['MANAGER', 'TRAINER']:
-            # Manager and Trainer can see all tasks in their branch
-            tasks = WorkoutTask.objects.filter(
-                workout_plan__gym_branch=user.gym_branch
+        # Upcoming occurrences of the member's own schedules the job has not
+        # reached yet. Checked with a plain read first, so the request only
+        # writes when something is missing; branch-wide lists never do, and
+        # neither does a branch being moved to another database.
+        if user.role == 'MEMBER' and not branch_location(user.gym_branch_id)[1]:
+            horizon = WorkoutSchedule.materialize_horizon()
+            behind = list(
+                WorkoutSchedule.objects.for_user(user).behind(horizon).order_by(
+                    'id'
+                ).values_list('id', flat=True)[:WorkoutSchedule.LAZY_MATERIALIZE_LIMIT]
             )
-        else:
+            if behind:
+                WorkoutSchedule.objects.filter(id__in=behind).materialize(horizon)
+
+        # Members see their own tasks, Manager and Trainer see their branch
+        tasks = WorkoutTask.objects.for_user(user)
+
+        # Optional filters, ordering and search; members are scoped to their
+        # own tasks, Manager and Trainer to their branch's
+        scope_fields = {
+            'MEMBER': ['member'],
+            'MANAGER': ['gym_branch'],
+            'TRAINER': ['gym_branch'],
+        }.get(user.role, [])
+        filterset = WorkoutTaskFilter(request.query_params, scope_fields=scope_fields)
+        if not filterset.is_valid():
             return Response(
-                {'detail': 'Unauthorized'},
-                status=status.HTTP_403_FORBIDDEN
+                filterset.errors,
+                status=status.HTTP_400_BAD_REQUEST
             )
+        tasks = filterset.filter_queryset(tasks).select_related(
+            'workout_plan',
+            'member',
+            'workout_plan__gym_branch'
+        )
+
+        paginator = PageNumberPagination()
 
-        # Optional status filter
-        task_status = request.query_params.get('status')
-        if task_status:
-            tasks = tasks.filter(status=task_status.upper())
+        # Archived tasks are only read when explicitly requested
+        include_archived = request.query_params.get('include_archived', '')
+        if include_archived.lower() != 'true':
+            if user.role == 'SUPER_ADMIN':
+                # Every branch, on whichever database it lives
+                tasks = scatter(tasks)
+            page = paginator.paginate_queryset(tasks, request)
+            serializer = WorkoutTaskSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
 
-        tasks = tasks.select_related(
+        archived = filterset.filter_queryset(
+            ArchivedWorkoutTask.objects.for_user(user)
+        ).select_related(
             'workout_plan',
             'member',
             'workout_plan__gym_branch'
         )
-        paginator = PageNumberPagination()
 
-        page = paginator.paginate_queryset(tasks, request)
-        serializer = WorkoutTaskSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
-    
+        # Paginate over the sort keys of both tables, then load only the page
+        columns = ['id', 'created_at', 'due_date', 'archived']
+        rows = tasks.order_by().annotate(archived=Value(False)).values(
+            *columns
+        ).union(
+            archived.order_by().annotate(archived=Value(True)).values(*columns),
+            all=True
+        ).order_by(filterset.ordering or '-created_at', '-id')
+
+        load = list
+        if user.role == 'SUPER_ADMIN':
+            # Both tables on every database, merged by the same sort keys;
+            # ids are unique across databases, so the page is loaded by id
+            rows = scatter(rows)
+            load = gather
+
+        page = paginator.paginate_queryset(rows, request)
+        hot_tasks = {task.pk: task for task in load(
+            tasks.filter(pk__in=[row['id'] for row in page if not row['archived']])
+        )}
+        archived_tasks = {task.pk: task for task in load(
+            archived.filter(pk__in=[row['id'] for row in page if row['archived']])
+        )}
+
+        data = [
+            ArchivedWorkoutTaskSerializer(archived_tasks[row['id']]).data if row['archived']
+            else WorkoutTaskSerializer(hot_tasks[row['id']]).data
+            for row in page
+        ]
+        return paginator.get_paginated_response(data)
+
+    @idempotent
     def post(self, request):
         """Create and assign workout task (Trainer only)"""
         if request.user.role != 'TRAINER':
@@ -122,7 +244,7 @@ class WorkoutTaskListCreateView(APIView):
         if serializer.is_valid():
             # Verify trainer can only assign tasks within their branch
             workout_plan = serializer.validated_data['workout_plan']
-            if workout_plan.gym_branch != request.user.gym_branch:
+            if workout_plan.gym_branch_id != request.user.gym_branch_id:
                 return Response(
                     {'detail': 'You can only assign tasks for workout plans in your branch'},
                     status=status.HTTP_403_FORBIDDEN
@@ -148,80 +270,627 @@ class WorkoutTaskDetailView(APIView):
     """
     permission_classes = [IsAuthenticated]
     
-    def get_object(self, pk):
+    def get_object(self, pk, user, model=WorkoutTask):
+        """Single indexed lookup that also applies the user's visibility scope"""
         try:
-            return WorkoutTask.objects.select_related(
+            return model.objects.for_user(user).select_related(
                 'workout_plan',
                 'member',
                 'workout_plan__gym_branch'
             ).get(pk=pk)
-        except WorkoutTask.DoesNotExist:
+        except model.DoesNotExist:
             return None
     
     def get(self, request, pk):
-        """Get task details"""
-        task = self.get_object(pk)
+        """Get task details (archived tasks are read-only)"""
+        task = (
+            self.get_object(pk, request.user) or
+            self.get_object(pk, request.user, ArchivedWorkoutTask)
+        )
         if not task:
             return Response(
                 {'detail': 'Task not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Check permissions
-        user = request.user
-        if user.role == 'MEMBER' and task.member != user:
+        if isinstance(task, ArchivedWorkoutTask):
+            serializer = ArchivedWorkoutTaskSerializer(task)
+        else:
+            serializer = WorkoutTaskSerializer(task)
+        return Response(serializer.data, headers={'ETag': f'"{task.version}"'})
+    
+    def patch(self, request, pk):
+        """Update task status (send If-Match with the task's ETag to avoid lost updates)"""
+        # Members can only update their own tasks, Trainers only tasks in their branch
+        task = self.get_object(pk, request.user)
+        if not task:
+            return Response(
+                {'detail': 'Task not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        expected_version = parse_if_match(request.headers.get('If-Match'))
+        if expected_version is not None and expected_version != task.version:
+            return Response(
+                {'detail': 'Task has been modified since it was fetched'},
+                status=status.HTTP_412_PRECONDITION_FAILED,
+                headers={'ETag': f'"{task.version}"'}
+            )
+        
+        serializer = WorkoutTaskUpdateSerializer(
+            task, 
+            data=request.data, 
+            partial=True
+        )
+        
+        if serializer.is_valid():
+            new_status = serializer.validated_data.get('status', task.status)
+            if new_status != task.status:
+                # Lean write: one conditional UPDATE on id, version and the user's scope
+                updated = WorkoutTask.objects.for_user(request.user).update_status(
+                    task, new_status, actor=request.user
+                )
+                if not updated:
+                    return Response(
+                        {'detail': 'Task was modified by another request, fetch it and retry'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+            
+            # The task loaded above already has everything the response needs
+            return Response(
+                WorkoutTaskSerializer(task).data,
+                headers={'ETag': f'"{task.version}"'}
+            )
+        
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class WorkoutScheduleListCreateView(APIView):
+    """
+    Trainer can create recurring schedules in their branch
+    Members can view their own schedules
+    Manager and Trainer can view all schedules in their branch
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        schedules = WorkoutSchedule.objects.for_user(request.user).select_related(
+            'workout_plan',
+            'member'
+        )
+        
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(schedules, request)
+        serializer = WorkoutScheduleSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @idempotent
+    def post(self, request):
+        """Create a recurring schedule (Trainer only); the first occurrences are created right away"""
+        if request.user.role != 'TRAINER':
             return Response(
-                {'detail': 'You can only view your own tasks'},
+                {'detail': 'Only trainers can create workout schedules'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        if user.role in ['TRAINER', 'MANAGER']:
-            if task.workout_plan.gym_branch != user.gym_branch:
+        serializer = WorkoutScheduleSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            workout_plan = serializer.validated_data['workout_plan']
+            if workout_plan.gym_branch_id != request.user.gym_branch_id:
                 return Response(
-                    {'detail': 'Task not found in your branch'},
+                    {'detail': 'You can only schedule workout plans in your branch'},
                     status=status.HTTP_403_FORBIDDEN
                 )
+            
+            schedule = serializer.save(created_by=request.user)
+            WorkoutSchedule.objects.filter(pk=schedule.pk).materialize(
+                WorkoutSchedule.materialize_horizon()
+            )
+            schedule.refresh_from_db(fields=['materialized_until'])
+            return Response(
+                WorkoutScheduleSerializer(schedule).data,
+                status=status.HTTP_201_CREATED
+            )
         
-        serializer = WorkoutTaskSerializer(task)
-        return Response(serializer.data)
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class WorkoutScheduleDetailView(APIView):
+    """
+    View or cancel a recurring schedule
+    Cancelling removes its upcoming pending occurrences
+    """
+    permission_classes = [IsAuthenticated]
     
-    def patch(self, request, pk):
-        """Update task status"""
-        task = self.get_object(pk)
-        if not task:
+    def get_object(self, pk, user):
+        try:
+            return WorkoutSchedule.objects.for_user(user).select_related(
+                'workout_plan',
+                'member'
+            ).get(pk=pk)
+        except WorkoutSchedule.DoesNotExist:
+            return None
+    
+    def get(self, request, pk):
+        schedule = self.get_object(pk, request.user)
+        if not schedule:
             return Response(
-                {'detail': 'Task not found'},
+                {'detail': 'Schedule not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        return Response(WorkoutScheduleSerializer(schedule).data)
+    
+    def delete(self, request, pk):
+        """Cancel schedule (Trainer or Manager of the branch)"""
+        if request.user.role not in ['TRAINER', 'MANAGER']:
+            return Response(
+                {'detail': 'Only trainers and managers can cancel workout schedules'},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
-        user = request.user
+        schedule = self.get_object(pk, request.user)
+        if not schedule:
+            return Response(
+                {'detail': 'Schedule not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        with transaction.atomic(using=router.db_for_write(WorkoutSchedule, instance=schedule)):
+            schedule.is_active = False
+            schedule.save(update_fields=['is_active'])
+            schedule.tasks.filter(
+                status='PENDING',
+                due_date__gte=timezone.localdate()
+            ).delete()
         
-        # Members can only update their own tasks
-        if user.role == 'MEMBER' and task.member != user:
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ClassSessionListCreateView(APIView):
+    """
+    Trainer can create class sessions for workout plans in their branch
+    Everyone in a branch can view its sessions; ?upcoming=true hides past ones
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        sessions = ClassSession.objects.for_user(request.user).select_related(
+            'workout_plan',
+            'trainer'
+        )
+        if request.query_params.get('upcoming') == 'true':
+            sessions = sessions.filter(starts_at__gt=timezone.now())
+        
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(sessions.order_by('starts_at', 'id'), request)
+        serializer = ClassSessionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @idempotent
+    def post(self, request):
+        """Create class session (Trainer only)"""
+        if request.user.role != 'TRAINER':
             return Response(
-                {'detail': 'You can only update your own tasks'},
+                {'detail': 'Only trainers can create class sessions'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Trainers can only update tasks in their branch
-        if user.role == 'TRAINER':
-            if task.workout_plan.gym_branch != user.gym_branch:
+        serializer = ClassSessionSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            workout_plan = serializer.validated_data['workout_plan']
+            if workout_plan.gym_branch_id != request.user.gym_branch_id:
                 return Response(
-                    {'detail': 'You can only update tasks in your branch'},
+                    {'detail': 'You can only create sessions for workout plans in your branch'},
                     status=status.HTTP_403_FORBIDDEN
                 )
+            
+            session = serializer.save(trainer=request.user)
+            return Response(
+                ClassSessionSerializer(session).data,
+                status=status.HTTP_201_CREATED
+            )
         
-        serializer = WorkoutTaskUpdateSerializer(
-            task, 
-            data=request.data, 
-            partial=True
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class ClassSessionDetailView(APIView):
+    """View a class session with its remaining seats"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        session = ClassSession.objects.for_user(request.user).select_related(
+            'workout_plan',
+            'trainer'
+        ).filter(pk=pk).first()
+        if not session:
+            return Response(
+                {'detail': 'Session not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(ClassSessionSerializer(session).data)
+
+
+class ClassBookingListCreateView(APIView):
+    """
+    GET: Bookings and waitlist of a session (members only see their own)
+    POST: Book a seat (Member only); members join the waitlist when the session is full
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get_session(self, pk, user):
+        return ClassSession.objects.for_user(user).filter(pk=pk).first()
+    
+    def get(self, request, pk):
+        session = self.get_session(pk, request.user)
+        if not session:
+            return Response(
+                {'detail': 'Session not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        bookings = ClassBooking.objects.for_user(request.user).filter(
+            session=session
+        ).select_related('member')
+        
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(bookings.order_by('id'), request)
+        serializer = ClassBookingSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    def post(self, request, pk):
+        if request.user.role != 'MEMBER':
+            return Response(
+                {'detail': 'Only members can book class sessions'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        session = self.get_session(pk, request.user)
+        if not session:
+            return Response(
+                {'detail': 'Session not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if session.has_started:
+            return Response(
+                {'detail': 'This session has already started'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            booking = ClassBooking.objects.book(session, request.user)
+        except IntegrityError:
+            return Response(
+                {'detail': 'You already have a booking for this session'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        return Response(
+            ClassBookingSerializer(booking).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ClassBookingDetailView(APIView):
+    """
+    Cancel a booking (the member, or a Trainer or Manager of the branch)
+    A freed seat goes to the first member on the waitlist
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def delete(self, request, pk):
+        if request.user.role not in ['MEMBER', 'TRAINER', 'MANAGER']:
+            return Response(
+                {'detail': 'Only members and branch staff can cancel bookings'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        booking = ClassBooking.objects.for_user(request.user).filter(pk=pk).first()
+        if not booking:
+            return Response(
+                {'detail': 'Booking not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if not ClassBooking.objects.cancel(booking):
+            return Response(
+                {'detail': 'Booking is already cancelled'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskEventHistoryMixin:
+    """Paginated event history; ?after=<event id> returns newer events oldest first for syncing"""
+
+    def paginate_events(self, request, events):
+        after = request.query_params.get('after')
+        if after:
+            if not after.isdigit():
+                return Response(
+                    {'after': ['Must be an event id']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            events = events.filter(id__gt=int(after)).order_by('id')
+        else:
+            events = events.order_by('-id')
+
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(events, request)
+        serializer = WorkoutTaskEventSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class WorkoutTaskHistoryView(TaskEventHistoryMixin, APIView):
+    """
+    Status history of a task, including archived tasks
+    Visible to whoever can see the task
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        visible = (
+            WorkoutTask.objects.for_user(request.user).filter(pk=pk).exists() or
+            ArchivedWorkoutTask.objects.for_user(request.user).filter(pk=pk).exists()
+        )
+        if not visible:
+            return Response(
+                {'detail': 'Task not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
+        events = WorkoutTaskEvent.objects.filter(task_id=pk)
+        return self.paginate_events(request, events)
+
+
+def get_visible_member(user, member_id):
+    """
+    The member with the given id if the user may see their records: members
+    only themselves, staff the members of their branch. None otherwise.
+    """
+    member = User.objects.filter(pk=member_id, role='MEMBER').first()
+    if member is None:
+        return None
+    if user.role == 'SUPER_ADMIN':
+        return member
+    if user.role == 'MEMBER':
+        return member if member.pk == user.pk else None
+    return member if member.gym_branch_id == user.gym_branch_id else None
+
+
+class MemberTaskHistoryView(TaskEventHistoryMixin, APIView):
+    """
+    Task history of a member across all their tasks
+    Members can only see their own history, staff the members of their branch
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, member_id):
+        user = request.user
+        member = get_visible_member(user, member_id)
+        if not member:
+            return Response(
+                {'detail': 'Member not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        events = WorkoutTaskEvent.objects.for_user(user).filter(member_id=member.pk)
+        return self.paginate_events(request, events)
+
+
+class WorkoutSetLogListCreateView(APIView):
+    """
+    GET: List logged sets (filtered by role), ?task=<id> for one task
+    POST: Log a batch of sets for your own tasks (Member only)
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        logs = WorkoutSetLog.objects.for_user(request.user)
+        
+        task = request.query_params.get('task')
+        if task:
+            if not task.isdigit():
+                return Response(
+                    {'task': ['Must be a task id']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            logs = logs.filter(task_id=int(task))
+        
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(logs.order_by('-id'), request)
+        serializer = WorkoutSetLogSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @idempotent
+    def post(self, request):
+        if request.user.role != 'MEMBER':
+            return Response(
+                {'detail': 'Only members can log sets'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = WorkoutSetLogBatchSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            return Response(WorkoutTaskSerializer(task).data)
+            entries = serializer.validated_data['sets']
+            
+            task_ids = {entry['task_id'] for entry in entries}
+            found = set(WorkoutTask.objects.for_user(request.user).filter(
+                pk__in=task_ids
+            ).values_list('pk', flat=True))
+            if found != task_ids:
+                found |= set(ArchivedWorkoutTask.objects.for_user(request.user).filter(
+                    pk__in=task_ids - found
+                ).values_list('pk', flat=True))
+            missing = sorted(task_ids - found)
+            if missing:
+                return Response(
+                    {'sets': [f'Tasks not found: {", ".join(map(str, missing))}']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            logs = WorkoutSetLog.objects.ingest([
+                WorkoutSetLog(member=request.user, **entry) for entry in entries
+            ])
+            return Response(
+                {'sets': WorkoutSetLogSerializer(logs, many=True).data},
+                status=status.HTTP_201_CREATED
+            )
         
         return Response(
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST
-        )
\ No newline at end of file
+        )
+
+
+class MemberProgressView(APIView):
+    """
+    Per-exercise progress series of a member, from the weekly set rollups
+    Members can only see their own progress, staff the members of their branch
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, member_id):
+        """Weekly or monthly sets, reps, volume and max weight (?exercise=, ?start=, ?end=, ?bucket=)"""
+        member = get_visible_member(request.user, member_id)
+        if not member:
+            return Response(
+                {'detail': 'Member not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        query = ProgressQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                query.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        params = query.validated_data
+        
+        stats = WorkoutSetWeeklyStat.objects.filter(member=member)
+        if 'exercise' in params:
+            stats = stats.filter(exercise=params['exercise'])
+        if 'start' in params:
+            # From the week containing the start date
+            stats = stats.filter(week__gte=params['start'] - timedelta(days=params['start'].weekday()))
+        if 'end' in params:
+            stats = stats.filter(week__lte=params['end'])
+        
+        if params['bucket'] == 'month':
+            # Weeks count towards the month their Monday falls in
+            stats = stats.values('exercise', period=TruncMonth('week')).annotate(
+                sets=Sum('sets'),
+                total_reps=Sum('reps'),
+                volume=Sum('volume_kg'),
+                max_weight=Max('max_weight_kg')
+            )
+        else:
+            stats = stats.annotate(
+                period=F('week'),
+                total_reps=F('reps'),
+                volume=F('volume_kg'),
+                max_weight=F('max_weight_kg')
+            ).values('exercise', 'period', 'sets', 'total_reps', 'volume', 'max_weight')
+        
+        series = {}
+        for row in stats.order_by('exercise', 'period'):
+            series.setdefault(row['exercise'], []).append({
+                'period': row['period'],
+                'sets': row['sets'],
+                'reps': row['total_reps'],
+                'volume_kg': row['volume'],
+                'max_weight_kg': row['max_weight'],
+            })
+        
+        return Response({
+            'member': member.pk,
+            'bucket': params['bucket'],
+            'exercises': [
+                {'exercise': exercise, 'points': points}
+                for exercise, points in series.items()
+            ]
+        })
+
+
+class TaskAnalyticsView(APIView):
+    """
+    Super Admin reporting over the precomputed daily task stats
+    Counts are summed per branch, trainer or day for a date range
+    """
+    permission_classes = [IsAuthenticated, IsSuperAdmin]
+
+    GROUP_BY_FIELDS = {
+        'branch': ['gym_branch', 'gym_branch__name'],
+        'trainer': ['trainer', 'trainer__email', 'gym_branch'],
+        'date': ['date'],
+    }
+    COUNT_FIELDS = ['tasks_created', 'tasks_completed', 'tasks_overdue']
+
+    def get(self, request):
+        """Aggregate task counts between ?start= and ?end= (default: last 30 days)"""
+        query = TaskAnalyticsQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                query.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = query.validated_data
+        group_by = params['group_by']
+        start_date = params['start']
+        end_date = params['end']
+
+        stats = WorkoutTaskDailyStat.objects.filter(
+            date__gte=start_date,
+            date__lte=end_date,
+            gym_branch__deleted_at__isnull=True
+        )
+
+        # Optional filters
+        if 'branch' in params:
+            stats = stats.filter(gym_branch_id=params['branch'])
+        if 'trainer' in params:
+            stats = stats.filter(trainer_id=params['trainer'])
+
+        fields = self.GROUP_BY_FIELDS[group_by]
+        stats = stats.values(*fields).annotate(
+            **{name: Sum(name) for name in self.COUNT_FIELDS}
+        ).order_by()
+
+        # Summed on each database, then the groups they share (e.g. dates) are added up
+        groups = {}
+        for row in gather_branches(stats):
+            key = tuple(row[field] for field in fields)
+            if key in groups:
+                for name in self.COUNT_FIELDS:
+                    groups[key][name] += row[name]
+            else:
+                groups[key] = row
+
+        results = sorted(
+            groups.values(),
+            key=lambda row: (row[fields[0]] is None, row[fields[0]] or 0)
+        )
+        for row in results:
+            created = row['tasks_created']
+            row['completion_rate'] = (
+                round(row['tasks_completed'] / created, 4) if created else None
+            )
+
+        return Response({
+            'start': start_date,
+            'end': end_date,
+            'group_by': group_by,
+            'results': results
+        })